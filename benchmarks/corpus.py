@@ -0,0 +1,276 @@
+"""
+Generate a synthetic corpus of MARC records, in text (.mrk) form
+
+Records are synthesized from the schema (`SCHEMA_JSON`):
+- every type of record (leader/06) and its matching 008 layout
+- 006 and 007 fields, with codes valid for their type
+- a random selection of data fields, with indicators and subfields
+  drawn from their definitions, repeating those that are repeatable
+- long subfield data, wrapped onto continuation lines
+
+Generation is deterministic for a given seed.
+
+Usage: python benchmarks/corpus.py [RECORDS] [SEED] > corpus.mrk
+"""
+import os
+import random
+import sys
+from textwrap import wrap
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from prospector_holds import settings  # noqa: E402
+from prospector_holds.models.positions import compile_positions  # noqa: E402
+from prospector_holds.models.positions import material_layouts  # noqa: E402
+from prospector_holds.utils import label_to_key  # noqa: E402
+
+
+WORDS = (
+    'night', 'living', 'dead', 'dawn', 'day', 'land', 'diary', 'survival',
+    'motion', 'picture', 'film', 'collection', 'criterion', 'edition',
+    'director', 'producer', 'screenplay', 'horror', 'classic', 'zombies',
+    'restored', 'digital', 'sound', 'color', 'black', 'white', 'videodisc',
+    'Pittsburgh', 'Pennsylvania', 'Romero', 'Russo', 'Streiner', 'Hardman',
+    'Amélie', 'Jeunet', 'Kurosawa', 'Miyazaki', 'Hitchcock', 'Méliès',
+)
+LANGUAGES = ('eng', 'fre', 'ger', 'spa', 'jpn', 'ita')
+PLACES = ('nyu', 'cau', 'xxu', 'enk', 'fr ', 'ja ')
+
+"""
+Fields present in every record
+"""
+REQUIRED_TAGS = ('245',)
+
+"""
+The number of optional data fields in each record, and of their subfields
+"""
+FIELD_COUNT = (10, 40)
+SUBFIELD_COUNT = (1, 5)
+
+"""
+The probability of a subfield holding long text, and its wrapping width
+"""
+LONG_TEXT = 0.1
+WRAP_WIDTH = 70
+
+
+class CorpusGenerator:
+    """
+    Synthesize realistic records from the schema
+    """
+
+    def __init__(self, seed=0):
+        """
+        Prepare the schema definitions to draw from
+        """
+        self.random = random.Random(seed)
+        self.fields = settings.SCHEMA_JSON['fields']
+        self.types_of_record = sorted(material_layouts())
+        self.data_tags = sorted(
+            tag
+            for (tag, definition) in self.fields.items()
+            if 'subfields' in definition and tag not in REQUIRED_TAGS
+        )
+        self.number = 0
+
+    def records(self, count):
+        """
+        Generate the text of each of `count` records
+        """
+        for _ in range(count):
+            yield self.record()
+
+    def record(self):
+        """
+        Generate the text of a single record
+        """
+        self.number += 1
+        type_of_record = self.random.choice(self.types_of_record)
+        lines = [
+            'LEADER ' + self.leader(type_of_record),
+            '001    {:010d}'.format(self.number),
+            '005    {year}{month:02d}{day:02d}{time:06d}.0'.format(
+                year=self.random.randint(1990, 2024),
+                month=self.random.randint(1, 12),
+                day=self.random.randint(1, 28),
+                time=self.random.randint(0, 235959),
+            ),
+        ]
+        if self.random.random() < 0.3:
+            lines.append('006    ' + self.positions_by_code('006'))
+        for _ in range(self.random.randint(0, 2)):
+            lines.append('007    ' + self.positions_by_code('007'))
+        lines.append('008    ' + self.fixed_length_data(type_of_record))
+        tags = list(REQUIRED_TAGS)
+        tags.extend(self.random.sample(
+            self.data_tags,
+            self.random.randint(*FIELD_COUNT),
+        ))
+        for tag in sorted(tags):
+            repeat = 1
+            if self.fields[tag].get('repeatable'):
+                repeat = self.random.choice((1, 1, 1, 2, 3, 4))
+            for _ in range(repeat):
+                lines.append(self.data_field(tag))
+        return '\n'.join(lines)
+
+    def leader(self, type_of_record):
+        """
+        Generate the positional data of a leader
+        """
+        positions = self.fields['LDR']['positions']
+        values = {
+            'type_of_record': type_of_record,
+        }
+        return self.positions(positions, values)
+
+    def fixed_length_data(self, type_of_record):
+        """
+        Generate an 008 field, matching the type of record
+        """
+        definition = self.fields['008']['types']
+        common = definition['All Materials']['positions']
+        for (name, _type) in self.fields['006']['types'].items():
+            if type_of_record in _type['positions']['00']['codes']:
+                break
+        positions = dict(common)
+        positions.update(definition[name]['positions'])
+        return self.positions(positions)
+
+    def positions_by_code(self, tag):
+        """
+        Generate a 006 or 007 field, of a random type
+        """
+        name = self.random.choice(sorted(self.fields[tag]['types']))
+        positions = self.fields[tag]['types'][name]['positions']
+        return self.positions(positions)
+
+    def positions(self, positions, values=None):
+        """
+        Generate positional data, choosing a valid code for each position
+        """
+        values = values or {}
+        definitions = {
+            label_to_key(definition['label']): definition
+            for definition in positions.values()
+        }
+        data = []
+        offset = 0
+        for (key, start, stop) in compile_positions(positions):
+            if start < offset:
+                continue
+            width = stop - start
+            value = values.get(key)
+            if value is None:
+                definition = definitions.get(key)
+                if definition is None:
+                    # A gap the schema leaves undefined
+                    value = ''
+                else:
+                    value = self.position(key, width, definition)
+            data.append(value[:width].ljust(width))
+            offset = stop
+        return ''.join(data)
+
+    def position(self, key, width, definition):
+        """
+        Generate the value of a single position
+        """
+        if key == 'language':
+            return self.random.choice(LANGUAGES)
+        if key.startswith('place_of_publication'):
+            return self.random.choice(PLACES)
+        codes = sorted(definition.get('codes', {}))
+        if not codes:
+            if 'date' in key:
+                return str(self.random.randint(1900, 2024)).ljust(width, '0')[:width]
+            return ''.join(
+                str(self.random.randint(0, 9))
+                for _ in range(width)
+            )
+        code = self.random.choice(codes)
+        bounds = code.split('-')
+        if len(bounds) == 2 and all(bound.isdigit() for bound in bounds):
+            number = self.random.randint(int(bounds[0]), int(bounds[1]))
+            return str(number).zfill(len(bounds[0]))
+        return code
+
+    def data_field(self, tag):
+        """
+        Generate a data field, with indicators and subfields
+        """
+        definition = self.fields[tag]
+        indicator = (
+            self.indicator(definition.get('indicator1')),
+            self.indicator(definition.get('indicator2')),
+        )
+        codes = sorted(definition['subfields'])
+        chosen = []
+        for _ in range(self.random.randint(*SUBFIELD_COUNT)):
+            code = self.random.choice(codes)
+            if code in chosen and not definition['subfields'][code].get('repeatable'):
+                continue
+            chosen.append(code)
+        if 'a' in codes and 'a' not in chosen:
+            chosen.insert(0, 'a')
+        data = ''.join(
+            '|' + code + self.text()
+            for code in chosen
+        )
+        line = '{tag} {indicator1}{indicator2} {data}'.format(
+            tag=tag,
+            indicator1=indicator[0],
+            indicator2=indicator[1],
+            data=data,
+        )
+        if len(line) > WRAP_WIDTH:
+            # Continuation lines are indented,
+            # and each line before them ends with a space
+            line = ' \n       '.join(wrap(
+                line,
+                width=WRAP_WIDTH,
+                break_long_words=False,
+                break_on_hyphens=False,
+            ))
+        return line
+
+    def indicator(self, definition):
+        """
+        Choose a valid indicator value
+        """
+        codes = sorted((definition or {}).get('codes', {}))
+        if not codes:
+            return ' '
+        code = self.random.choice(codes)
+        if '-' in code:
+            (low, high) = code.split('-')
+            return str(self.random.randint(int(low), int(high)))
+        return code
+
+    def text(self):
+        """
+        Generate the text of a subfield, occasionally long
+        """
+        count = self.random.randint(1, 4)
+        if self.random.random() < LONG_TEXT:
+            count = self.random.randint(20, 60)
+        return ' '.join(
+            self.random.choice(WORDS)
+            for _ in range(count)
+        )
+
+
+def main(count=100, seed=0):
+    """
+    Print a corpus of records
+    """
+    generator = CorpusGenerator(seed)
+    for text in generator.records(count):
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""
+Measure the memory held by parsed records
+
+Parses many copies of the sample record, keeping them all in memory,
+and reports the bytes allocated per record.
+
+Usage: python benchmarks/memory.py [RECORDS]
+"""
+import json
+import os
+import sys
+import tracemalloc
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+INPUT_FILE = os.path.join(ROOT, 'test', 'night-of-the-living-dead-1968.mrk')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from prospector_holds.models.record import MarcRecordText  # noqa: E402
+
+
+def main(count=1000):
+    """
+    Report the bytes allocated per record, and per field
+    """
+    with open(INPUT_FILE) as stream:
+        text = stream.read()
+    # Load the schema and layouts before measuring
+    MarcRecordText.from_string(text)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = [
+        MarcRecordText.from_string(text)
+        for _ in range(count)
+    ]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    size = (after - before) / count
+    results = {
+        'records': count,
+        'bytes_per_record': round(size),
+        'bytes_per_field': round(size / len(records[0].fields)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,89 @@
+"""
+Measure writing records as text, and check it round-trips
+
+Serializes many copies of the sample record, both with `str()`
+and with `MarcTextWriter`, checks the output is identical,
+then parses it back and checks each record serializes the same again.
+
+Usage: python benchmarks/serialize.py [RECORDS]
+"""
+from io import StringIO
+import json
+import os
+import sys
+import time
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+INPUT_FILE = os.path.join(ROOT, 'test', 'night-of-the-living-dead-1968.mrk')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from prospector_holds.models.record import MarcRecordText  # noqa: E402
+from prospector_holds.models.writer import MarcTextWriter  # noqa: E402
+
+
+def _with_str(records):
+    """
+    Serialize records one at a time, with `str()`
+    """
+    stream = StringIO()
+    for record in records:
+        stream.write(str(record) + '\n')
+    return stream.getvalue()
+
+
+def _with_writer(records):
+    """
+    Serialize records in bulk, with the writer
+    """
+    stream = StringIO()
+    MarcTextWriter(stream).write_records(records)
+    return stream.getvalue()
+
+
+def _best(function, records, repeat=3):
+    """
+    Time the fastest of a few runs, returning it with the output
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = function(records)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return (best, output)
+
+
+def main(count=2000):
+    """
+    Report the microseconds to serialize each record, both ways
+    """
+    with open(INPUT_FILE) as stream:
+        text = stream.read()
+    records = [
+        MarcRecordText.from_string(
+            text.replace('1017697643', '{:010d}'.format(number))
+        )
+        for number in range(count)
+    ]
+    (time_str, expected) = _best(_with_str, records)
+    (time_writer, output) = _best(_with_writer, records)
+    if output != expected:
+        raise AssertionError('Writer output differs from str()')
+    parsed = list(MarcRecordText.iter_records(StringIO(output)))
+    if _with_str(parsed) != expected:
+        raise AssertionError('Written records do not round-trip')
+    results = {
+        'records': count,
+        'str_us_per_record': round(time_str / count * 1e6, 1),
+        'writer_us_per_record': round(time_writer / count * 1e6, 1),
+        'speedup': round(time_str / time_writer, 2),
+        'equivalent': True,
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,59 @@
+"""
+Measure the cold-start time of parsing a single record
+
+Each sample runs in a fresh interpreter, timing the package import
+plus the first parse of the sample record;
+interpreter startup itself is excluded.
+
+Usage: python benchmarks/startup.py [SAMPLES]
+"""
+import json
+import os
+from statistics import median
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+INPUT_FILE = os.path.join(ROOT, 'test', 'night-of-the-living-dead-1968.mrk')
+SCRIPT = """
+import time
+start = time.perf_counter()
+from prospector_holds.models.record import MarcRecordText
+MarcRecordText.from_file({input_file!r})
+print(time.perf_counter() - start)
+"""
+
+
+def sample(cache_directory):
+    """
+    Time a single run in a new interpreter
+    """
+    environment = dict(os.environ)
+    environment['XDG_CACHE_HOME'] = cache_directory
+    environment['PYTHONPATH'] = os.path.join(ROOT, 'src')
+    output = subprocess.check_output(
+        (sys.executable, '-c', SCRIPT.format(input_file=INPUT_FILE)),
+        env=environment,
+    )
+    return float(output)
+
+
+def main(samples=10):
+    """
+    Compare runs with an empty cache against runs with a warm one
+    """
+    results = {}
+    with TemporaryDirectory() as cache_directory:
+        results['cold'] = sample(cache_directory)
+        results['warm'] = median(
+            sample(cache_directory)
+            for _ in range(samples)
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,293 @@
+"""
+Measure parsing and serialization throughput, over a synthetic corpus
+
+Each benchmark is run a few times, keeping the fastest;
+results are written as JSON, so runs can be compared across commits.
+
+Usage: python benchmarks/suite.py [--records N] [--seed N]
+                                  [--output FILE] [--compare FILE]
+"""
+import argparse
+from io import StringIO
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from unittest import mock
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+RESULTS = os.path.join(HERE, 'results')
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from corpus import CorpusGenerator  # noqa: E402
+from prospector_holds.models.extract import PathExtractor  # noqa: E402
+from prospector_holds.models.fields import Field  # noqa: E402
+from prospector_holds.models.leader import Leader  # noqa: E402
+from prospector_holds.models.record import MarcRecordText  # noqa: E402
+from prospector_holds.models.search import SearchResultParser  # noqa: E402
+from prospector_holds.models.writer import MarcTextWriter  # noqa: E402
+from prospector_holds.settings import SETTINGS  # noqa: E402
+
+
+"""
+The settings needed to parse synthetic search results
+"""
+SEARCH_SETTINGS = {
+    'SEARCH_PATH_SEARCH': '/search/',
+    'SEARCH_PATH_RECORD': '/record/',
+    'SEARCH_PAGINATE_ID_PREFIX': 'pagination_link_',
+}
+
+"""
+The fraction of a slower run, beyond which it's reported as a regression
+"""
+THRESHOLD = 0.1
+
+"""
+The paths pulled from each record, by the extraction benchmarks
+"""
+EXTRACT_PATHS = ('001', '245$a', '020$a', '008/07-10', 'LDR/06')
+
+
+def _time(function, repeat):
+    """
+    Time the fastest of a few calls of a function
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def _page(links, number):
+    """
+    Render a page of search results as HTML, like the catalog
+    """
+    parts = [
+        '<html><head><title>Results</title></head><body>',
+        '<a id="pagination_link_next" href="/search/page/{}">Next</a>'.format(number + 1),
+        '<table>',
+    ]
+    for link in links:
+        parts.append(
+            '<tr class="briefCitRow"><td><input type="checkbox" name="save" value="{link}">'
+            '<span class="briefcitTitle"><a class="title" title="Title" href="{link}">'
+            'Night of the living dead</a></span></td></tr>'.format(link=link)
+        )
+    parts.append('</table></body></html>')
+    return ''.join(parts)
+
+
+class Suite:
+    """
+    Benchmarks over a synthetic corpus of records
+    """
+
+    def __init__(self, count, seed=0, repeat=3):
+        """
+        Generate the corpus, and everything derived from it
+        """
+        self.repeat = repeat
+        self.texts = list(CorpusGenerator(seed).records(count))
+        self.chunk = '\n'.join(self.texts)
+        self.records = [
+            MarcRecordText.from_string(text)
+            for text in self.texts
+        ]
+        self.leaders = [
+            text.split('\n', 1)[0]
+            for text in self.texts
+        ]
+        # The lines of each field, grouped by the class they parse to
+        self.fields = {}
+        for text in self.texts:
+            record = MarcRecordText.from_string(text, lazy=True)
+            leader = record.leader
+            for entry in record._fields:
+                (tag, lines) = entry
+                field = Field.from_lines(lines, leader)
+                if field is None:
+                    continue
+                name = type(field).__name__
+                self.fields.setdefault(name, []).append((lines, leader))
+        self.pages = [
+            _page(
+                [
+                    '/record/{}'.format(number * 50 + link)
+                    for link in range(50)
+                ],
+                number,
+            )
+            for number in range(max(1, count // 50))
+        ]
+
+    def run(self):
+        """
+        Run every benchmark, returning the results of each by name
+        """
+        results = {}
+        benchmarks = [
+            ('parse', self.parse, len(self.texts)),
+            ('parse_loop', self.parse_loop, len(self.texts)),
+            ('parse_chunk', self.parse_chunk, len(self.texts)),
+            ('parse_lazy', self.parse_lazy, len(self.texts)),
+            ('extract', self.extract, len(self.texts)),
+            ('extract_parsed', self.extract_parsed, len(self.texts)),
+            ('leader_from_string', self.leader_from_string, len(self.leaders)),
+            ('serialize_str', self.serialize_str, len(self.records)),
+            ('serialize_writer', self.serialize_writer, len(self.records)),
+            ('search_result_parser', self.search_result_parser, len(self.pages)),
+        ]
+        for (name, lines) in sorted(self.fields.items()):
+            benchmarks.append((
+                'field_from_lines_' + name,
+                lambda lines=lines: self.field_from_lines(lines),
+                len(lines),
+            ))
+        for (name, function, count) in benchmarks:
+            seconds = _time(function, self.repeat)
+            results[name] = {
+                'operations': count,
+                'seconds': round(seconds, 6),
+                'us_per_operation': round(seconds / count * 1e6, 3),
+            }
+        return results
+
+    def parse(self):
+        for text in self.texts:
+            MarcRecordText.from_string(text)
+
+    def parse_loop(self):
+        for text in self.texts:
+            MarcRecordText(StringIO(text))
+
+    def parse_chunk(self):
+        for record in MarcRecordText.iter_text(self.chunk):
+            pass
+
+    def parse_lazy(self):
+        for text in self.texts:
+            MarcRecordText.from_string(text, lazy=True)
+
+    def extract(self):
+        extractor = PathExtractor(EXTRACT_PATHS)
+        for text in self.texts:
+            extractor.extract(text)
+
+    def extract_parsed(self):
+        extractor = PathExtractor(EXTRACT_PATHS)
+        for text in self.texts:
+            extractor.extract_record(MarcRecordText.from_string(text))
+
+    def leader_from_string(self):
+        for line in self.leaders:
+            Leader.from_string(line)
+
+    def field_from_lines(self, fields):
+        for (lines, leader) in fields:
+            Field.from_lines(lines, leader)
+
+    def serialize_str(self):
+        for record in self.records:
+            str(record)
+
+    def serialize_writer(self):
+        MarcTextWriter(StringIO()).write_records(self.records)
+
+    def search_result_parser(self):
+        with mock.patch.dict(SETTINGS, SEARCH_SETTINGS):
+            for page in self.pages:
+                parser = SearchResultParser()
+                parser.feed(page)
+                parser.close()
+
+
+def _commit():
+    """
+    Identify the commit being measured, if any
+    """
+    try:
+        output = subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT,
+            stderr=subprocess.DEVNULL,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('ascii').strip()
+
+
+def compare(previous, current):
+    """
+    Report the change in each benchmark from a previous run,
+    returning the names of any that regressed
+    """
+    regressions = []
+    for (name, result) in sorted(current['results'].items()):
+        before = previous['results'].get(name)
+        if before is None:
+            continue
+        ratio = result['us_per_operation'] / before['us_per_operation']
+        flag = ''
+        if ratio > 1 + THRESHOLD:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print('{name:40} {before:>12.3f} {after:>12.3f} {ratio:>7.2f}x{flag}'.format(
+            name=name,
+            before=before['us_per_operation'],
+            after=result['us_per_operation'],
+            ratio=ratio,
+            flag=flag,
+        ))
+    return regressions
+
+
+def main(args=None):
+    """
+    Run the suite, saving the results, and comparing to a previous run
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--records', type=int, default=500, help='size of the corpus')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of each benchmark')
+    parser.add_argument(
+        '--output',
+        help='file to write results to; defaults to results/COMMIT.json',
+    )
+    parser.add_argument('--compare', help='file of previous results to compare against')
+    args = parser.parse_args(args)
+    commit = _commit()
+    suite = Suite(args.records, seed=args.seed, repeat=args.repeat)
+    data = {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'records': args.records,
+        'seed': args.seed,
+        'results': suite.run(),
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS, exist_ok=True)
+        output = os.path.join(RESULTS, '{}.json'.format(commit or 'latest'))
+    with open(output, 'w') as stream:
+        json.dump(data, stream, indent=2, sort_keys=True)
+    print(json.dumps(data['results'], indent=2, sort_keys=True))
+    if args.compare:
+        with open(args.compare) as stream:
+            previous = json.load(stream)
+        if compare(previous, data):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
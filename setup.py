@@ -30,8 +30,12 @@ setup(
     packages=find_packages(where='src'),
     python_requires=">=3.0, <4",
     install_requires=(
+        'requests',
     ),
     extras_require={
+        'columns': (
+            'numpy',
+        ),
         'test': (
             'pylint',
         ),
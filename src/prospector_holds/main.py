@@ -1,19 +1,417 @@
 """
 The main entrypoint for the package
+
+Each subcommand reads records from files, or from stdin (`-`),
+either text (.mrk) or binary (.mrc),
+and writes its results to stdout as it goes,
+so it can be used within a shell pipeline, e.g.
+```
+prospector-holds convert --format binary < records.mrk > records.mrc
+prospector-holds extract --path 001 --path '245$a' records.mrc | sort
+```
 """
+from argparse import ArgumentParser
+import json
+import os
+import sys
+
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.binary import open_records
+from prospector_holds.models.bulk import BulkParser
+from prospector_holds.models.cache import RecordStore
+from prospector_holds.models.errors import InvalidPathError
+from prospector_holds.models.extract import PathExtractor
+from prospector_holds.models.fields import FieldWithSubfields
+from prospector_holds.models.index import RecordIndex
+from prospector_holds.models.metrics import METRICS
 from prospector_holds.models.record import MarcRecordText
+from prospector_holds.models.terms import TermIndex
+from prospector_holds.models.writer import MarcTextWriter
+
+
+STDIN = '-'
+
+"""
+The commands, and the options that may come before them
+"""
+COMMANDS = ('parse', 'convert', 'extract', 'index', 'search')
+GLOBAL_OPTIONS = ('--metrics',)
+
+"""
+The separator between repeated values of a path, in tab-separated output
+"""
+VALUE_SEPARATOR = '|'
+
+
+def _open_inputs(input_files):
+    """
+    Open each input file, or stdin, yielding each stream
+    along with whether it holds binary records
+
+    Binary streams are opened as bytes, and text streams as text.
+    """
+    for input_file in input_files or [STDIN]:
+        if input_file == STDIN:
+            buffer = getattr(sys.stdin, 'buffer', None)
+            if buffer is not None and MarcRecordBinary.is_binary(buffer.peek(64)):
+                yield (buffer, True)
+            else:
+                yield (sys.stdin, False)
+            continue
+        with open_records(input_file) as entry:
+            yield entry
+
+
+def _parse_inputs(args):
+    """
+    Parse each record of each input, across a pool of processes
+    """
+    bulk = BulkParser(
+        workers=args.workers or None,
+        ordered=not args.unordered,
+    )
+    for (stream, is_binary) in _open_inputs(args.input_files):
+        cls = MarcRecordBinary if is_binary else MarcRecordText
+        for record in bulk.parse(stream, cls=cls):
+            yield record
 
 
-def main():
+def _record_to_dict(record):
     """
-    Just grab a test file, open it, and take a look.
+    Represent a record as a dict, to serialize as JSON
+
+    Fields with subfields are represented by their subfields;
+    all others, by their data as text.
     """
-    input_file = 'test/night-of-the-living-dead-1968.mrk'
-    record = MarcRecordText.from_file(input_file)
-    print(record)
-    print(repr(record.leader))
+    fields = []
     for field in record.fields:
-        print(repr(field))
+        if isinstance(field, FieldWithSubfields):
+            fields.append({
+                'tag': field.tag,
+                'indicator': field.indicator[0] + field.indicator[1],
+                'subfields': [
+                    [key, value]
+                    for (key, value) in field.data
+                ],
+            })
+        else:
+            fields.append({
+                'tag': field.tag,
+                'data': field._str_data(),
+            })
+    return {
+        'leader': record.leader._str_data(),
+        'fields': fields,
+    }
+
+
+def _write_records(records, output_format):
+    """
+    Write each record to stdout, in a format, returning the number written
+    """
+    count = 0
+    if output_format == 'binary':
+        stream = sys.stdout.buffer
+        for record in records:
+            stream.write(bytes(MarcRecordBinary.from_record(record)))
+            count += 1
+        stream.flush()
+    elif output_format == 'json':
+        for record in records:
+            sys.stdout.write(json.dumps(_record_to_dict(record)) + '\n')
+            count += 1
+    elif output_format == 'repr':
+        for record in records:
+            sys.stdout.write(repr(record.leader) + '\n')
+            for field in record.fields:
+                sys.stdout.write(repr(field) + '\n')
+            sys.stdout.write('\n')
+            count += 1
+    else:
+        count = MarcTextWriter(sys.stdout).write_records(records)
+    sys.stdout.flush()
+    return count
+
+
+def parse(args):
+    """
+    Parse each record, writing it back out
+    """
+    if args.warm_cache:
+        count = RecordStore().put_records(_parse_inputs(args))
+        print("Stored {count} records".format(count=count))
+        return
+    _write_records(_parse_inputs(args), args.format)
+
+
+def convert(args):
+    """
+    Convert each record to another format
+    """
+    _write_records(_parse_inputs(args), args.format)
+
+
+def extract(args):
+    """
+    Extract the values of each path from each record, one line per record
+    """
+    extractor = PathExtractor(
+        args.path,
+        first=args.first,
+        as_dict=args.format == 'json',
+    )
+    for (stream, is_binary) in _open_inputs(args.input_files):
+        if is_binary:
+            results = extractor.iter_binary(stream)
+        else:
+            results = extractor.iter_records(stream)
+        for values in results:
+            if args.format == 'json':
+                line = json.dumps(values)
+            else:
+                line = '\t'.join(
+                    _cell(value, args.first)
+                    for value in values
+                )
+            sys.stdout.write(line + '\n')
+    sys.stdout.flush()
+
+
+def _cell(value, first):
+    """
+    Format the values of a path as a single tab-separated cell
+    """
+    if first:
+        values = [value or '']
+    else:
+        values = value
+    return VALUE_SEPARATOR.join(values).replace('\t', ' ').replace('\n', ' ')
+
+
+def index(args):
+    """
+    Build the record and term indexes persisted beside each file
+    """
+    for input_file in args.input_files:
+        with RecordIndex.open(input_file, rebuild=args.rebuild) as records:
+            count = len(records)
+        TermIndex.open(input_file, rebuild=args.rebuild)
+        print("Indexed {count} records: {input_file}".format(
+            count=count,
+            input_file=input_file,
+        ))
+
+
+def search(args):
+    """
+    Search the indexed terms of a file, writing out each matching record
+
+    Queries are read from stdin, one per line, if not given.
+    """
+    terms = TermIndex.open(args.input_file)
+    queries = args.queries
+    if not queries:
+        queries = (
+            line.strip()
+            for line in sys.stdin
+        )
+    if args.format == 'ids':
+        for query in queries:
+            for control_number in terms.search(query, field=args.field):
+                sys.stdout.write(control_number + '\n')
+        sys.stdout.flush()
+        return
+    with RecordIndex.open(args.input_file) as records:
+        _write_records(
+            (
+                records[number]
+                for query in queries
+                for number in terms.find(query, field=args.field)
+            ),
+            args.format,
+        )
+
+
+def _add_inputs(parser):
+    """
+    Add the arguments for reading records from files, or stdin
+    """
+    parser.add_argument(
+        'input_files',
+        metavar='FILE',
+        nargs='*',
+        help='files of 1+ records, text or binary; defaults to stdin (-)',
+    )
+
+
+def _add_workers(parser):
+    """
+    Add the arguments for parsing records across processes
+    """
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='number of processes to parse with (0: one per CPU)',
+    )
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help='write records as soon as they are parsed',
+    )
+
+
+def _parser():
+    """
+    Build the parser of the command line, with a subparser per command
+    """
+    parser = ArgumentParser(
+        prog='prospector-holds',
+        description='Parse, convert, extract from, index, and search MARC records',
+    )
+    parser.add_argument(
+        '--metrics',
+        choices=('json', 'prometheus'),
+        help='collect metrics, writing them to stderr when done; '
+        'records are then parsed in a single process',
+    )
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+
+    command = commands.add_parser('parse', help='parse each record, writing it back out')
+    _add_inputs(command)
+    _add_workers(command)
+    command.add_argument(
+        '--format',
+        choices=('text', 'json', 'repr'),
+        default='text',
+        help='output format (default: %(default)s)',
+    )
+    command.add_argument(
+        '--warm-cache',
+        action='store_true',
+        help='store the parsed records in the record cache, instead of writing them',
+    )
+    command.set_defaults(function=parse)
+
+    command = commands.add_parser('convert', help='convert each record to another format')
+    _add_inputs(command)
+    _add_workers(command)
+    command.add_argument(
+        '--format',
+        choices=('binary', 'text', 'json'),
+        default='binary',
+        help='output format (default: %(default)s)',
+    )
+    command.set_defaults(function=convert)
+
+    command = commands.add_parser('extract', help='extract values by path, e.g. 245$a')
+    _add_inputs(command)
+    command.add_argument(
+        '--path',
+        action='append',
+        required=True,
+        help='a path to extract, e.g. 001, 245$a, 008/07-10, LDR/06; repeatable',
+    )
+    command.add_argument(
+        '--first',
+        action='store_true',
+        help='keep only the first value of each path',
+    )
+    command.add_argument(
+        '--format',
+        choices=('tsv', 'json'),
+        default='tsv',
+        help='output format (default: %(default)s); '
+        'repeated values are separated by "{}"'.format(VALUE_SEPARATOR),
+    )
+    command.set_defaults(function=extract)
+
+    command = commands.add_parser('index', help='build the indexes beside each file')
+    command.add_argument('input_files', metavar='FILE', nargs='+', help='files of 1+ records')
+    command.add_argument(
+        '--rebuild',
+        action='store_true',
+        help='rebuild indexes, even if up to date',
+    )
+    command.set_defaults(function=index)
+
+    command = commands.add_parser('search', help='search the indexed terms of a file')
+    command.add_argument('input_file', metavar='FILE', help='a file of 1+ records')
+    command.add_argument(
+        'queries',
+        metavar='QUERY',
+        nargs='*',
+        help='queries to search for; defaults to one per line of stdin',
+    )
+    command.add_argument(
+        '--field',
+        choices=tuple(TermIndex.FIELDS),
+        default='title',
+        help='kind of field to search (default: %(default)s)',
+    )
+    command.add_argument(
+        '--format',
+        choices=('ids', 'text', 'json', 'binary'),
+        default='ids',
+        help='output format (default: %(default)s): control numbers, or records',
+    )
+    command.set_defaults(function=search)
+    return parser
+
+
+def _default_command(args):
+    """
+    Insert the `parse` command, if no command is given
+
+    Only the first argument after any global options is checked,
+    so a file may share its name with a command, e.g. `records.mrk index`.
+    """
+    args = list(args)
+    index = 0
+    while index < len(args):
+        if args[index] in GLOBAL_OPTIONS:
+            index += 2
+        elif args[index].startswith(tuple(option + '=' for option in GLOBAL_OPTIONS)):
+            index += 1
+        else:
+            break
+    if index < len(args) and args[index] not in COMMANDS + ('-h', '--help'):
+        args.insert(index, 'parse')
+    return args
+
+
+def main(args=None):
+    """
+    Run a command
+
+    For compatibility, files given without a command are parsed.
+    """
+    parser = _parser()
+    if args is None:
+        args = sys.argv[1:]
+    args = parser.parse_args(_default_command(args))
+    if args.command is None:
+        parser.print_help()
+        return
+    if args.metrics:
+        METRICS.enable()
+    try:
+        args.function(args)
+    except InvalidPathError as error:
+        parser.error(str(error))
+    except BrokenPipeError:
+        # The reader of stdout went away, e.g. `| head`;
+        # silence the error Python raises when flushing at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if args.metrics == 'json':
+            sys.stderr.write(METRICS.to_json() + '\n')
+        elif args.metrics == 'prometheus':
+            sys.stderr.write(METRICS.to_prometheus())
+        if args.metrics:
+            METRICS.disable()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,195 @@
+"""
+Perform searches against the catalog, from an asyncio event loop
+
+This isn't native asynchronous I/O:
+requests are still sent by the blocking `requests` session of `Search`,
+each in a pool of threads, and awaited from the event loop.
+An asyncio HTTP client (e.g. aiohttp) would avoid a thread per request,
+but isn't a dependency of this package;
+so concurrency is bounded by the size of the pool.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .metrics import COUNT_BUCKETS
+from .metrics import METRICS
+from .search import Search
+from .search import SearchResultParser
+
+
+async def _iterate(items):
+    """
+    Iterate over either an async or a plain iterable
+    """
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+class RateLimiter:
+    """
+    Space out the start of requests to each host
+
+    Each host gets at most `rate` requests per second;
+    requests beyond that wait for their turn, in order.
+    """
+
+    def __init__(self, rate):
+        """
+        Limit each host to `rate` requests per second
+        """
+        self.interval = 1 / rate
+        self._next = {}
+
+    async def wait(self, url):
+        """
+        Wait until the host of a URL may be sent another request
+        """
+        host = urlsplit(url).netloc
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next.get(host, now))
+        # Reserve this slot before waiting, so concurrent callers
+        # queue up behind it rather than all waking at once.
+        self._next[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class ThreadedAsyncSearch:
+    """
+    Perform searches and fetch records from an asyncio event loop
+
+    URLs are built, and pages and records parsed,
+    exactly as by the synchronous `Search`.
+    Requests are sent over its pooled session, in a pool of threads,
+    so many searches can run concurrently in one event loop.
+    """
+
+    def __init__(self, concurrency=None, rate=None, search=Search):
+        """
+        Configure the limits on requests
+
+        - `concurrency` is the number of requests in flight at once,
+          across all searches; defaults to `Search.WORKERS`.
+        - `rate` is the maximum number of requests per second, per host;
+          by default, requests aren't rate-limited.
+        - `search` is the synchronous `Search` class to share
+        """
+        self.search = search
+        self.concurrency = concurrency or search.WORKERS
+        search.session(self.concurrency)
+        self.limiter = None
+        if rate:
+            self.limiter = RateLimiter(rate)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Stop the pool of threads
+        """
+        self._executor.shutdown(wait=False)
+
+    async def _run(self, function, *args):
+        """
+        Run a blocking function in the pool of threads
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, function, *args)
+
+    async def _get(self, url):
+        """
+        Fetch the text of a URL, within the limits on requests
+        """
+        async with self._semaphore:
+            if self.limiter is not None:
+                await self.limiter.wait(url)
+            return await self._run(self.search._get, url)
+
+    async def fetch_marc_record(self, url):
+        """
+        Fetch a MARC record from a domain-less root URL
+        of a catalogue item
+        """
+        text = await self._get(self.search.record_url(url))
+        return await self._run(self.search.parse_marc_record, text)
+
+    async def fetch_marc_records(self, urls):
+        """
+        Fetch many MARC records concurrently,
+        from an iterable or async iterable of domain-less root URLs
+        (e.g. from `query_title`)
+
+        Records are yielded as soon as each is fetched,
+        so they may not be in the same order as the URLs.
+        """
+        pending = set()
+        try:
+            async for url in _iterate(urls):
+                pending.add(asyncio.ensure_future(self.fetch_marc_record(url)))
+                if len(pending) >= 2 * self.concurrency:
+                    done, pending = await asyncio.wait(
+                        pending,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    for task in done:
+                        yield task.result()
+            for task in asyncio.as_completed(pending):
+                yield await task
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def query_title(self, search_title, medium=None, is_video=True, max_pages=None):
+        """
+        Search the catalogue for items by title
+
+        Each next page of results is requested
+        as soon as its link is found, while this page's links are consumed.
+        """
+        if max_pages is None:
+            max_pages = self.search.MAX_PAGES
+        url = self.search.search_url(search_title, medium, is_video)
+        urls = set([url])
+        pages = 0
+        page = asyncio.ensure_future(self._page(url))
+        try:
+            while page is not None:
+                parser = await page
+                page = None
+                pages += 1
+                if len(parser.links) == 0:
+                    break
+                url = None
+                if parser.next:
+                    url = self.search.page_url(parser.next)
+                if url and self.search._follow(url, urls, max_pages):
+                    urls.add(url)
+                    page = asyncio.ensure_future(self._page(url))
+                for link in parser.links:
+                    yield link
+        finally:
+            if page is not None:
+                page.cancel()
+            if METRICS.enabled:
+                METRICS.observe('search_pages_per_query', pages, buckets=COUNT_BUCKETS)
+
+    async def _page(self, url):
+        """
+        Fetch and parse a page of results
+        """
+        text = await self._get(url)
+        parser = SearchResultParser()
+        parser.feed(text)
+        parser.close()
+        return parser
@@ -0,0 +1,293 @@
+"""
+Binary MARC records, in ISO 2709 form
+
+Each record is laid out as:
+- a 24-character leader, beginning with the record length
+- a directory of 12-character entries, one per field:
+  a 3-digit tag, a 4-digit length, and a 5-digit starting position
+- the field data, beginning at the base address from the leader
+
+For fuller explanation, see the MARC 21 Specifications [1].
+
+[1] https://www.loc.gov/marc/specifications/specrecstruc.html
+"""
+from contextlib import contextmanager
+import time
+
+from .errors import InvalidRecordError
+from .fields import Field
+from .fields import FieldWithSubfields
+from .leader import Leader
+from .metrics import METRICS
+from .record import MarcRecord
+
+
+ENCODING = 'utf-8'
+FIELD_TERMINATOR = b'\x1e'
+RECORD_TERMINATOR = b'\x1d'
+SUBFIELD_DELIMITER = '\x1f'
+LEADER_LENGTH = 24
+DIRECTORY_ENTRY_LENGTH = 12
+RECORD_LENGTH_LENGTH = 5
+BASE_ADDRESS_LENGTH = 5
+FIELD_LENGTH_LENGTH = 4
+FIELD_START_LENGTH = 5
+
+
+class MarcRecordBinary(MarcRecord):
+    """
+    Binary MARC records
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data, tags=None):
+        """
+        Create a new record object from the bytes of a single record
+
+        Fields are sliced directly from the data,
+        using the offsets in the directory.
+        Optionally, only parse the fields with the given tags.
+        TODO: Support MARC-8 encoded records
+        """
+        enabled = METRICS.enabled
+        if enabled:
+            start = time.perf_counter()
+        data = memoryview(data)
+        if len(data) < LEADER_LENGTH:
+            raise InvalidRecordError('Record is shorter than its leader')
+        try:
+            leader = bytes(data[:LEADER_LENGTH]).decode(ENCODING)
+        except UnicodeDecodeError:
+            raise InvalidRecordError('Leader is not valid {}'.format(ENCODING))
+        self.leader = Leader.from_data(leader)
+        self.fields = []
+        try:
+            base_address = int(self.leader.base_address_of_data, 10)
+        except ValueError:
+            base_address = None
+        if base_address is None or base_address <= LEADER_LENGTH:
+            raise InvalidRecordError(
+                "Invalid base address: '{address}'".format(
+                    address=self.leader.base_address_of_data,
+                )
+            )
+        try:
+            directory = bytes(data[LEADER_LENGTH:base_address - 1]).decode(ENCODING)
+        except UnicodeDecodeError:
+            raise InvalidRecordError('Directory is not valid {}'.format(ENCODING))
+        for index in range(0, len(directory), DIRECTORY_ENTRY_LENGTH):
+            entry = directory[index:index + DIRECTORY_ENTRY_LENGTH]
+            if len(entry) < DIRECTORY_ENTRY_LENGTH:
+                break
+            tag = entry[0:3]
+            if tags is not None and tag not in tags:
+                continue
+            try:
+                length = int(entry[3:7], 10)
+                offset = base_address + int(entry[7:12], 10)
+            except ValueError:
+                raise InvalidRecordError(
+                    "Invalid directory entry: '{entry}'".format(entry=entry)
+                )
+            # Exclude the field terminator
+            line = bytes(data[offset:offset + length - 1]).decode(ENCODING, 'replace')
+            field = self._parse_field(tag, line)
+            if enabled:
+                name = 'marc_fields_parsed_total' if field else 'marc_fields_dropped_total'
+                METRICS.increment(name, tag=tag)
+            if field:
+                self.fields.append(field)
+        if enabled:
+            METRICS.increment('marc_records_parsed_total')
+            METRICS.observe('marc_record_parse_seconds', time.perf_counter() - start)
+
+    def _parse_field(self, tag, line):
+        """
+        Parse a single field from the data of its directory entry
+        """
+        if self.is_control_tag(tag):
+            indicator = None
+        else:
+            indicator = (line[0:1] or ' ', line[1:2] or ' ')
+            line = line[2:]
+        if not line:
+            return None
+        field = Field.from_data(
+            tag,
+            indicator,
+            line,
+            self.leader,
+            separator=SUBFIELD_DELIMITER,
+        )
+        return field
+
+    def __bytes__(self):
+        """
+        Serialize a record as binary data,
+        first the leader, then the directory, then each of the fields
+
+        The record length and base address in the leader
+        are recalculated to match.
+        """
+        directory = []
+        body = []
+        position = 0
+        for field in self.fields:
+            data = self._bytes_field(field)
+            name = 'field {tag}'.format(tag=field.tag)
+            self._check_width('Length of ' + name, len(data), FIELD_LENGTH_LENGTH)
+            self._check_width('Start of ' + name, position, FIELD_START_LENGTH)
+            directory.append(
+                "{tag}{length:04d}{start:05d}".format(
+                    tag=field.tag,
+                    length=len(data),
+                    start=position,
+                ).encode(ENCODING)
+            )
+            body.append(data)
+            position += len(data)
+        directory = b''.join(directory) + FIELD_TERMINATOR
+        base_address = LEADER_LENGTH + len(directory)
+        length = base_address + position + len(RECORD_TERMINATOR)
+        self._check_width('Base address', base_address, BASE_ADDRESS_LENGTH)
+        self._check_width('Record length', length, RECORD_LENGTH_LENGTH)
+        leader = self.leader._str_data()
+        leader = "{length:05d}{middle}{base_address:05d}{end}".format(
+            length=length,
+            middle=leader[5:12],
+            base_address=base_address,
+            end=leader[17:],
+        )
+        data = b''.join(
+            [leader.encode(ENCODING), directory] + body + [RECORD_TERMINATOR]
+        )
+        return data
+
+    @staticmethod
+    def _check_width(name, value, width):
+        """
+        Ensure a number fits the fixed width of its digits in the record
+        """
+        if value >= 10 ** width:
+            raise InvalidRecordError(
+                "{name} is too large for {width} digits: {value}".format(
+                    name=name,
+                    width=width,
+                    value=value,
+                )
+            )
+
+    def _bytes_field(self, field):
+        """
+        Serialize a single field, including its terminator
+        """
+        if isinstance(field, FieldWithSubfields):
+            data = field._str_data(separator=SUBFIELD_DELIMITER)
+        else:
+            data = field._str_data()
+        if not self.is_control_tag(field.tag):
+            data = field.indicator[0] + field.indicator[1] + data
+        data = data.encode(ENCODING) + FIELD_TERMINATOR
+        return data
+
+    @staticmethod
+    def is_binary(data):
+        """
+        Determine if data begins with a binary record
+
+        Binary records begin with their length, in digits;
+        text records begin with a leader literal.
+        """
+        prefix = bytes(data[:64]).lstrip()
+        return prefix[:1].isdigit()
+
+    @staticmethod
+    def is_control_tag(tag):
+        """
+        Determine if a tag is a control field, i.e. 001-009
+
+        Control fields have neither indicators nor subfields.
+        """
+        return tag[0:2] == '00'
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Create a new record object from bytes
+        """
+        instance = cls(data)
+        return instance
+
+    @classmethod
+    def from_file(cls, input_file):
+        """
+        Create a new record object from the first record in a binary file
+        """
+        with open(input_file, 'rb') as stream:
+            for record in cls.iter_records(stream):
+                return record
+        return None
+
+    @classmethod
+    def split_records(cls, stream):
+        """
+        Split a binary stream of 1+ records into the bytes of each record
+
+        Each record begins with its own length,
+        so only a single record is ever read into memory.
+        """
+        while True:
+            prefix = stream.read(RECORD_LENGTH_LENGTH)
+            if not prefix.strip():
+                break
+            try:
+                length = int(prefix, 10)
+            except ValueError:
+                raise InvalidRecordError(
+                    "Invalid record length: {prefix!r}".format(
+                        prefix=prefix,
+                    )
+                )
+            if length < LEADER_LENGTH:
+                # Checked before reading, as a negative size reads the whole stream
+                raise InvalidRecordError(
+                    "Record is shorter than its leader: {prefix!r}".format(
+                        prefix=prefix,
+                    )
+                )
+            data = prefix + stream.read(length - RECORD_LENGTH_LENGTH)
+            if len(data) < length:
+                raise InvalidRecordError('Record is truncated')
+            yield data
+
+    @classmethod
+    def iter_records(cls, stream):
+        """
+        Iterate over each record in a binary stream of 1+ records
+        """
+        for data in cls.split_records(stream):
+            yield cls(data)
+
+    @classmethod
+    def iter_file(cls, input_file):
+        """
+        Iterate over each record in a binary file of 1+ records
+        """
+        with open(input_file, 'rb') as stream:
+            for record in cls.iter_records(stream):
+                yield record
+
+
+@contextmanager
+def open_records(input_file):
+    """
+    Open a file of records, either text or binary,
+    yielding the stream along with whether it holds binary records
+
+    Binary files are opened as bytes, and text files as text.
+    """
+    with open(input_file, 'rb') as stream:
+        is_binary = MarcRecordBinary.is_binary(stream.read(64))
+    with open(input_file, 'rb' if is_binary else 'r') as stream:
+        yield (stream, is_binary)
@@ -0,0 +1,141 @@
+"""
+Parse many records in parallel, across a pool of processes
+"""
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures import wait
+from itertools import islice
+from os import cpu_count
+
+from .. import settings
+from .binary import MarcRecordBinary
+from .binary import open_records
+from .metrics import METRICS
+from .positions import code_layouts
+from .positions import leader_layout
+from .positions import material_layouts
+from .record import MarcRecordText
+
+
+def _initialize():
+    """
+    Load the schema and compiled layouts, once per worker process
+    """
+    settings.SCHEMA_JSON
+    leader_layout()
+    material_layouts()
+    for tag in ('006', '007'):
+        code_layouts(tag)
+
+
+def _parse_chunk(cls, chunk):
+    """
+    Parse a chunk of serialized records, in a worker process
+    """
+    return [
+        cls(data)
+        for data in chunk
+    ]
+
+
+class BulkParser:
+    """
+    Parse a stream of many records across a pool of processes
+
+    The stream is split into chunks of serialized records,
+    which are parsed by worker processes and then yielded in turn.
+    Only a bounded number of chunks are in flight at once,
+    so memory use doesn't grow with the size of the stream.
+    """
+
+    def __init__(self, workers=None, ordered=True, chunk_size=100):
+        """
+        Configure the pool
+
+        - `workers` is the number of processes; defaults to one per CPU.
+          With a single worker, or while metrics are enabled,
+          records are parsed in this process,
+          as worker processes don't share its metrics.
+        - `ordered` yields records in the order of the stream;
+          otherwise, each chunk is yielded as soon as it's parsed.
+        - `chunk_size` is the number of records sent to a worker at once
+        """
+        self.workers = workers
+        self.ordered = ordered
+        self.chunk_size = chunk_size
+
+    def parse(self, stream, cls=MarcRecordText):
+        """
+        Parse each record in a stream,
+        of the type read by the given record class
+        """
+        chunks = self._chunks(cls.split_records(stream))
+        workers = self.workers or cpu_count() or 1
+        if workers == 1 or METRICS.enabled:
+            for chunk in chunks:
+                for record in _parse_chunk(cls, chunk):
+                    yield record
+            return
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize,
+        ) as executor:
+            # Keep every worker busy, with one chunk queued behind each
+            window = 2 * workers
+            if self.ordered:
+                results = self._ordered(executor, cls, chunks, window)
+            else:
+                results = self._unordered(executor, cls, chunks, window)
+            for records in results:
+                for record in records:
+                    yield record
+
+    def parse_file(self, input_file):
+        """
+        Parse each record in a file, either text or binary
+        """
+        with open_records(input_file) as (stream, is_binary):
+            cls = MarcRecordBinary if is_binary else MarcRecordText
+            for record in self.parse(stream, cls=cls):
+                yield record
+
+    def _chunks(self, items):
+        """
+        Group serialized records into lists of `chunk_size`
+        """
+        items = iter(items)
+        while True:
+            chunk = list(islice(items, self.chunk_size))
+            if not chunk:
+                break
+            yield chunk
+
+    @staticmethod
+    def _ordered(executor, cls, chunks, window):
+        """
+        Yield parsed chunks in the order they were submitted
+        """
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_parse_chunk, cls, chunk))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    @staticmethod
+    def _unordered(executor, cls, chunks, window):
+        """
+        Yield parsed chunks as soon as each is done
+        """
+        pending = set()
+        for chunk in chunks:
+            pending.add(executor.submit(_parse_chunk, cls, chunk))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
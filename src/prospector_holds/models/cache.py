@@ -0,0 +1,464 @@
+"""
+Persistent caches, stored under the application's cache directory
+"""
+import hashlib
+import json
+import re
+from os import getpid
+from os import makedirs
+from os import path
+from os import remove
+from os import replace
+from os import scandir
+from os import utime
+from sys import intern
+from threading import Lock
+from threading import get_ident
+import time
+
+from ..settings import _CACHE
+from .fields import Field
+from .fields import FieldWithPositions
+from .fields import FieldWithSubfields
+from .leader import Leader
+from .metrics import METRICS
+from .record import MarcRecordText
+
+
+class DiskCache:
+    """
+    A size-bounded cache of files on disk, keyed by string
+
+    When the total size grows past `max_size` bytes,
+    the least-recently-used entries are evicted;
+    use is tracked by the modification time of each file.
+    """
+
+    def __init__(self, directory, max_size):
+        """
+        Create a new cache in a directory
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self._size = None
+        self._lock = Lock()
+
+    def _path(self, key):
+        """
+        Get the path of the file for a key
+        """
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return path.join(self.directory, digest[:2], digest)
+
+    def get(self, key):
+        """
+        Get the data stored for a key, or None if there isn't any
+        """
+        filename = self._path(key)
+        try:
+            with open(filename, 'rb') as stream:
+                data = stream.read()
+            # Mark the entry as recently used
+            utime(filename)
+        except OSError:
+            return None
+        return data
+
+    def set(self, key, data):
+        """
+        Store data for a key, evicting old entries if needed
+        """
+        filename = self._path(key)
+        makedirs(path.dirname(filename), exist_ok=True)
+        previous = self._file_size(filename)
+        # Write to a temporary file first, so concurrent readers never
+        # see a partially-written entry.
+        temporary = "{filename}.{pid}.{thread}".format(
+            filename=filename,
+            pid=getpid(),
+            thread=get_ident(),
+        )
+        with open(temporary, 'wb') as stream:
+            stream.write(data)
+        replace(temporary, filename)
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data) - previous
+        self._evict()
+
+    def delete(self, key):
+        """
+        Remove the data stored for a key, if any
+        """
+        filename = self._path(key)
+        size = self._file_size(filename)
+        try:
+            remove(filename)
+        except OSError:
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size -= size
+
+    def size(self):
+        """
+        Get the total size of all entries, in bytes
+        """
+        with self._lock:
+            if self._size is None:
+                self._size = sum(
+                    entry.stat().st_size
+                    for entry in self._entries()
+                )
+            return self._size
+
+    def _evict(self):
+        """
+        Remove the least-recently-used entries,
+        until the cache fits within its maximum size
+        """
+        if self.size() <= self.max_size:
+            return
+        with self._lock:
+            entries = []
+            for entry in self._entries():
+                try:
+                    status = entry.stat()
+                except OSError:
+                    continue
+                entries.append((status.st_mtime_ns, status.st_size, entry.path))
+            entries.sort()
+            size = sum(entry[1] for entry in entries)
+            for (_, entry_size, filename) in entries:
+                if size <= self.max_size:
+                    break
+                try:
+                    remove(filename)
+                except OSError:
+                    continue
+                size -= entry_size
+            self._size = size
+
+    def _entries(self):
+        """
+        Find the file of every entry in the cache
+        """
+        try:
+            directories = list(scandir(self.directory))
+        except OSError:
+            return
+        for directory in directories:
+            if not directory.is_dir():
+                continue
+            # Temporary files are included, so any left behind
+            # by an interrupted write are still counted and evicted;
+            # one being written is the most recent, so evicted last.
+            for entry in scandir(directory.path):
+                if entry.is_file():
+                    yield entry
+
+    @staticmethod
+    def _file_size(filename):
+        """
+        Get the size of a file, or 0 if it doesn't exist
+        """
+        try:
+            return path.getsize(filename)
+        except OSError:
+            return 0
+
+
+class ResponseCache:
+    """
+    A persistent cache of HTTP responses, keyed by URL
+
+    Responses younger than `ttl` seconds are served from the cache.
+    Older responses are revalidated with the server using their
+    ETag and Last-Modified headers; if unchanged, the server replies
+    `304 Not Modified` and the cached body is reused.
+    If the server replies with an error instead,
+    the stale response is served rather than the error.
+    """
+
+    DIRECTORY = path.join(_CACHE, 'http')
+    TTL = 24 * 60 * 60
+    MAX_SIZE = 256 * 1024 * 1024
+
+    def __init__(self, directory=None, ttl=None, max_size=None):
+        """
+        Create a new cache, by default under the cache directory
+        """
+        if directory is None:
+            directory = self.DIRECTORY
+        if ttl is None:
+            ttl = self.TTL
+        if max_size is None:
+            max_size = self.MAX_SIZE
+        self.ttl = ttl
+        self.cache = DiskCache(directory, max_size)
+
+    def get(self, session, url):
+        """
+        Fetch the text of a URL, from the cache if possible
+        """
+        entry = self._load(url)
+        if entry is not None:
+            (metadata, body) = entry
+            if time.time() - metadata['time'] < self.ttl:
+                if METRICS.enabled:
+                    METRICS.increment('search_cache_hits_total')
+                return self._decode(metadata, body)
+        headers = {}
+        if entry is not None:
+            if metadata.get('etag'):
+                headers['If-None-Match'] = metadata['etag']
+            if metadata.get('last_modified'):
+                headers['If-Modified-Since'] = metadata['last_modified']
+        with METRICS.timer('search_request_seconds'):
+            r = session.get(url, headers=headers)
+        if METRICS.enabled:
+            METRICS.increment('search_requests_total')
+            METRICS.increment('search_response_bytes_total', len(r.content))
+        if r.status_code == 304 and entry is not None:
+            if METRICS.enabled:
+                METRICS.increment('search_cache_revalidated_total')
+            metadata['time'] = time.time()
+            self._store(url, metadata, body)
+            return self._decode(metadata, body)
+        if r.status_code == 200:
+            metadata = {
+                'time': time.time(),
+                'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'),
+                'encoding': r.encoding or r.apparent_encoding,
+            }
+            self._store(url, metadata, r.content)
+        elif entry is not None:
+            if METRICS.enabled:
+                METRICS.increment('search_cache_stale_total')
+            return self._decode(metadata, body)
+        return r.text
+
+    def _load(self, url):
+        """
+        Load the metadata and body of a cached response
+        """
+        data = self.cache.get(url)
+        if data is None:
+            return None
+        try:
+            (header, body) = data.split(b'\n', 1)
+            metadata = json.loads(header)
+        except ValueError:
+            return None
+        return (metadata, body)
+
+    def _store(self, url, metadata, body):
+        """
+        Store the metadata and body of a response,
+        as a line of JSON followed by the raw body
+        """
+        header = json.dumps(metadata).encode('utf-8')
+        self.cache.set(url, header + b'\n' + body)
+
+    @staticmethod
+    def _decode(metadata, body):
+        """
+        Decode a cached body to text
+        """
+        encoding = metadata.get('encoding') or 'utf-8'
+        return body.decode(encoding, 'replace')
+
+
+class RecordStore:
+    """
+    A persistent store of parsed records,
+    keyed by control number (001) and date of latest transaction (005)
+
+    Records are stored as JSON: the data of the leader,
+    then the type, tag, indicators and data of each field.
+    Loading a record rebuilds those objects directly,
+    without parsing any text;
+    unlike a pickle, a tampered or corrupt entry can't run any code.
+    Any change to a record should update its 005 field,
+    and so its key.
+    """
+
+    DIRECTORY = path.join(_CACHE, 'records')
+    MAX_SIZE = 256 * 1024 * 1024
+
+    """
+    Bump this whenever the stored form of a record changes
+    """
+    VERSION = 3
+
+    """
+    The types of field that may be stored, by name
+    """
+    FIELD_TYPES = {
+        cls.__name__: cls
+        for cls in (Field, FieldWithPositions, FieldWithSubfields)
+    }
+
+    """
+    The data of the 001 and 005 fields, with any indicators,
+    split as by `record._REGEX_FIELD`
+    """
+    _REGEX_CONTROL_NUMBER = re.compile(r'^001.{4}(.*?)\s*$', re.MULTILINE)
+    _REGEX_TIMESTAMP = re.compile(r'^005.{4}(.*?)\s*$', re.MULTILINE)
+
+    def __init__(self, directory=None, max_size=None):
+        """
+        Create a new store, by default under the cache directory
+        """
+        if directory is None:
+            directory = self.DIRECTORY
+        if max_size is None:
+            max_size = self.MAX_SIZE
+        self.cache = DiskCache(directory, max_size)
+
+    @classmethod
+    def key(cls, control_number, timestamp):
+        """
+        Build the key of a record from its 001 and 005 values
+        """
+        return "v{version}:{control_number}:{timestamp}".format(
+            version=cls.VERSION,
+            control_number=control_number,
+            timestamp=timestamp,
+        )
+
+    @classmethod
+    def key_from_string(cls, input_text):
+        """
+        Build the key of a record from its text, without parsing it
+
+        Returns None if the record has no control number.
+        """
+        control_number = cls._REGEX_CONTROL_NUMBER.search(input_text)
+        if not control_number or not control_number.group(1):
+            return None
+        timestamp = cls._REGEX_TIMESTAMP.search(input_text)
+        return cls.key(
+            control_number.group(1),
+            timestamp.group(1) if timestamp else '',
+        )
+
+    @classmethod
+    def key_from_record(cls, record):
+        """
+        Build the key of a parsed record
+
+        Returns None if the record has no control number.
+        """
+        values = {}
+        for tag in ('001', '005'):
+            for field in record.get_fields(tag):
+                values[tag] = field._str_data().strip()
+                break
+        if not values.get('001'):
+            return None
+        return cls.key(values['001'], values.get('005', ''))
+
+    def get(self, key):
+        """
+        Load a stored record, or None if it isn't stored
+        """
+        data = self.cache.get(key)
+        if data is None:
+            return None
+        try:
+            return self._load(data)
+        except (ValueError, TypeError, KeyError):
+            # Corrupt entries are simply parsed again
+            self.cache.delete(key)
+            return None
+
+    def put(self, record, key=None):
+        """
+        Store a parsed record
+        """
+        if key is None:
+            key = self.key_from_record(record)
+        if key is None:
+            return
+        self.cache.set(key, self._dump(record))
+
+    @staticmethod
+    def _dump(record):
+        """
+        Serialize a parsed record, as JSON
+        """
+        return json.dumps(
+            [
+                record.leader._str_data(),
+                [
+                    [type(field).__name__, field.tag, field.indicator, field.data]
+                    for field in record.fields
+                ],
+            ],
+            ensure_ascii=False,
+            separators=(',', ':'),
+        ).encode('utf-8')
+
+    @classmethod
+    def _load(cls, data):
+        """
+        Rebuild a parsed record from its JSON
+        """
+        (leader, entries) = json.loads(data)
+        if not isinstance(leader, str):
+            raise TypeError('Leader is not a string')
+        field_types = cls.FIELD_TYPES
+        fields = []
+        for (name, tag, indicator, values) in entries:
+            fields.append(field_types[name](
+                intern(tag),
+                tuple(indicator),
+                tuple(map(tuple, values)),
+            ))
+        record = MarcRecordText.__new__(MarcRecordText)
+        record.leader = Leader.from_data(leader)
+        record.fields = fields
+        return record
+
+    def from_string(self, input_text):
+        """
+        Create a new record object from a text string,
+        loading it from the store if it's unchanged
+        """
+        key = self.key_from_string(input_text)
+        if key is not None:
+            record = self.get(key)
+            if record is not None:
+                return record
+        record = MarcRecordText.from_string(input_text)
+        if key is not None:
+            self.put(record, key)
+        return record
+
+    def warm(self, input_files):
+        """
+        Parse and store every record in the given text files,
+        returning the number of records stored
+        """
+        count = 0
+        for input_file in input_files:
+            count += self.put_records(MarcRecordText.iter_file(input_file))
+        return count
+
+    def put_records(self, records):
+        """
+        Store each of many parsed records,
+        returning the number stored
+
+        Records without a control number aren't stored.
+        """
+        count = 0
+        for record in records:
+            key = self.key_from_record(record)
+            if key is None:
+                continue
+            self.put(record, key)
+            count += 1
+        return count
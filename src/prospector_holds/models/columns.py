@@ -0,0 +1,209 @@
+"""
+Export records into columns, as batches of NumPy structured arrays
+
+Each record becomes one row, with columns for:
+- the leader, and each of its positions
+- the 008 field, and each of the positions common to all materials
+- any selected control fields (e.g. `001`) or subfields (e.g. `245$a`)
+
+Positional columns are fixed-width byte strings,
+sliced from the leader and 008 of a whole batch at once,
+so they can be compared and filtered vectorized.
+"""
+from itertools import islice
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .positions import FIXED_LENGTH_DATA_WIDTH
+from .positions import UNDEFINED
+from .positions import leader_layout
+from .positions import slice_bytes
+from .positions import type_layout
+
+
+_LEADER_WIDTH = 24
+
+
+def _subfield(fields, code):
+    """
+    Get the first value of a subfield, among a list of fields
+    """
+    for field in fields:
+        for (key, value) in field.data:
+            if key == code:
+                return value
+    return ''
+
+
+def _control(fields):
+    """
+    Get the data of the first of a list of control fields
+    """
+    for field in fields:
+        return field._str_data()
+    return ''
+
+
+class ColumnExporter:
+    """
+    Convert a stream of records into batches of structured arrays
+    """
+
+    """
+    The number of records in each batch
+    """
+    BATCH_SIZE = 1024
+
+    """
+    The maximum number of characters kept from each selected field
+    """
+    WIDTH = 64
+
+    def __init__(self, columns=(), batch_size=None, width=None):
+        """
+        Configure the columns to export
+
+        - `columns` are the extra fields to export, each either
+          a control field tag (e.g. `001`)
+          or a tag and subfield code (e.g. `245$a`).
+          Only the first value of each is kept,
+          and each may only be given once;
+          the leader and 008 columns (e.g. `LDR`) are always exported.
+        - `batch_size` is the number of records in each batch
+        - `width` is the maximum number of characters of each extra column
+        """
+        if numpy is None:
+            raise ImportError('Exporting columns requires numpy')
+        self.columns = tuple(columns)
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.width = width or self.WIDTH
+        self.leader_layout = tuple(
+            position
+            for position in leader_layout()
+            if position[0] != UNDEFINED
+        )
+        self.material_layout = tuple(
+            position
+            for position in type_layout('008', 'All Materials')
+            if position[0] != UNDEFINED
+        )
+        formats = [
+            ('LDR', 'S{}'.format(_LEADER_WIDTH)),
+        ]
+        for (key, start, stop) in self.leader_layout:
+            formats.append(('LDR/' + key, 'S{}'.format(stop - start)))
+        formats.append(('008', 'S{}'.format(FIXED_LENGTH_DATA_WIDTH)))
+        for (key, start, stop) in self.material_layout:
+            formats.append(('008/' + key, 'S{}'.format(stop - start)))
+        reserved = set(name for (name, _) in formats)
+        for (index, column) in enumerate(self.columns):
+            if column in reserved:
+                raise ValueError(
+                    "Column is always exported: '{column}'".format(column=column)
+                )
+            if column in self.columns[:index]:
+                raise ValueError(
+                    "Column is repeated: '{column}'".format(column=column)
+                )
+            formats.append((column, 'U{}'.format(self.width)))
+        self.dtype = numpy.dtype(formats)
+
+    def export(self, records):
+        """
+        Convert each batch of records into a structured array
+        """
+        records = iter(records)
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            yield self.to_array(batch)
+
+    def to_array(self, records):
+        """
+        Convert a list of records into a single structured array
+        """
+        array = numpy.zeros(len(records), dtype=self.dtype)
+        self._positions(
+            array,
+            'LDR',
+            [
+                record.leader._str_data()
+                for record in records
+            ],
+            _LEADER_WIDTH,
+            self.leader_layout,
+        )
+        self._positions(
+            array,
+            '008',
+            [
+                _control(record.get_fields('008'))
+                for record in records
+            ],
+            FIXED_LENGTH_DATA_WIDTH,
+            self.material_layout,
+        )
+        for column in self.columns:
+            (tag, _, code) = column.partition('$')
+            if code:
+                values = [
+                    _subfield(record.get_fields(tag), code)
+                    for record in records
+                ]
+            else:
+                values = [
+                    _control(record.get_fields(tag))
+                    for record in records
+                ]
+            array[column] = values
+        return array
+
+    @staticmethod
+    def _positions(array, name, lines, width, layout):
+        """
+        Fill a column of fixed-width lines, and a column for each position
+
+        The lines are viewed as a matrix of bytes, one row per record,
+        and each position is sliced from that as a block of columns.
+        """
+        lines = numpy.array(
+            [
+                line.encode('ascii', 'replace')
+                for line in lines
+            ],
+            dtype='S{}'.format(width),
+        )
+        array[name] = lines
+        matrix = lines.view(numpy.uint8).reshape(len(lines), width)
+        for (key, start, stop) in layout:
+            array[name + '/' + key] = slice_bytes(matrix, start, stop)
+
+    def write(self, records, output_file):
+        """
+        Export records into a file, one batch at a time,
+        returning the number of records written
+
+        Batches are appended as consecutive `.npy` arrays;
+        read them back with `read`.
+        """
+        count = 0
+        with open(output_file, 'wb') as stream:
+            for array in self.export(records):
+                numpy.save(stream, array, allow_pickle=False)
+                count += len(array)
+        return count
+
+    @staticmethod
+    def read(input_file):
+        """
+        Read each batch of records from an exported file
+        """
+        if numpy is None:
+            raise ImportError('Exporting columns requires numpy')
+        with open(input_file, 'rb') as stream:
+            while stream.peek(1):
+                yield numpy.load(stream, allow_pickle=False)
@@ -44,3 +44,17 @@ class MissingSettingsKeyError(KeyError):
             example=example,
         )
         raise cls(message)
+
+
+class InvalidRecordError(ValueError):
+    """
+    A custom version of ValueError when
+    a serialized record is malformed
+    """
+
+
+class InvalidPathError(ValueError):
+    """
+    A custom version of ValueError when
+    a path expression is malformed, or names an unknown field
+    """
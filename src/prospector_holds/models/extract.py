@@ -0,0 +1,249 @@
+"""
+Extract values from records by path expressions, without parsing them whole
+
+Each path names a field, and optionally a part of it:
+- `245`: the data of each 245 field, as it appears in a .mrk file
+- `245$a`: each value of subfield `a`, of each 245 field
+- `008/07-10`: positions 07 through 10 (inclusive) of each 008 field
+- `LDR/06`: position 06 of the leader
+
+Paths are compiled once; then, from the raw text of each record,
+only the fields with a wanted tag are joined and parsed.
+Subfields are split straight from the text;
+positional fields are cut to the layout they would be parsed with,
+so e.g. an 007 longer than its layout is cut short,
+and an 008 of an unknown form of material is empty,
+just as in a parsed record.
+Extracting from text gives the same values as from a parsed record.
+
+e.g.
+```
+extractor = PathExtractor(['001', '245$a', '008/35-37'])
+for values in extractor.iter_file('records.mrk'):
+    print(values)
+```
+"""
+import re
+
+from .. import settings
+from .binary import MarcRecordBinary
+from .binary import open_records
+from .errors import InvalidPathError
+from .fields import FieldWithPositions
+from .fields import FieldWithSubfields
+from .record import MarcRecordText
+
+
+"""
+A path expression: a tag, then either a subfield code or positions
+"""
+_REGEX_PATH = re.compile(
+    r'(?P<tag>[0-9A-Za-z]{3})'
+    r'(?:\$(?P<code>[0-9a-z])|/(?P<start>\d{1,2})(?:-(?P<stop>\d{1,2}))?)?'
+)
+
+_LEADER = 'LDR'
+
+
+class PathExtractor:
+    """
+    Pull the values of a fixed set of paths from each of many records
+    """
+
+    def __init__(self, paths, first=False, as_dict=False):
+        """
+        Compile a list of path expressions
+
+        Values are returned per record, in the order of the paths:
+        - by default, as a tuple of each path's values, each also a tuple,
+          as fields and subfields may repeat
+        - with `first`, as only the first value of each path, or None
+        - with `as_dict`, as a dict by path, rather than a tuple
+        """
+        self.paths = tuple(paths)
+        self.first = first
+        self.as_dict = as_dict
+        self._leader = []
+        self._targets = {}
+        self._subfields = set()
+        self._positional = set()
+        fields = settings.SCHEMA_JSON['fields']
+        for (index, path) in enumerate(self.paths):
+            (tag, code, start, stop) = self._compile(path)
+            if tag == _LEADER:
+                self._leader.append((index, start, stop))
+                continue
+            definition = fields.get(tag)
+            if definition is None:
+                raise InvalidPathError(
+                    "Unknown field in path: '{path}'".format(path=path)
+                )
+            if 'types' in definition:
+                self._positional.add(tag)
+            if 'subfields' in definition:
+                self._subfields.add(tag)
+                if start is not None:
+                    raise InvalidPathError(
+                        "Field has subfields, not positions: '{path}'".format(path=path)
+                    )
+            elif code is not None:
+                raise InvalidPathError(
+                    "Field has no subfields: '{path}'".format(path=path)
+                )
+            self._targets.setdefault(tag, []).append((index, code, start, stop))
+        self.tags = tuple(self._targets)
+
+    @staticmethod
+    def _compile(path):
+        """
+        Split a path into its tag, subfield code, and slice bounds
+        """
+        match = _REGEX_PATH.fullmatch(path)
+        if match is None:
+            raise InvalidPathError(
+                "Invalid path: '{path}'".format(path=path)
+            )
+        (tag, code, start, stop) = match.groups()
+        if tag == _LEADER and code is not None:
+            raise InvalidPathError(
+                "The leader has no subfields: '{path}'".format(path=path)
+            )
+        if start is not None:
+            stop = int(stop or start, 10) + 1
+            start = int(start, 10)
+            if stop <= start:
+                raise InvalidPathError(
+                    "Positions are out of order: '{path}'".format(path=path)
+                )
+        return (tag, code, start, stop)
+
+    def extract(self, input_text):
+        """
+        Extract the values of each path from the text of a single record
+        """
+        values = [[] for _ in self.paths]
+        (leader, tokens) = MarcRecordText.tokenize(input_text, tags=self._targets)
+        if not leader:
+            return self._result(values)
+        data = leader._str_data()
+        for (index, start, stop) in self._leader:
+            values[index].append(data[start:stop])
+        for (tag, indicator, body) in tokens:
+            if not body:
+                continue
+            targets = self._targets[tag]
+            if tag in self._subfields:
+                subfields = FieldWithSubfields.parse(body)
+                self._add_subfields(values, targets, subfields)
+            elif tag in self._positional:
+                layout = FieldWithPositions.layout(body, tag, leader)
+                # Layouts are contiguous from position 00,
+                # so the data of the parsed field is the line up to their end
+                data = body[:layout[-1][2]] if layout else ''
+                self._add_positions(values, targets, data)
+            else:
+                self._add_positions(values, targets, body)
+        return self._result(values)
+
+    def extract_record(self, record):
+        """
+        Extract the values of each path from an already-parsed record
+        """
+        values = [[] for _ in self.paths]
+        data = record.leader._str_data()
+        for (index, start, stop) in self._leader:
+            values[index].append(data[start:stop])
+        for (tag, targets) in self._targets.items():
+            for field in record.get_fields(tag):
+                if tag in self._subfields:
+                    self._add_subfields(values, targets, field.data)
+                else:
+                    self._add_positions(values, targets, field._str_data())
+        return self._result(values)
+
+    @staticmethod
+    def _add_subfields(values, targets, subfields):
+        """
+        Add the values of a field with subfields, for each of its paths
+        """
+        for (index, code, start, stop) in targets:
+            if code is None:
+                values[index].append(
+                    FieldWithSubfields.SUBFIELD_SEPARATOR
+                    + FieldWithSubfields.SUBFIELD_SEPARATOR.join([
+                        key + value
+                        for (key, value) in subfields
+                    ])
+                )
+                continue
+            for (key, value) in subfields:
+                if key == code:
+                    values[index].append(value)
+
+    @staticmethod
+    def _add_positions(values, targets, data):
+        """
+        Add the values of a field without subfields, for each of its paths
+
+        Positions past the end of the data are blank,
+        as trailing blanks are stripped from each line.
+        """
+        for (index, code, start, stop) in targets:
+            if start is None:
+                values[index].append(data)
+            else:
+                values[index].append(data[start:stop].ljust(stop - start))
+
+    def _result(self, values):
+        """
+        Shape the values of a record, as configured
+        """
+        if self.first:
+            values = [
+                value[0] if value else None
+                for value in values
+            ]
+        else:
+            values = [
+                tuple(value)
+                for value in values
+            ]
+        if self.as_dict:
+            return dict(zip(self.paths, values))
+        return tuple(values)
+
+    def iter_text(self, input_text):
+        """
+        Extract values from each record in a text string of 1+ records
+        """
+        for text in MarcRecordText.split_text(input_text):
+            yield self.extract(text)
+
+    def iter_records(self, stream):
+        """
+        Extract values from each record in a text stream of 1+ records
+        """
+        for lines in MarcRecordText.split_records(stream):
+            yield self.extract(''.join(lines))
+
+    def iter_binary(self, stream):
+        """
+        Extract values from each record in a binary stream of 1+ records
+
+        Records are parsed, but only the fields with a wanted tag.
+        """
+        for data in MarcRecordBinary.split_records(stream):
+            record = MarcRecordBinary(data, tags=self.tags)
+            yield self.extract_record(record)
+
+    def iter_file(self, input_file):
+        """
+        Extract values from each record in a file, either text or binary
+        """
+        with open_records(input_file) as (stream, is_binary):
+            if is_binary:
+                results = self.iter_binary(stream)
+            else:
+                results = self.iter_records(stream)
+            for values in results:
+                yield values
@@ -1,10 +1,20 @@
 """
 Represent field data of various forms in MARC21 records
 """
+from sys import intern
 from textwrap import wrap
 
-from ..settings import SCHEMA_JSON
-from ..utils import label_to_key
+from .. import settings
+from .metrics import METRICS
+from .positions import code_layouts
+from .positions import material_layouts
+from .positions import slice_positions
+
+
+"""
+Canonical indicator pairs, shared between all fields with the same pair
+"""
+_INDICATORS = {}
 
 
 class Field:
@@ -15,6 +25,12 @@ class Field:
     This is the simplest field type.
     """
 
+    __slots__ = (
+        'tag',
+        'indicator',
+        'data',
+    )
+
     def __init__(self, tag, indicator=None, data=None):
         """
         Create a new field, manually specifying data
@@ -22,8 +38,20 @@ class Field:
         self.tag = tag
         self.indicator = indicator or (' ', ' ')
         self.data = data or tuple()
-        definition = SCHEMA_JSON['fields'].get(tag)
-        self.repeatable = definition['repeatable']
+
+    def __reduce__(self):
+        """
+        Pickle the field compactly, as the arguments to recreate it
+        """
+        return (type(self), (self.tag, self.indicator, self.data))
+
+    @property
+    def repeatable(self):
+        """
+        Determine if the field may appear more than once in a record
+        """
+        definition = settings.SCHEMA_JSON['fields'].get(self.tag)
+        return definition['repeatable']
 
     @property
     def data_dict(self):
@@ -105,20 +133,43 @@ class Field:
         #    - one space character
         # TODO: Is any body required?
         if not line or len(line) < 8:
+            if METRICS.enabled:
+                METRICS.increment('marc_fields_dropped_total', tag=line[0:3])
             return None
         tag = line[0:3]
         indicator = (line[4], line[5])
         line = line[7:]
+        field = cls.from_data(tag, indicator, line, leader)
+        if METRICS.enabled:
+            if field is None:
+                METRICS.increment('marc_fields_dropped_total', tag=tag)
+            else:
+                METRICS.increment('marc_fields_parsed_total', tag=tag)
+        return field
+
+    @classmethod
+    def from_data(cls, tag, indicator, line, leader, separator=None):
+        """
+        Create a field of the appropriate type for its tag
 
-        if tag not in SCHEMA_JSON['fields']:
+        from its already-split tag, indicators, and body text;
+        subfields in the body are split on `separator`,
+        if other than the default.
+        """
+        # Share the tag and indicator objects between fields,
+        # rather than holding a copy per field.
+        tag = intern(tag)
+        if indicator:
+            indicator = _INDICATORS.setdefault(indicator, indicator)
+        definition = settings.SCHEMA_JSON['fields'].get(tag)
+        if definition is None:
             # TODO: log error
             return None
-        definition = SCHEMA_JSON['fields'].get(tag)
         if 'types' in definition:
             data = FieldWithPositions.parse(line, tag, definition, leader)
             _cls = FieldWithPositions
         elif 'subfields' in definition:
-            data = FieldWithSubfields.parse(line)
+            data = FieldWithSubfields.parse(line, separator)
             _cls = FieldWithSubfields
         else:
             data = Field.parse(line)
@@ -150,10 +201,12 @@ class FieldWithSubfields(Field):
     Used by the majority of field tags.
     """
 
+    __slots__ = ()
+
     SUBFIELD_SEPARATOR = '|'
 
     @classmethod
-    def parse(cls, line):
+    def parse(cls, line, separator=None):
         """
         Parse text to a field with subfield data
 
@@ -162,18 +215,22 @@ class FieldWithSubfields(Field):
         |asubfield|bsubfield
         ```
 
+        Optionally, split subfields on a separator other than '|'.
+
         # ASSUME: Sample MARC records appear to (often?) omit the
         # subfield indicator `$a`, if it's the first in the field
         """
-        if line[0] != cls.SUBFIELD_SEPARATOR:
-            line = cls.SUBFIELD_SEPARATOR + 'a' + line
-        fields = line.split(cls.SUBFIELD_SEPARATOR)
+        if separator is None:
+            separator = cls.SUBFIELD_SEPARATOR
+        if line[0] != separator:
+            line = separator + 'a' + line
+        fields = line.split(separator)
         del fields[0]
-        subfields = tuple(
+        subfields = tuple([
             (field[0], field[1:].strip())
             for field in fields
             if field
-        )
+        ])
         return subfields
 
     def _str_data(self, width=0, separator=None):
@@ -215,6 +272,8 @@ class FieldWithPositions(Field):
     - LDR
     """
 
+    __slots__ = ()
+
     @classmethod
     def parse(cls, line, tag, definition, leader):
         """
@@ -229,48 +288,31 @@ class FieldWithPositions(Field):
         We need to know which tag type we're parsing,
         since 008 fields are context-dependent based on the type of record.
         """
+        layout = cls.layout(line, tag, leader)
+        if layout is None:
+            return None
+        subfields = slice_positions(layout, line)
+        return subfields
+
+    @staticmethod
+    def layout(line, tag, leader):
+        """
+        Look up the layout of a line of positional data, or None if unknown
+
+        The layout of an 008 field depends on the type of record;
+        of a 006 or 007 field, on its own 00 position.
+        """
         if tag == '008':
             # Based on the type of record in the leader field,
             # we need to look up the appropriate data type.
-            type_of_record = leader.type_of_record
-            form_of_material1 = SCHEMA_JSON['fields']['LDR']['positions']['06']['codes'][type_of_record]['label']
-            form_of_material2 = None
-            for (key, _type) in SCHEMA_JSON['fields']['006']['types'].items():
-                if type_of_record in _type['positions']['00']['codes']:
-                    form_of_material2 = key
-                    break
-            if not form_of_material2:
-                return None
-            _type = dict(definition['types']['All Materials'])
-            _type.update(definition['types'][form_of_material2])
+            layouts = material_layouts()
+            code = leader.type_of_record
         else:  # tag in ('006', '007')
             # For all other tags, we can just look up the data type
             # based on the character in the 00 position.
-            types = definition['types']
-            types = types.values()
-            _type = filter(
-                lambda x: line[0] in x['positions'].get('00', {}).get('codes', {}),
-                types,
-            )
-            _type = list(_type)
-            if not len(_type):
-                return None
-            _type = _type[0]
-        data = []
-        for (offset, subtype) in _type['positions'].items():
-            # offset will be either:
-            # a single number, zero-padded to 2 digits
-            # or a range of two numbers (also zero-padded to 2 digits),
-            # separated by a hyphen.
-            offsets = offset.split('-')
-            if len(offsets) == 1:
-                offsets.append(offsets[0])
-            start, stop = map(lambda x: int(x, 10), offsets)
-            value = line[start:stop+1]
-            key = label_to_key(subtype['label'])
-            data.append((key, value))
-        subfields = tuple(data)
-        return subfields
+            layouts = code_layouts(tag)
+            code = line[0]
+        return layouts.get(code)
 
     def _str_data(self):
         """
@@ -0,0 +1,244 @@
+"""
+Filter many records by their fixed-length fields, vectorized
+
+A file is scanned once for the leader and 008 of each record,
+which are kept as matrices of bytes, one row per record;
+no record is parsed.
+Each position (e.g. `LDR/type_of_record`, `008/date_1`)
+is then a block of columns, compared across every record at once.
+
+e.g. all videos from 1960-1970 in English:
+```
+fixed = FixedFields.scan('records.mrk')
+mask = (
+    fixed.equals('LDR/type_of_record', 'g')
+    & fixed.between('008/date_1', '1960', '1970')
+    & fixed.equals('008/language', 'eng')
+)
+fixed.offsets[mask]
+```
+"""
+from bisect import bisect_right
+import mmap
+import re
+from os import stat
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .binary import DIRECTORY_ENTRY_LENGTH
+from .binary import FIELD_TERMINATOR
+from .binary import LEADER_LENGTH
+from .binary import MarcRecordBinary
+from .binary import RECORD_LENGTH_LENGTH
+from .errors import InvalidRecordError
+from .leader import LEADER_LITERALS
+from .positions import FIXED_LENGTH_DATA_WIDTH
+from .positions import UNDEFINED
+from .positions import leader_layout
+from .positions import slice_bytes
+from .positions import type_layout
+
+
+# Lines are matched from their preceding newline, rather than with `^`,
+# so the regex engine can skip ahead between candidates;
+# multiline `^` is an order of magnitude slower over a large file.
+# Leader lines may be indented, as for `MarcRecordText.split_records`.
+_LEADER_PATTERN = rb'[^\S\n]*(?:' + b'|'.join(
+    re.escape(literal.encode('ascii'))
+    for literal in LEADER_LITERALS
+) + rb')(?=\s|$) ?([^\r\n]*)'
+_REGEX_LEADER = re.compile(_LEADER_PATTERN)
+_REGEX_LEADER_LINE = re.compile(rb'\n' + _LEADER_PATTERN)
+_REGEX_FIXED_LENGTH_DATA_LINE = re.compile(rb'\n008.{4}([^\r\n]*)')
+
+
+class FixedFields:
+    """
+    The leader and 008 of many records, as matrices of bytes
+    """
+
+    def __init__(self, offsets, leaders, fixed):
+        """
+        Create a new object, manually specifying data
+
+        - `offsets` is an array of `(start, length)` pairs, one per record,
+          as for `RecordIndex`
+        - `leaders` is an array of the 24 bytes of each leader
+        - `fixed` is an array of the 40 bytes of each 008,
+          or empty if a record has none
+        """
+        if numpy is None:
+            raise ImportError('Filtering fixed fields requires numpy')
+        self.offsets = numpy.asarray(offsets, dtype=numpy.int64).reshape(-1, 2)
+        self.leaders = self._matrix(leaders, LEADER_LENGTH)
+        self.fixed = self._matrix(fixed, FIXED_LENGTH_DATA_WIDTH)
+        self.positions = {}
+        for (key, start, stop) in leader_layout():
+            if key != UNDEFINED:
+                self.positions['LDR/' + key] = (self.leaders, start, stop)
+        for (key, start, stop) in type_layout('008', 'All Materials'):
+            if key != UNDEFINED:
+                self.positions['008/' + key] = (self.fixed, start, stop)
+
+    def __len__(self):
+        """
+        Count the records
+        """
+        return len(self.offsets)
+
+    @staticmethod
+    def _matrix(lines, width):
+        """
+        View a list of byte strings as a matrix, one row of `width` per line
+        """
+        lines = numpy.array(lines, dtype='S{}'.format(width))
+        return lines.view(numpy.uint8).reshape(len(lines), width)
+
+    def column(self, name):
+        """
+        Get the values of a position, across every record,
+        as an array of byte strings
+        """
+        (matrix, start, stop) = self.positions[name]
+        return slice_bytes(matrix, start, stop)
+
+    def equals(self, name, value):
+        """
+        Find the records whose position has a value
+        """
+        return self.column(name) == self._encode(value)
+
+    def isin(self, name, values):
+        """
+        Find the records whose position has any of the given values
+        """
+        values = [
+            self._encode(value)
+            for value in values
+        ]
+        return numpy.isin(self.column(name), values)
+
+    def between(self, name, low, high):
+        """
+        Find the records whose position falls in an inclusive range
+
+        Values are compared as strings, character by character.
+        """
+        column = self.column(name)
+        return (column >= self._encode(low)) & (column <= self._encode(high))
+
+    def is_video(self):
+        """
+        Find the records of video-type assets
+        """
+        return self.equals('LDR/type_of_record', 'g')
+
+    def numbers(self, mask):
+        """
+        Get the position in the file of each matching record,
+        e.g. to load them through a `RecordIndex`
+        """
+        return numpy.flatnonzero(mask)
+
+    @staticmethod
+    def _encode(value):
+        """
+        Encode a value to compare against a column of bytes
+        """
+        if isinstance(value, str):
+            value = value.encode('ascii')
+        return value
+
+    @classmethod
+    def scan(cls, input_file):
+        """
+        Scan a file, either text or binary,
+        for the leader and 008 of each record
+        """
+        if stat(input_file).st_size == 0:
+            # Empty files cannot be memory-mapped
+            return cls([], [], [])
+        with open(input_file, 'rb') as stream:
+            with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if MarcRecordBinary.is_binary(data):
+                    return cls(*cls._scan_binary(data))
+                return cls(*cls._scan_text(data))
+
+    @staticmethod
+    def _scan_text(data):
+        """
+        Find the offsets, leader and 008 of each text record
+
+        Records begin at each leader line;
+        each 008 line belongs to the nearest leader before it.
+        """
+        starts = []
+        leaders = []
+        match = _REGEX_LEADER.match(data)
+        if match:
+            starts.append(0)
+            leaders.append(match.group(1).rstrip().ljust(LEADER_LENGTH))
+        for match in _REGEX_LEADER_LINE.finditer(data):
+            starts.append(match.start() + 1)
+            leaders.append(match.group(1).rstrip().ljust(LEADER_LENGTH))
+        fixed = [b''] * len(starts)
+        for match in _REGEX_FIXED_LENGTH_DATA_LINE.finditer(data):
+            number = bisect_right(starts, match.start() + 1) - 1
+            if number >= 0 and not fixed[number]:
+                fixed[number] = match.group(1).ljust(FIXED_LENGTH_DATA_WIDTH)
+        stops = starts[1:] + [len(data)]
+        offsets = [
+            (start, stop - start)
+            for (start, stop) in zip(starts, stops)
+        ]
+        return (offsets, leaders, fixed)
+
+    @staticmethod
+    def _scan_binary(data):
+        """
+        Find the offsets, leader and 008 of each binary record,
+        reading only the leader and directory of each
+        """
+        offsets = []
+        leaders = []
+        fixed = []
+        start = 0
+        size = len(data)
+        while start < size:
+            prefix = data[start:start + RECORD_LENGTH_LENGTH]
+            if not prefix.strip():
+                break
+            try:
+                length = int(prefix, 10)
+                if length < LEADER_LENGTH or start + length > size:
+                    # Don't step backwards, stand still, or run off the end
+                    raise ValueError(length)
+                leader = data[start:start + LEADER_LENGTH]
+                base_address = int(leader[12:17], 10)
+                value = b''
+                position = start + LEADER_LENGTH
+                directory_end = data.find(FIELD_TERMINATOR, position, start + base_address)
+                if directory_end == -1:
+                    directory_end = start + base_address - 1
+                while position + DIRECTORY_ENTRY_LENGTH <= directory_end:
+                    if data[position:position + 3] == b'008':
+                        field_length = int(data[position + 3:position + 7], 10)
+                        field_start = start + base_address + int(data[position + 7:position + 12], 10)
+                        value = data[field_start:field_start + field_length]
+                        value = value.rstrip(FIELD_TERMINATOR)
+                        break
+                    position += DIRECTORY_ENTRY_LENGTH
+            except ValueError:
+                raise InvalidRecordError(
+                    "Invalid record at offset {start}".format(
+                        start=start,
+                    )
+                )
+            offsets.append((start, length))
+            leaders.append(leader)
+            fixed.append(value)
+            start += length
+        return (offsets, leaders, fixed)
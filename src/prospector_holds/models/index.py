@@ -0,0 +1,350 @@
+"""
+Random-access indexes over large files of MARC records
+
+A file is scanned once, recording the byte offset of each record
+and the values of a few identifying fields;
+the index is then persisted beside the file.
+Records are served from a memory-mapped view of the file,
+parsed only when requested.
+"""
+import json
+import mmap
+from os import stat
+
+from .binary import MarcRecordBinary
+from .fields import Field
+from .leader import LEADER_LITERALS
+from .record import MarcRecordText
+
+
+_FORMAT_BINARY = 'binary'
+_FORMAT_TEXT = 'text'
+_LEADER_LITERALS = tuple(
+    literal.encode('ascii')
+    for literal in LEADER_LITERALS
+)
+_OCLC_PREFIX = '(OCoLC)'
+_OCLC_NUMBER_PREFIXES = (
+    'ocm',
+    'ocn',
+    'on',
+)
+
+
+def control_number(fields):
+    """
+    Get the control number(s), from the 001 field
+    """
+    for field in fields.get('001', []):
+        for (key, value) in field.data:
+            yield value.strip()
+
+
+def normalize_oclc_number(value):
+    """
+    Normalize a system control number, if it's an OCLC number
+
+    e.g. both `(OCoLC)1017697643` and `(OCoLC)on1017697643`
+    are normalized to `1017697643`.
+    Returns None for any other kind of number, e.g. `(DLC)12345`.
+    """
+    value = value.strip()
+    if not value.startswith(_OCLC_PREFIX):
+        return None
+    value = value[len(_OCLC_PREFIX):].strip()
+    for prefix in _OCLC_NUMBER_PREFIXES:
+        if value.startswith(prefix):
+            value = value[len(prefix):]
+            break
+    return value.lstrip('0')
+
+
+def oclc_number(fields):
+    """
+    Get the OCLC number(s), from the 035 field
+    """
+    for field in fields.get('035', []):
+        for value in field.data_dict.get('a', []):
+            value = normalize_oclc_number(value)
+            if value:
+                yield value
+
+
+class RecordIndex:
+    """
+    A random-access index of the records in a large MARC file
+
+    Both text (.mrk) and binary (.mrc) files are supported.
+    """
+
+    SUFFIX = '.idx.json'
+    VERSION = 1
+
+    """
+    The keys to index each record by,
+    each a function yielding values from a dict of fields (by tag)
+    """
+    KEYS = {
+        'control_number': control_number,
+        'oclc': oclc_number,
+    }
+    TAGS = (
+        '001',
+        '035',
+    )
+
+    def __init__(self, input_file, data_format, offsets, keys):
+        """
+        Create a new index object, manually specifying data
+
+        - `offsets` is a list of `(start, length)` pairs, one per record
+        - `keys` maps each key name to a dict of values
+          to lists of record numbers
+        """
+        self.input_file = input_file
+        self.data_format = data_format
+        self.offsets = offsets
+        self.keys = keys
+        self._stream = None
+        self._mmap = None
+
+    def __len__(self):
+        """
+        Count the records in the file
+        """
+        return len(self.offsets)
+
+    def __getitem__(self, number):
+        """
+        Parse a record by its position in the file
+        """
+        start, length = self.offsets[number]
+        data = self._open()[start:start + length]
+        if self.data_format == _FORMAT_BINARY:
+            record = MarcRecordBinary(data)
+        else:
+            lines = data.decode('utf-8').splitlines()
+            record = MarcRecordText(lines)
+        return record
+
+    def __iter__(self):
+        """
+        Iterate over each record in the file, in order
+        """
+        for number in range(len(self)):
+            yield self[number]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def find(self, value, key='control_number'):
+        """
+        Find every record with a value for the given key
+        """
+        numbers = self.keys[key].get(value, [])
+        return [
+            self[number]
+            for number in numbers
+        ]
+
+    def get(self, value, key='control_number'):
+        """
+        Get the first record with a value for the given key,
+        or None if there isn't one
+        """
+        numbers = self.keys[key].get(value)
+        if not numbers:
+            return None
+        return self[numbers[0]]
+
+    def close(self):
+        """
+        Release the memory-mapped view of the file
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def _open(self):
+        """
+        Map the file into memory, on first use
+        """
+        if self._mmap is None:
+            self._stream = open(self.input_file, 'rb')
+            self._mmap = mmap.mmap(
+                self._stream.fileno(),
+                0,
+                access=mmap.ACCESS_READ,
+            )
+        return self._mmap
+
+    @classmethod
+    def index_file(cls, input_file):
+        """
+        Get the path of the index persisted beside a file
+        """
+        return input_file + cls.SUFFIX
+
+    @classmethod
+    def open(cls, input_file, rebuild=False):
+        """
+        Open the index of a file,
+        building it first if it's missing or out of date
+        """
+        instance = None
+        if not rebuild:
+            instance = cls.load(input_file)
+        if instance is None:
+            instance = cls.build(input_file)
+            instance.save()
+        return instance
+
+    @classmethod
+    def load(cls, input_file):
+        """
+        Load the persisted index of a file
+
+        Returns None if there is no index,
+        or if the file has changed since it was built.
+        """
+        try:
+            with open(cls.index_file(input_file)) as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != cls.VERSION:
+            return None
+        if data.get('signature') != cls.signature(input_file):
+            return None
+        instance = cls(
+            input_file,
+            data['format'],
+            [tuple(offset) for offset in data['offsets']],
+            data['keys'],
+        )
+        return instance
+
+    def save(self):
+        """
+        Persist the index beside its file
+        """
+        data = {
+            'version': self.VERSION,
+            'signature': self.signature(self.input_file),
+            'format': self.data_format,
+            'offsets': self.offsets,
+            'keys': self.keys,
+        }
+        with open(self.index_file(self.input_file), 'w') as stream:
+            json.dump(data, stream)
+
+    @classmethod
+    def build(cls, input_file):
+        """
+        Scan a file, indexing each of its records
+        """
+        offsets = []
+        keys = {
+            key: {}
+            for key in cls.KEYS
+        }
+        data_format = _FORMAT_TEXT
+        if stat(input_file).st_size == 0:
+            # Empty files cannot be memory-mapped
+            return cls(input_file, data_format, offsets, keys)
+        with open(input_file, 'rb') as stream:
+            with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if MarcRecordBinary.is_binary(data):
+                    data_format = _FORMAT_BINARY
+                    scan = cls._scan_binary
+                else:
+                    scan = cls._scan_text
+                for (number, (start, length, fields)) in enumerate(scan(data, cls.TAGS)):
+                    offsets.append((start, length))
+                    for (key, function) in cls.KEYS.items():
+                        for value in function(fields):
+                            numbers = keys[key].setdefault(value, [])
+                            if not numbers or numbers[-1] != number:
+                                numbers.append(number)
+        instance = cls(input_file, data_format, offsets, keys)
+        return instance
+
+    @staticmethod
+    def signature(input_file):
+        """
+        Identify the version of a file by its size and modification time
+        """
+        status = stat(input_file)
+        return [status.st_size, status.st_mtime_ns]
+
+    @staticmethod
+    def _scan_binary(data, tags):
+        """
+        Find the offset and length of each binary record,
+        along with the fields for the given tags
+        """
+        for record in MarcRecordBinary.split_records(data):
+            start = data.tell() - len(record)
+            record = MarcRecordBinary(record, tags=tags)
+            yield (start, data.tell() - start, record.fields_dict)
+
+    @classmethod
+    def _scan_text(cls, data, tags):
+        """
+        Find the offset and length of each text record,
+        along with the fields for the given tags
+
+        Only the lines of those fields are decoded and parsed.
+        """
+        tags = tuple(
+            tag.encode('ascii') + b' '
+            for tag in tags
+        )
+        start = None
+        fields = []
+        lines = None
+        position = 0
+        size = len(data)
+        while position < size:
+            end = data.find(b'\n', position)
+            if end == -1:
+                end = size
+            else:
+                end += 1
+            line = data[position:end]
+            parts = line.split(maxsplit=1)
+            if parts and parts[0] in _LEADER_LITERALS:
+                if start is not None:
+                    yield (start, position - start, cls._parse_text(fields))
+                start = position
+                fields = []
+                lines = None
+            elif start is not None:
+                if line[:1] == b' ' and lines is not None:
+                    lines.append(line.decode('utf-8'))
+                elif line.startswith(tags):
+                    lines = [line.decode('utf-8')]
+                    fields.append(lines)
+                else:
+                    lines = None
+            position = end
+        if start is not None:
+            yield (start, size - start, cls._parse_text(fields))
+
+    @staticmethod
+    def _parse_text(fields):
+        """
+        Parse the lines of each field into a dict of fields (by tag)
+        """
+        data = {}
+        for lines in fields:
+            field = Field.from_lines(lines, None)
+            if field:
+                data.setdefault(field.tag, []).append(field)
+        return data
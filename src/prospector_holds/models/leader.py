@@ -9,9 +9,9 @@ see the MARC 21 Format for Bibliographic Data [1].
 
 [1] https://www.loc.gov/marc/umb/um07to10.html#part9
 """
+from functools import lru_cache
 
-from ..settings import SCHEMA_JSON
-from ..utils import label_to_key
+from .positions import leader_layout
 
 
 """
@@ -24,9 +24,69 @@ LEADER_LITERALS = (
 
 
 class Leader:
+    """
+    The leader of a record
+
+    The positional data is held as a single string;
+    each position is exposed as an attribute, sliced on access.
+    """
+
+    __slots__ = (
+        '_data',
+    )
+
     def __init__(self, **kwargs):
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        """
+        Create a new leader, manually specifying data by position
+        """
+        slices = _slices()
+        unknown = set(kwargs) - set(slices)
+        if unknown:
+            raise TypeError(
+                "{cls}() got unexpected keyword arguments: {unknown}".format(
+                    cls=type(self).__name__,
+                    unknown=', '.join(sorted(unknown)),
+                )
+            )
+        data = ''.join(
+            kwargs.get(key, '').ljust(stop - start)[:stop - start]
+            for (key, start, stop) in leader_layout()
+        )
+        object.__setattr__(self, '_data', data)
+
+    def __getattr__(self, name):
+        """
+        Slice a position from the data, by its key
+        """
+        try:
+            _slice = _slices()[name]
+        except KeyError:
+            raise AttributeError(
+                "{cls!r} object has no attribute {name!r}".format(
+                    cls=type(self).__name__,
+                    name=name,
+                )
+            )
+        return self._data[_slice]
+
+    def __setattr__(self, name, value):
+        """
+        Replace a position in the data, by its key
+        """
+        _slice = _slices().get(name)
+        if _slice is None:
+            object.__setattr__(self, name, value)
+            return
+        width = _slice.stop - _slice.start
+        value = value.ljust(width)[:width]
+        data = self._data[:_slice.start] + value + self._data[_slice.stop:]
+        object.__setattr__(self, '_data', data)
+
+    def __reduce__(self):
+        """
+        Pickle the leader compactly, as its positional data
+        """
+        return (type(self).from_data, (self._data,))
 
     def __repr__(self):
         """
@@ -35,9 +95,9 @@ class Leader:
         kwargs = ', '.join(
             "{key}='{value}'".format(
                 key=key,
-                value=value
+                value=self._data[start:stop],
             )
-            for (key, value) in self.__dict__.items()
+            for (key, start, stop) in leader_layout()
         )
         string = "{cls}({kwargs})".format(
             cls=type(self).__name__,
@@ -49,25 +109,15 @@ class Leader:
         """
         Create a leader line string
         """
-        parts = [
-            'LEADER ',
-        ]
-        definition = SCHEMA_JSON['fields']['LDR']
-        data = {}
-        for offset in sorted(definition['positions'].keys()):
-            offsets = offset.split('-')
-            if len(offsets) == 1:
-                offsets.append(offsets[0])
-            start, stop = map(lambda x: int(x, 10), offsets)
-            key = label_to_key(definition['positions'][offset]['label'])
-            part = getattr(self, key, '')
-            len_expected = stop - start + 1
-            while len(part) < len_expected:
-                part += ' '
-            parts.append(part)
-        string = ''.join(parts)
+        string = 'LEADER ' + self._str_data()
         return string
 
+    def _str_data(self):
+        """
+        Create a string of positional data, each position in order
+        """
+        return self._data
+
     @classmethod
     def from_string(cls, line):
         """
@@ -80,16 +130,28 @@ class Leader:
         parts = line.split(' ', maxsplit=1)
         if not parts[0] in LEADER_LITERALS:
             return None
-        line = parts[1]
-        definition = SCHEMA_JSON['fields']['LDR']
-        data = {}
-        for offset in definition['positions'].keys():
-            offsets = offset.split('-')
-            if len(offsets) == 1:
-                offsets.append(offsets[0])
-            start, stop = map(lambda x: int(x, 10), offsets)
-            value = line[start:stop+1]
-            key = label_to_key(definition['positions'][offset]['label'])
-            data[key] = value
-        instance = cls(**data)
+        instance = cls.from_data(parts[1])
+        return instance
+
+    @classmethod
+    def from_data(cls, line):
+        """
+        Parse the positional data of a leader, without any literal prefix
+
+        e.g. `00000cgm a2201093 i 4500`
+        """
+        length = leader_layout()[-1][2]
+        instance = cls.__new__(cls)
+        object.__setattr__(instance, '_data', line[:length].ljust(length))
         return instance
+
+
+@lru_cache(maxsize=None)
+def _slices():
+    """
+    Map the key of each position in the leader to its slice
+    """
+    return {
+        key: slice(start, stop)
+        for (key, start, stop) in leader_layout()
+    }
@@ -0,0 +1,266 @@
+"""
+Opt-in counters and histograms, for the hot paths of searching and parsing
+
+Metrics are disabled by default;
+each instrumented call site first checks `METRICS.enabled`,
+so the cost when disabled is a single attribute lookup.
+
+e.g.
+```
+METRICS.enable()
+Search.query_title('night of the living dead')
+print(METRICS.to_prometheus())
+```
+"""
+from contextlib import nullcontext
+import json
+from threading import Lock
+import time
+
+
+"""
+The default upper bounds of each histogram bucket, in seconds
+"""
+TIME_BUCKETS = (
+    0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10,
+)
+
+"""
+The upper bounds of histogram buckets for small counts, e.g. pages per query
+"""
+COUNT_BUCKETS = (
+    1, 2, 3, 5, 8, 11, 20, 50,
+)
+
+
+class Histogram:
+    """
+    A distribution of observed values, counted into buckets
+    """
+
+    def __init__(self, buckets=TIME_BUCKETS):
+        """
+        Create an empty histogram, with the upper bound of each bucket
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        """
+        Count a value into its bucket
+        """
+        self.count += 1
+        self.sum += value
+        for (index, bound) in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def to_dict(self):
+        """
+        Represent the histogram as a dict,
+        with cumulative counts for each bucket
+        """
+        cumulative = []
+        total = 0
+        for (bound, count) in zip(self.buckets, self.counts):
+            total += count
+            cumulative.append([bound, total])
+        return {
+            'buckets': cumulative,
+            'count': self.count,
+            'sum': self.sum,
+        }
+
+
+class _Timer:
+    """
+    Time a block of code into a histogram
+    """
+
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.metrics.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class Metrics:
+    """
+    A registry of counters and histograms, each identified
+    by a name and an optional set of labels (e.g. `tag='245'`)
+    """
+
+    def __init__(self):
+        """
+        Create an empty, disabled registry
+        """
+        self.enabled = False
+        self.counters = {}
+        self.histograms = {}
+        self._lock = Lock()
+
+    def enable(self):
+        """
+        Start collecting metrics
+        """
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop collecting metrics, keeping any collected so far
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Discard every metric collected so far
+        """
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        """
+        Identify a metric by its name and labels
+        """
+        return (name, tuple(sorted(labels.items())))
+
+    def increment(self, name, value=1, **labels):
+        """
+        Add to a counter
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, buckets=TIME_BUCKETS, **labels):
+        """
+        Record a value in a histogram,
+        created with the given buckets on first use
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def timer(self, name, **labels):
+        """
+        Time a block of code into a histogram, if enabled
+        """
+        if not self.enabled:
+            return nullcontext()
+        return _Timer(self, name, labels)
+
+    def counter(self, name, **labels):
+        """
+        Get the value of a counter
+        """
+        return self.counters.get(self._key(name, labels), 0)
+
+    def histogram(self, name, **labels):
+        """
+        Get a histogram, or None if nothing has been observed
+        """
+        return self.histograms.get(self._key(name, labels))
+
+    def to_dict(self):
+        """
+        Represent every metric as a dict, by name,
+        each a list of values with their labels
+        """
+        data = {
+            'counters': {},
+            'histograms': {},
+        }
+        with self._lock:
+            for ((name, labels), value) in sorted(self.counters.items()):
+                data['counters'].setdefault(name, []).append({
+                    'labels': dict(labels),
+                    'value': value,
+                })
+            for ((name, labels), histogram) in sorted(self.histograms.items()):
+                entry = histogram.to_dict()
+                entry['labels'] = dict(labels)
+                data['histograms'].setdefault(name, []).append(entry)
+        return data
+
+    def to_json(self, **kwargs):
+        """
+        Serialize every metric as JSON
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self):
+        """
+        Serialize every metric in the Prometheus text exposition format
+        """
+        lines = []
+        data = self.to_dict()
+        for (name, values) in data['counters'].items():
+            lines.append('# TYPE {name} counter'.format(name=name))
+            for value in values:
+                lines.append('{name}{labels} {value}'.format(
+                    name=name,
+                    labels=_labels(value['labels']),
+                    value=value['value'],
+                ))
+        for (name, values) in data['histograms'].items():
+            lines.append('# TYPE {name} histogram'.format(name=name))
+            for value in values:
+                for (bound, count) in value['buckets']:
+                    lines.append('{name}_bucket{labels} {count}'.format(
+                        name=name,
+                        labels=_labels(value['labels'], le=bound),
+                        count=count,
+                    ))
+                lines.append('{name}_bucket{labels} {count}'.format(
+                    name=name,
+                    labels=_labels(value['labels'], le='+Inf'),
+                    count=value['count'],
+                ))
+                lines.append('{name}_sum{labels} {sum}'.format(
+                    name=name,
+                    labels=_labels(value['labels']),
+                    sum=value['sum'],
+                ))
+                lines.append('{name}_count{labels} {count}'.format(
+                    name=name,
+                    labels=_labels(value['labels']),
+                    count=value['count'],
+                ))
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels, **extra):
+    """
+    Format a set of labels for the Prometheus text format
+    """
+    labels = dict(labels, **extra)
+    if not labels:
+        return ''
+    return '{' + ','.join(
+        '{key}="{value}"'.format(
+            key=key,
+            value=str(value).replace('\\', '\\\\').replace('"', '\\"'),
+        )
+        for (key, value) in sorted(labels.items())
+    ) + '}'
+
+
+"""
+The registry used by every instrumented call site
+"""
+METRICS = Metrics()
@@ -0,0 +1,126 @@
+"""
+Compiled layouts for fields with positional data
+
+The schema describes positions with offset strings like `07-08`;
+rather than re-parsing those for every record,
+each set of positions is compiled once into a layout:
+a tuple of `(key, start, stop)` slice bounds, in order of position.
+
+Layouts are contiguous from position 00; any positions the schema
+leaves undefined are filled with `undefined` entries,
+so joining the sliced values always reproduces the original line.
+"""
+from functools import lru_cache
+
+from .. import settings
+from ..utils import label_to_key
+
+
+"""
+The key of positions the schema leaves undefined
+"""
+UNDEFINED = 'undefined'
+
+"""
+The number of positions in the 008 field, across all forms of material
+"""
+FIXED_LENGTH_DATA_WIDTH = 40
+
+
+def compile_positions(positions):
+    """
+    Compile a `positions` mapping from the schema into a layout
+
+    Each offset will be either:
+    a single number, zero-padded to 2 digits
+    or a range of two numbers (also zero-padded to 2 digits),
+    separated by a hyphen.
+    """
+    defined = []
+    for (offset, definition) in positions.items():
+        offsets = offset.split('-')
+        start = int(offsets[0], 10)
+        stop = int(offsets[-1], 10) + 1
+        key = label_to_key(definition['label'])
+        defined.append((key, start, stop))
+    defined.sort(key=lambda position: position[1])
+    layout = []
+    position = 0
+    for (key, start, stop) in defined:
+        if start > position:
+            layout.append((UNDEFINED, position, start))
+        layout.append((key, start, stop))
+        position = stop
+    return tuple(layout)
+
+
+def slice_positions(layout, line):
+    """
+    Slice a line of positional data into a tuple of `(key, value)` pairs
+    """
+    return tuple(
+        (key, line[start:stop])
+        for (key, start, stop) in layout
+    )
+
+
+def slice_bytes(matrix, start, stop):
+    """
+    Slice a block of columns from a NumPy matrix of bytes, one row per line,
+    as an array of fixed-width byte strings
+    """
+    block = matrix[:, start:stop].copy(order='C')
+    return block.view('S{}'.format(stop - start)).ravel()
+
+
+@lru_cache(maxsize=None)
+def leader_layout():
+    """
+    The layout of the leader line
+    """
+    positions = settings.SCHEMA_JSON['fields']['LDR']['positions']
+    return compile_positions(positions)
+
+
+@lru_cache(maxsize=None)
+def type_layout(tag, name):
+    """
+    The layout of a named type of a positional field, e.g. 008 `Books`
+    """
+    positions = settings.SCHEMA_JSON['fields'][tag]['types'][name]['positions']
+    return compile_positions(positions)
+
+
+@lru_cache(maxsize=None)
+def material_layouts():
+    """
+    The layouts of the 008 field, indexed by type of record (leader/06)
+
+    Each layout merges the positions common to `All Materials`
+    with those of the specific form of material.
+    The form for each type of record is listed by the 00 position
+    of the matching 006 type.
+    """
+    definition = settings.SCHEMA_JSON['fields']['008']
+    common = definition['types']['All Materials']['positions']
+    layouts = {}
+    for (name, _type) in settings.SCHEMA_JSON['fields']['006']['types'].items():
+        positions = dict(common)
+        positions.update(definition['types'][name]['positions'])
+        layout = compile_positions(positions)
+        for code in _type['positions']['00']['codes']:
+            layouts.setdefault(code, layout)
+    return layouts
+
+
+@lru_cache(maxsize=None)
+def code_layouts(tag):
+    """
+    The layouts of a 006 or 007 field, indexed by the code in position 00
+    """
+    layouts = {}
+    for (name, _type) in settings.SCHEMA_JSON['fields'][tag]['types'].items():
+        codes = _type['positions'].get('00', {}).get('codes', {})
+        for code in codes:
+            layouts.setdefault(code, type_layout(tag, name))
+    return layouts
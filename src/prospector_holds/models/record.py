@@ -1,25 +1,178 @@
 """
-Text-based MARC records
+MARC records, and their text-based form
 """
 from io import StringIO
+import re
+import time
 
+from .leader import LEADER_LITERALS
 from .leader import Leader
 from .fields import Field
+from .metrics import METRICS
 
 
-class MarcRecordText:
+"""
+A non-empty line of text
+"""
+_REGEX_LINE = re.compile(r'[^\n]+')
+
+"""
+A field, followed by any continuation lines
+
+Most fields are matched whole, captured as tag, indicators, and body;
+any other line (e.g. one too short to hold indicators)
+is captured as is, to be parsed line by line.
+Continuation lines are indented, and may be separated by empty lines.
+"""
+_REGEX_FIELD = re.compile(
+    r'^(?:'
+    r'(?P<tag>\S{3}).(?P<indicator1>.)(?P<indicator2>.).(?P<body>.*)'
+    r'|(?P<line>.+)'
+    r')(?P<continued>(?:\n(?: .*)?)*)',
+    re.MULTILINE,
+)
+
+"""
+The start of a leader line, and so of a record, after the first
+
+This is anchored on the newline, rather than `^`,
+so the pattern is only tried at the start of each line.
+"""
+_REGEX_RECORD = re.compile(
+    r'\n[^\S\n]*(?:{literals})(?:\s|$)'.format(
+        literals='|'.join(map(re.escape, LEADER_LITERALS)),
+    ),
+)
+
+"""
+Carriage returns at the end of a line
+"""
+_REGEX_CARRIAGE_RETURN = re.compile(r'\r+(?=\n|$)')
+
+
+def _restore_record(cls, leader, fields):
+    """
+    Recreate a pickled record
+    """
+    instance = cls.__new__(cls)
+    MarcRecord.__init__(instance, leader, fields)
+    return instance
+
+
+class MarcRecord:
+    """
+    A MARC record: a leader and a list of fields
+
+    This holds the behavior shared by each serialized form of a record.
+    """
+
+    __slots__ = (
+        'leader',
+        '_fields',
+    )
+
+    def __init__(self, leader=None, fields=None):
+        """
+        Create a new record object, manually specifying data
+        """
+        self.leader = leader
+        self.fields = list(fields or [])
+
+    @property
+    def fields(self):
+        """
+        The list of fields
+        """
+        return self._fields
+
+    @fields.setter
+    def fields(self, fields):
+        """
+        Replace the list of fields
+        """
+        self._fields = fields
+
+    def __reduce__(self):
+        """
+        Pickle the record compactly, as its leader and fields
+        """
+        return (_restore_record, (type(self), self.leader, self.fields))
+
+    @property
+    def fields_dict(self):
+        """
+        Represent the fields tuple as a dictionary
+
+        for ease of access/indexing
+        """
+        data = {}
+        for field in self.fields:
+            key = field.tag
+            value = field
+            if key not in data:
+                data[key] = []
+            data[key].append(value)
+        return data
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Create a new record object from another form of record
+
+        The leader and field objects are shared, not copied.
+        """
+        instance = cls.__new__(cls)
+        MarcRecord.__init__(instance, record.leader, record.fields)
+        return instance
+
+    def get_fields(self, tag):
+        """
+        Get the fields with a given tag
+        """
+        return [
+            field
+            for field in self.fields
+            if field.tag == tag
+        ]
+
+    @property
+    def is_video(self):
+        """
+        Determine if the record is a video-type asset
+        """
+        if self.leader.type_of_record == 'g':
+            return True
+        return False
+
+
+class MarcRecordText(MarcRecord):
     """
     Text-based MARC records
     """
 
-    def __init__(self, stream):
+    __slots__ = (
+        '_lazy',
+    )
+
+    def __init__(self, stream, lazy=False):
         """
         Create a new record object from a text stream
+
+        The stream may be any iterable of lines,
+        and is assumed to contain exactly one record.
+
+        In lazy mode, only the leader is parsed up front;
+        the lines of each field are kept, by tag,
+        and only parsed when the field is first accessed.
         """
+        enabled = METRICS.enabled
+        if enabled:
+            start = time.perf_counter()
         self.leader = None
         lines_buffered = []
         self.fields = []
-        for line in stream.readlines():
+        self._lazy = lazy
+        for line in stream:
             line = line.rstrip('\r\n')
             if not line:
                 continue
@@ -30,31 +183,77 @@ class MarcRecordText:
                     lines_buffered.append(line)
                 else:
                     if len(lines_buffered):
-                        field = Field.from_lines(lines_buffered, self.leader)
-                        if field:
-                            self.fields.append(field)
+                        self._add_lines(lines_buffered)
                     lines_buffered = [line,]
         if len(lines_buffered) > 0:
-            field = Field.from_lines(lines_buffered, self.leader)
-            if field:
-                self.fields.append(field)
+            self._add_lines(lines_buffered)
             lines_buffered = []
+        if enabled:
+            METRICS.increment('marc_records_parsed_total')
+            METRICS.observe('marc_record_parse_seconds', time.perf_counter() - start)
+
+    def _add_lines(self, lines):
+        """
+        Add a field from its lines of text,
+        either parsed now or pending until first access
+        """
+        if self._lazy:
+            tag = lines[0].lstrip()[0:3]
+            self._fields.append((tag, lines))
+        else:
+            field = Field.from_lines(lines, self.leader)
+            if field:
+                self._fields.append(field)
+
+    def _parse_pending(self, entry):
+        """
+        Parse a pending field, passing through any already parsed
+        """
+        if isinstance(entry, tuple):
+            (tag, lines) = entry
+            entry = Field.from_lines(lines, self.leader)
+        return entry
 
     @property
-    def fields_dict(self):
+    def fields(self):
         """
-        Represent the fields tuple as a dictionary
+        The list of fields, parsing any that are still pending
+        """
+        if self._lazy:
+            self._fields = [
+                field
+                for field in map(self._parse_pending, self._fields)
+                if field
+            ]
+            self._lazy = False
+        return self._fields
 
-        for ease of access/indexing
+    @fields.setter
+    def fields(self, fields):
         """
-        data = {}
-        for field in self.fields:
-            key = field.tag
-            value = field
-            if key not in data:
-                data[key] = []
-            data[key].append(value)
-        return data
+        Replace the list of fields
+        """
+        self._fields = fields
+        self._lazy = False
+
+    def get_fields(self, tag):
+        """
+        Get the fields with a given tag
+
+        In lazy mode, only the fields with that tag are parsed.
+        """
+        if not self._lazy:
+            return super().get_fields(tag)
+        fields = []
+        for (index, entry) in enumerate(self._fields):
+            if isinstance(entry, tuple):
+                if entry[0] != tag:
+                    continue
+                entry = self._parse_pending(entry)
+                self._fields[index] = entry
+            if entry and entry.tag == tag:
+                fields.append(entry)
+        return fields
 
     def __str__(self):
         """
@@ -71,30 +270,183 @@ class MarcRecordText:
         return string
 
     @classmethod
-    def from_string(cls, input_text):
+    def from_string(cls, input_text, lazy=False):
         """
         Create a new record object from a text string
         """
+        if not lazy:
+            return cls.from_text(input_text)
         instance = None
         with StringIO(input_text) as stream:
-            instance = cls(stream)
+            instance = cls(stream, lazy=lazy)
+        return instance
+
+    @classmethod
+    def from_text(cls, input_text):
+        """
+        Create a new record object from a text string, in a single pass
+
+        Rather than walking the text line by line,
+        the text is split into fields by `tokenize`,
+        and each body passed straight to `Field.from_data`.
+        The record is identical to one read from a stream.
+        """
+        enabled = METRICS.enabled
+        if enabled:
+            start = time.perf_counter()
+        (leader, tokens) = cls.tokenize(input_text)
+        fields = []
+        from_data = Field.from_data
+        for (tag, indicator, body) in tokens:
+            if body:
+                field = from_data(tag, indicator, body, leader)
+            else:
+                field = None
+            if enabled:
+                name = 'marc_fields_parsed_total' if field else 'marc_fields_dropped_total'
+                METRICS.increment(name, tag=tag)
+            if field:
+                fields.append(field)
+        instance = cls.__new__(cls)
+        instance.leader = leader
+        instance.fields = fields
+        if enabled:
+            METRICS.increment('marc_records_parsed_total')
+            METRICS.observe('marc_record_parse_seconds', time.perf_counter() - start)
         return instance
 
     @classmethod
-    def from_file(cls, input_file):
+    def tokenize(cls, input_text, tags=None):
+        """
+        Split the text of a single record into its leader and fields,
+        without parsing the data of any field
+
+        Returns the parsed leader (or None, if there isn't one)
+        and an iterator of `(tag, indicator, body)` for each field,
+        with its continuation lines joined and trailing whitespace removed,
+        as `Field.from_lines` would.
+        A field with an empty body can't be parsed, and should be dropped.
+        Optionally, only the fields with the given tags are split.
+        """
+        if '\r' in input_text:
+            input_text = _REGEX_CARRIAGE_RETURN.sub('', input_text)
+        leader = None
+        position = 0
+        for match in _REGEX_LINE.finditer(input_text):
+            leader = Leader.from_string(match.group())
+            if leader:
+                position = match.end()
+                break
+        if not leader:
+            return (leader, iter(()))
+        return (leader, cls._tokens(input_text, position, tags))
+
+    @staticmethod
+    def _tokens(input_text, position, tags):
+        """
+        Split the fields of a record, after its leader line
+        """
+        for match in _REGEX_FIELD.finditer(input_text, position):
+            (tag, indicator1, indicator2, body, line, continued) = match.groups()
+            if line is not None:
+                # Not in the usual form; join its lines first, as parsing would
+                line = line.lstrip()
+                if continued:
+                    line += ''.join(map(str.lstrip, continued.split('\n')))
+                line = line.rstrip()
+                if tags is not None and line[0:3] not in tags:
+                    continue
+                if len(line) < 8:
+                    yield (line[0:3], None, '')
+                    continue
+                yield (line[0:3], (line[4], line[5]), line[7:])
+                continue
+            if tags is not None and tag not in tags:
+                continue
+            if continued:
+                body += ''.join(map(str.lstrip, continued.split('\n')))
+            yield (tag, (indicator1, indicator2), body.rstrip())
+
+    @classmethod
+    def split_text(cls, input_text):
+        """
+        Split a text string of 1+ records into the text of each record
+
+        Each leader line marks the start of a new record.
+        """
+        starts = [0]
+        starts.extend(
+            match.start() + 1
+            for match in _REGEX_RECORD.finditer(input_text)
+        )
+        starts.append(len(input_text))
+        for (start, stop) in zip(starts, starts[1:]):
+            text = input_text[start:stop]
+            if text.strip():
+                yield text
+
+    @classmethod
+    def iter_text(cls, input_text):
+        """
+        Iterate over each record in a text string of 1+ records,
+        each parsed in a single pass, as by `from_text`
+        """
+        for text in cls.split_text(input_text):
+            yield cls.from_text(text)
+
+    @classmethod
+    def from_file(cls, input_file, lazy=False):
         """
         Create a new record object from a text file
         """
         instance = None
         with open(input_file, 'r') as stream:
-            instance = cls(stream)
+            instance = cls(stream, lazy=lazy)
         return instance
 
-    @property
-    def is_video(self):
+    @classmethod
+    def split_records(cls, stream):
         """
-        Determine if the record is a video-type asset
+        Split a text stream of 1+ records into a list of lines per record
+
+        The stream is read line-by-line;
+        each leader line marks the start of a new record,
+        so only a single record is ever held in memory.
         """
-        if self.leader.type_of_record == 'g':
-            return True
-        return False
+        lines = []
+        has_content = False
+        for line in stream:
+            if has_content and cls._is_leader(line):
+                yield lines
+                lines = []
+                has_content = False
+            lines.append(line)
+            if not has_content and line.strip():
+                has_content = True
+        if has_content:
+            yield lines
+
+    @classmethod
+    def iter_records(cls, stream, lazy=False):
+        """
+        Iterate over each record in a text stream of 1+ records
+        """
+        for lines in cls.split_records(stream):
+            yield cls(lines, lazy=lazy)
+
+    @classmethod
+    def iter_file(cls, input_file, lazy=False):
+        """
+        Iterate over each record in a text file of 1+ records
+        """
+        with open(input_file, 'r') as stream:
+            for record in cls.iter_records(stream, lazy=lazy):
+                yield record
+
+    @staticmethod
+    def _is_leader(line):
+        """
+        Determine if a line of text is a leader line
+        """
+        parts = line.split(maxsplit=1)
+        return bool(parts) and parts[0] in LEADER_LITERALS
@@ -1,23 +1,167 @@
 """
 Perform searches against the catalog
 """
+import codecs
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from concurrent.futures import wait
 from html.parser import HTMLParser
+from queue import Queue
+from threading import Event
+from threading import Lock
+from threading import Semaphore
+from threading import Thread
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from urllib.parse import quote
 
 from ..settings import SETTINGS
+from .metrics import COUNT_BUCKETS
+from .metrics import METRICS
 from .record import MarcRecordText
 
 
+def _prefetch(iterable, depth=1, is_last=None):
+    """
+    Consume an iterable in a background thread, up to `depth` items ahead
+
+    Items are yielded in order, as with the iterable itself;
+    any exception raised by the iterable is re-raised here.
+    If we stop iterating early, the background thread stops too.
+
+    With `is_last`, items come in groups, each ending with an item
+    for which `is_last` is true; the thread reads up to `depth` groups
+    ahead of the group being consumed, rather than `depth` items.
+    """
+    items = Queue()
+    room = Semaphore(depth + 1)
+    stopped = Event()
+    done = object()
+
+    def ends_group(item):
+        return is_last is None or is_last(item)
+
+    def reserve():
+        while not stopped.is_set():
+            if room.acquire(timeout=0.1):
+                return True
+        return False
+
+    def produce():
+        try:
+            iterator = iter(iterable)
+            while reserve():
+                for item in iterator:
+                    items.put((item, None))
+                    if ends_group(item):
+                        break
+                else:
+                    items.put((done, None))
+                    return
+        except Exception as error:
+            items.put((done, error))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            (item, error) = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                break
+            if ends_group(item):
+                room.release()
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+
 class Search:
     """
     Perform a search and fetch all paginated entries
     """
 
+    """
+    The number of records to fetch at once,
+    and the number of connections kept alive for reuse
+    """
+    WORKERS = 8
+
+    """
+    The maximum number of pages of results to fetch per search
+    """
+    MAX_PAGES = 11
+
+    """
+    The number of bytes of a page of results to read and parse at once
+    """
+    CHUNK_SIZE = 8 * 1024
+
+    """
+    An optional, persistent cache of responses, e.g. `ResponseCache()`
+    """
+    cache = None
+
+    """
+    An optional, persistent store of parsed records, e.g. `RecordStore()`
+    """
+    store = None
+
+    _session = None
+    _session_lock = Lock()
+    _pool_size = 0
+
     @classmethod
-    def fetch_marc_record(cls, url):
+    def session(cls, workers=None):
         """
-        Fetch a MARC record from a domain-less root URL
+        Get the HTTP session shared by all requests
+
+        The session keeps connections alive, pooled per host,
+        so consecutive requests skip the TCP/TLS handshake.
+        Each host's pool holds a connection per worker,
+        growing to fit the most `workers` ever requested at once
+        (at least `WORKERS`), so no connection is discarded.
+        """
+        size = max(workers or 0, cls.WORKERS)
+        if cls._session is None or size > cls._pool_size:
+            with cls._session_lock:
+                session = cls._session or requests.Session()
+                if size > cls._pool_size:
+                    adapter = HTTPAdapter(
+                        pool_connections=size,
+                        pool_maxsize=size,
+                    )
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    cls._pool_size = size
+                cls._session = session
+        return cls._session
+
+    @classmethod
+    def _get(cls, url):
+        """
+        Fetch the text of a URL, over the shared session
+
+        If a response cache is set, it's consulted first.
+        """
+        if cls.cache is not None:
+            return cls.cache.get(cls.session(), url)
+        with METRICS.timer('search_request_seconds'):
+            r = cls.session().get(url)
+            text = r.text
+        if METRICS.enabled:
+            METRICS.increment('search_requests_total')
+            METRICS.increment('search_response_bytes_total', len(r.content))
+        return text
+
+    @classmethod
+    def record_url(cls, url):
+        """
+        Build the URL of a MARC record from a domain-less root URL
         of a catalogue item
         """
         if '?' in url:
@@ -38,15 +182,130 @@ class Search:
             params_prefix=params_prefix,
             params=params,
         )
-        r = requests.get(url)
-        text = r.text
+        return url
+
+    @classmethod
+    def fetch_marc_record(cls, url):
+        """
+        Fetch a MARC record from a domain-less root URL
+        of a catalogue item
+        """
+        url = cls.record_url(url)
+        text = cls._get(url)
+        return cls.parse_marc_record(text)
+
+    @classmethod
+    def parse_marc_record(cls, text):
+        """
+        Parse the text of a fetched MARC record,
+        from the record store if one is set
+        """
+        if cls.store is not None:
+            return cls.store.from_string(text)
         reader = MarcRecordText.from_string(text)
         return reader
 
     @classmethod
-    def query_title(cls, search_title, medium=None, is_video=True):
+    def fetch_marc_records(cls, urls, workers=None):
         """
-        Search the catalogue for items by title
+        Fetch many MARC records concurrently,
+        from an iterable of domain-less root URLs (e.g. from `query_title`)
+
+        Records are yielded as soon as each is fetched,
+        so they may not be in the same order as the URLs.
+        """
+        for (url, record) in cls._fetch_marc_records(urls, workers):
+            yield record
+
+    @classmethod
+    def query_titles(cls, queries, workers=None, max_pages=None):
+        """
+        Search the catalogue for many titles at once,
+        fetching the records found by each
+
+        Each query is either a title,
+        or a tuple of `(title, medium, is_video)` arguments
+        as for `query_title`.
+        Searches run concurrently, and records are fetched
+        as soon as their links are found;
+        a record found by several searches is only fetched once.
+
+        Returns a dict of each query to a list of its records,
+        keyed by its full `(title, medium, is_video)` tuple,
+        with any missing arguments filled in by their defaults;
+        so the same title searched in different ways is kept apart.
+        """
+        workers = workers or cls.WORKERS
+        # Searches and record fetches run side by side
+        cls.session(2 * workers)
+        defaults = (None, None, True)
+        queries = [
+            (query,) if isinstance(query, str) else tuple(query)
+            for query in queries
+        ]
+        queries = [
+            query + defaults[len(query):]
+            for query in queries
+        ]
+        found = {
+            query: {}
+            for query in queries
+        }
+
+        def search(query):
+            return list(cls.query_title(*query, max_pages=max_pages))
+
+        def unique_links():
+            seen = set()
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(search, query): query
+                    for query in found
+                }
+                for future in as_completed(futures):
+                    links = found[futures[future]]
+                    for link in future.result():
+                        links[link] = None
+                        if link not in seen:
+                            seen.add(link)
+                            yield link
+
+        records = dict(cls._fetch_marc_records(unique_links(), workers))
+        return {
+            query: [
+                records[link]
+                for link in links
+            ]
+            for (query, links) in found.items()
+        }
+
+    @classmethod
+    def _fetch_marc_records(cls, urls, workers=None):
+        """
+        Fetch many MARC records concurrently,
+        yielding each URL with its record
+
+        Only a bounded number of requests are in flight at once,
+        so `urls` may be a lazy, or very long, iterable.
+        """
+        workers = workers or cls.WORKERS
+        cls.session(workers)
+        pending = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for url in urls:
+                future = executor.submit(cls.fetch_marc_record, url)
+                pending[future] = url
+                if len(pending) >= 2 * workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield (pending.pop(future), future.result())
+            for future in as_completed(pending):
+                yield (pending[future], future.result())
+
+    @classmethod
+    def search_url(cls, search_title, medium=None, is_video=True):
+        """
+        Build the URL of the first page of results for a title search
         """
         page_number = 0
         page_parts = [
@@ -76,31 +335,179 @@ class Search:
             ),
             params='lang=eng&suite=def',
         )
-        urls = set()
-        while True:
-            if url in urls:
-                break
-            urls.add(url)
-            r = requests.get(url)
-            parser = SearchResultParser()
-            parser.feed(r.text)
-            if len(parser.links) == 0:
-                break
-            for link in parser.links:
+        return url
+
+    @classmethod
+    def page_url(cls, url):
+        """
+        Build the URL of a page of results from a domain-less root URL,
+        e.g. a pagination link
+        """
+        url = "{protocol}://{domain}/{path}".format(
+            protocol=SETTINGS['SEARCH_PROTOCOL'],
+            domain=SETTINGS['SEARCH_DOMAIN'],
+            path=url,
+        )
+        return url
+
+    @classmethod
+    def query_title(cls, search_title, medium=None, is_video=True, max_pages=None, prefetch=0):
+        """
+        Search the catalogue for items by title
+
+        Links are yielded as soon as they're parsed,
+        while the rest of each page is still downloading.
+        With `prefetch`, pages are read in the background,
+        up to that many pages ahead of the one being consumed.
+        """
+        if max_pages is None:
+            max_pages = cls.MAX_PAGES
+        url = cls.search_url(search_title, medium, is_video)
+        batches = cls._batches(url, max_pages)
+        if prefetch:
+            # Each page's batches end with an empty one
+            batches = _prefetch(batches, prefetch, is_last=lambda links: not links)
+        for links in batches:
+            for link in links:
                 yield link
-            if not parser.next:
-                break
-            url = "{protocol}://{domain}/{path}".format(
-                protocol=SETTINGS['SEARCH_PROTOCOL'],
-                domain=SETTINGS['SEARCH_DOMAIN'],
-                path=parser.next,
-            )
-            # Fail-safe: Stop, eventually, to avoid hammering servers if
-            # we mistakenly get caught in a loop.
-            # TODO: Remove this and/or make it configurable
-            page_number += 1
-            if page_number > 10:
-                break
+
+    @classmethod
+    def _batches(cls, url, max_pages):
+        """
+        Fetch and parse each page of results, following pagination links
+
+        Each page is parsed as it downloads,
+        yielding the new links found in each chunk,
+        then an empty batch to mark the end of the page.
+        As soon as the link to the next page is found,
+        that page is requested in the background;
+        it only counts as followed once the whole page still links to it.
+        """
+        urls = set([url])
+        upcoming = None
+        pages = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            try:
+                page = cls._open(url)
+                while True:
+                    pages += 1
+                    parser = SearchResultParser()
+                    for chunk in cls._read(page):
+                        parser.feed(chunk)
+                        if upcoming is None and parser.next and parser.links:
+                            url = cls.page_url(parser.next)
+                            if cls._follow(url, urls, max_pages):
+                                upcoming = (url, executor.submit(cls._open, url))
+                        links = parser.pop_links()
+                        if links:
+                            yield links
+                    parser.close()
+                    links = parser.pop_links()
+                    if links:
+                        yield links
+                    yield []
+                    url = None
+                    if parser.links and parser.next:
+                        url = cls.page_url(parser.next)
+                    if upcoming is not None and upcoming[0] != url:
+                        # The page linked to another next page after all
+                        cls._discard(upcoming[1])
+                        upcoming = None
+                    if upcoming is not None:
+                        urls.add(url)
+                        page = upcoming[1].result()
+                        upcoming = None
+                    elif url is not None and cls._follow(url, urls, max_pages):
+                        urls.add(url)
+                        page = cls._open(url)
+                    else:
+                        break
+            finally:
+                if upcoming is not None:
+                    cls._discard(upcoming[1])
+                if METRICS.enabled:
+                    METRICS.observe('search_pages_per_query', pages, buckets=COUNT_BUCKETS)
+
+    @classmethod
+    def _discard(cls, future):
+        """
+        Abandon a page requested in the background
+
+        Any error fetching it is ignored,
+        so it can't mask an error already being raised.
+        """
+        if future.cancel():
+            return
+        try:
+            cls._close(future.result())
+        except Exception:
+            pass
+
+    @staticmethod
+    def _follow(url, urls, max_pages):
+        """
+        Check whether to follow a pagination link to a page
+        """
+        if url in urls:
+            return False
+        # Fail-safe: Stop, eventually, to avoid hammering servers if
+        # we mistakenly get caught in a loop.
+        if len(urls) >= max_pages:
+            return False
+        return True
+
+    @classmethod
+    def _open(cls, url):
+        """
+        Start fetching a page, once its response headers arrive
+
+        Returns the streamed response, to be read with `_read`;
+        or, if a response cache is set, the text of the whole page.
+        """
+        if cls.cache is not None:
+            return cls.cache.get(cls.session(), url)
+        with METRICS.timer('search_request_seconds'):
+            r = cls.session().get(url, stream=True)
+        if METRICS.enabled:
+            METRICS.increment('search_requests_total')
+        if r.encoding is None:
+            r.encoding = 'utf-8'
+        return r
+
+    @classmethod
+    def _read(cls, page):
+        """
+        Read the decoded text of a page, in chunks as it downloads
+        """
+        if isinstance(page, str):
+            yield page
+            return
+        with page:
+            # `iter_content` waits for each chunk to fill;
+            # `read1` returns whatever has arrived, as soon as it arrives.
+            read1 = getattr(page.raw, 'read1', None)
+            if read1 is None:
+                chunks = page.iter_content(cls.CHUNK_SIZE)
+            else:
+                chunks = iter(lambda: read1(cls.CHUNK_SIZE, decode_content=True), b'')
+            decoder = codecs.getincrementaldecoder(page.encoding)(errors='replace')
+            for data in chunks:
+                if METRICS.enabled:
+                    METRICS.increment('search_response_bytes_total', len(data))
+                chunk = decoder.decode(data)
+                if chunk:
+                    yield chunk
+            chunk = decoder.decode(b'', final=True)
+            if chunk:
+                yield chunk
+
+    @staticmethod
+    def _close(page):
+        """
+        Release a page that won't be read
+        """
+        if not isinstance(page, str):
+            page.close()
 
 
 class SearchResultParser(HTMLParser):
@@ -115,11 +522,38 @@ class SearchResultParser(HTMLParser):
         When we parse a document, we're looking for two kinds of links:
         - links to search results
         - a link to the next page of paginated results
+
+        Documents may be fed in chunks, as they download;
+        `pop_links` returns the links found since it was last called.
         """
         self.links = set()
         self.next = ''
+        self._new_links = []
+        # Look up the settings once per document, not once per attribute
+        self._paginate_id_prefix = SETTINGS['SEARCH_PAGINATE_ID_PREFIX']
+        self._path_record = SETTINGS['SEARCH_PATH_RECORD']
+        self._path_search = SETTINGS['SEARCH_PATH_SEARCH']
         super().__init__(*args, **kwargs)
 
+    def feed(self, data):
+        """
+        Parse a chunk of a document, timing it if metrics are enabled
+        """
+        if not METRICS.enabled:
+            return super().feed(data)
+        start = time.perf_counter()
+        super().feed(data)
+        METRICS.observe('search_html_parse_seconds', time.perf_counter() - start)
+        return None
+
+    def pop_links(self):
+        """
+        Get the links to search results found since the last call
+        """
+        links = self._new_links
+        self._new_links = []
+        return links
+
     def handle_starttag(self, tag, attrs):
         """
         Parse tags, looking for links to search results
@@ -131,16 +565,20 @@ class SearchResultParser(HTMLParser):
         is_pagination = False
         search_link = ''
         for (key, value) in attrs:
-            if key == 'id' and value.startswith(SETTINGS['SEARCH_PAGINATE_ID_PREFIX']):
+            if not value:
+                continue
+            if key == 'id' and value.startswith(self._paginate_id_prefix):
                 # Mark the tag as a pagination link, but wait until we
                 # find an href.
                 is_pagination = True
             elif key == 'href':
-                if value.find(SETTINGS['SEARCH_PATH_RECORD']) == 0:
-                    self.links.add(value)
+                if value.startswith(self._path_record):
+                    if value not in self.links:
+                        self.links.add(value)
+                        self._new_links.append(value)
                     # We can stop once we know it's a link to a record.
                     return
-                elif value.find(SETTINGS['SEARCH_PATH_SEARCH']) == 0:
+                elif value.startswith(self._path_search):
                     # If it looks like a search link, we have to be sure
                     # it's actually a pagination link beore we can return.
                     search_link = value
@@ -0,0 +1,254 @@
+"""
+Inverted indexes over the subfields of local MARC files
+
+Titles, names and identifiers are split into normalized terms,
+each mapped to the records containing it;
+the index is then persisted beside the file,
+so most lookups never need the remote catalog.
+"""
+import json
+import re
+import unicodedata
+
+from .binary import MarcRecordBinary
+from .binary import open_records
+from .index import RecordIndex
+from .index import normalize_oclc_number
+from .record import MarcRecordText
+
+
+_REGEX_COMBINING = re.compile('[\u0300-\u036f]')
+_REGEX_QUALIFIER = re.compile(r'^\([^)]*\)')
+_REGEX_WORD = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """
+    Split text into normalized terms
+
+    Terms are lowercase words, with any accents removed,
+    e.g. `Amélie (Motion picture)` is `amelie`, `motion`, `picture`.
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = _REGEX_COMBINING.sub('', text)
+    return _REGEX_WORD.findall(text.lower())
+
+
+def normalize_identifier(value):
+    """
+    Normalize an identifier (e.g. ISBN, UPC, OCLC number) into a single term
+
+    Any qualifier after the identifier is dropped, as are hyphens.
+    OCLC numbers lose their prefixes and leading zeros, as for `RecordIndex`;
+    any other qualifier before the identifier is kept,
+    so numbers from different sources don't collide.
+    e.g. `(OCoLC)on1017697643` is `1017697643`,
+    `(DLC)  12345` is `(dlc)12345`,
+    and `978-1-4359-0339-0 (DVD)` is `9781435903390`.
+    """
+    value = value.strip()
+    qualifier = ''
+    number = normalize_oclc_number(value)
+    if number is not None:
+        value = number
+    else:
+        match = _REGEX_QUALIFIER.match(value)
+        if match:
+            qualifier = match.group()
+            value = value[match.end():].strip()
+    parts = value.split(maxsplit=1)
+    if not parts:
+        return ''
+    return (qualifier + parts[0].replace('-', '')).lower()
+
+
+class TermIndex:
+    """
+    An inverted index of the terms in a MARC file, by kind of field
+
+    Both text (.mrk) and binary (.mrc) files are supported.
+    Records are numbered by their position in the file,
+    as for `RecordIndex`.
+    """
+
+    SUFFIX = '.terms.json'
+    VERSION = 2
+
+    """
+    The kinds of fields to index,
+    each a list of tags and the subfield codes to index in each,
+    along with the function to split their values into terms
+    """
+    FIELDS = {
+        'title': (
+            (('245', 'abnp'),),
+            tokenize,
+        ),
+        'name': (
+            (('100', 'aq'), ('700', 'aq')),
+            tokenize,
+        ),
+        'identifier': (
+            (('020', 'az'), ('024', 'az'), ('035', 'az')),
+            lambda value: [normalize_identifier(value)],
+        ),
+    }
+
+    def __init__(self, input_file, ids, terms):
+        """
+        Create a new index object, manually specifying data
+
+        - `ids` is the control number (001) of each record, in order
+        - `terms` maps each kind of field to a dict of terms
+          to sorted lists of record numbers
+        """
+        self.input_file = input_file
+        self.ids = ids
+        self.terms = terms
+
+    def __len__(self):
+        """
+        Count the records in the file
+        """
+        return len(self.ids)
+
+    def find(self, query, field='title'):
+        """
+        Find the numbers of the records matching every term in a query
+        """
+        function = self.FIELDS[field][1]
+        terms = [
+            term
+            for term in function(query)
+            if term
+        ]
+        if not terms:
+            return []
+        postings = self.terms[field]
+        numbers = None
+        # Intersect the rarest terms first, to keep the set small
+        for term in sorted(terms, key=lambda term: len(postings.get(term, ()))):
+            found = postings.get(term)
+            if not found:
+                return []
+            if numbers is None:
+                numbers = set(found)
+            else:
+                numbers.intersection_update(found)
+            if not numbers:
+                return []
+        return sorted(numbers)
+
+    def search(self, query, field='title'):
+        """
+        Find the control numbers of the records matching a query
+        """
+        return [
+            self.ids[number]
+            for number in self.find(query, field)
+        ]
+
+    @classmethod
+    def index_file(cls, input_file):
+        """
+        Get the path of the index persisted beside a file
+        """
+        return input_file + cls.SUFFIX
+
+    @classmethod
+    def open(cls, input_file, rebuild=False):
+        """
+        Open the index of a file,
+        building it first if it's missing or out of date
+        """
+        instance = None
+        if not rebuild:
+            instance = cls.load(input_file)
+        if instance is None:
+            instance = cls.build(input_file)
+            instance.save()
+        return instance
+
+    @classmethod
+    def load(cls, input_file):
+        """
+        Load the persisted index of a file
+
+        Returns None if there is no index,
+        or if the file has changed since it was built.
+        """
+        try:
+            with open(cls.index_file(input_file)) as stream:
+                data = json.load(stream)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != cls.VERSION:
+            return None
+        if data.get('signature') != RecordIndex.signature(input_file):
+            return None
+        if set(data['terms']) != set(cls.FIELDS):
+            return None
+        instance = cls(input_file, data['ids'], data['terms'])
+        return instance
+
+    def save(self):
+        """
+        Persist the index beside its file
+        """
+        data = {
+            'version': self.VERSION,
+            'signature': RecordIndex.signature(self.input_file),
+            'ids': self.ids,
+            'terms': self.terms,
+        }
+        with open(self.index_file(self.input_file), 'w') as stream:
+            json.dump(data, stream)
+
+    @classmethod
+    def build(cls, input_file):
+        """
+        Scan a file, indexing the terms of each of its records
+        """
+        tags = set(['001'])
+        for (fields, _) in cls.FIELDS.values():
+            tags.update(tag for (tag, _) in fields)
+        ids = []
+        terms = {
+            field: {}
+            for field in cls.FIELDS
+        }
+        for (number, record) in enumerate(cls._records(input_file, tuple(tags))):
+            control_number = ''
+            for field in record.get_fields('001'):
+                control_number = field._str_data().strip()
+                break
+            ids.append(control_number)
+            for (name, (fields, function)) in cls.FIELDS.items():
+                postings = terms[name]
+                for (tag, codes) in fields:
+                    for field in record.get_fields(tag):
+                        for (code, value) in field.data:
+                            if code not in codes:
+                                continue
+                            for term in function(value):
+                                if not term:
+                                    continue
+                                numbers = postings.setdefault(term, [])
+                                if not numbers or numbers[-1] != number:
+                                    numbers.append(number)
+        instance = cls(input_file, ids, terms)
+        return instance
+
+    @staticmethod
+    def _records(input_file, tags):
+        """
+        Iterate over each record in a file, either text or binary,
+        parsing only the fields with the given tags
+        """
+        with open_records(input_file) as (stream, is_binary):
+            if is_binary:
+                for data in MarcRecordBinary.split_records(stream):
+                    yield MarcRecordBinary(data, tags=tags)
+            else:
+                for record in MarcRecordText.iter_records(stream, lazy=True):
+                    yield record
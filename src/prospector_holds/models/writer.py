@@ -0,0 +1,122 @@
+"""
+Write many records as text, in bulk
+
+The output is identical to `str()` of each record,
+each followed by a newline,
+but each line is built by plain concatenation
+and written out in batches, with a single `writelines` call.
+"""
+from .fields import Field
+from .fields import FieldWithPositions
+from .fields import FieldWithSubfields
+
+
+class MarcTextWriter:
+    """
+    Stream records to a text file object, e.g. a .mrk file
+    """
+
+    """
+    The number of records to buffer before writing them out
+    """
+    BATCH_SIZE = 256
+
+    def __init__(self, stream, width=0, batch_size=None):
+        """
+        Write to a text stream
+
+        - `width` wraps subfield data to a maximum width, as by
+          `FieldWithSubfields._str_data`; by default, lines aren't wrapped.
+        - `batch_size` is the number of records buffered between writes
+        """
+        self.stream = stream
+        self.width = width
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self._lines = []
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+    def write(self, record):
+        """
+        Buffer a record, writing out the buffer once it's full
+        """
+        lines = self._lines
+        lines.append(str(record.leader) + '\n')
+        if self.width:
+            for field in record.fields:
+                lines.append(self._line_wrapped(field) + '\n')
+        else:
+            for field in record.fields:
+                cls = type(field)
+                if cls is FieldWithSubfields:
+                    separator = field.SUBFIELD_SEPARATOR
+                    data = separator + separator.join([
+                        key + value
+                        for (key, value) in field.data
+                    ])
+                elif cls is FieldWithPositions:
+                    data = ''.join([
+                        value
+                        for (key, value) in field.data
+                    ])
+                elif cls is Field:
+                    data = ' '.join([
+                        value
+                        for (key, value) in field.data
+                    ])
+                else:
+                    lines.append(str(field) + '\n')
+                    continue
+                indicator = field.indicator
+                lines.append(
+                    field.tag + ' ' + indicator[0] + indicator[1] + ' ' + data + '\n'
+                )
+        self._count += 1
+        if self._count >= self.batch_size:
+            self.flush()
+
+    def write_records(self, records):
+        """
+        Write each of many records, returning the number written
+        """
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        self.flush()
+        return count
+
+    def flush(self):
+        """
+        Write out any buffered records
+        """
+        if self._lines:
+            self.stream.writelines(self._lines)
+            self._lines = []
+        self._count = 0
+
+    def _line_wrapped(self, field):
+        """
+        Serialize a field, wrapping its subfield data
+        """
+        if not isinstance(field, FieldWithSubfields):
+            return str(field)
+        return "{tag} {indicator1}{indicator2} {data}".format(
+            tag=field.tag,
+            indicator1=field.indicator[0],
+            indicator2=field.indicator[1],
+            data=field._str_data(width=self.width),
+        )
+
+    @classmethod
+    def write_file(cls, records, output_file, width=0):
+        """
+        Write each of many records to a file, returning the number written
+        """
+        with open(output_file, 'w') as stream:
+            return cls(stream, width=width).write_records(records)
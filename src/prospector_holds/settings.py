@@ -1,17 +1,20 @@
 from collections import defaultdict
 import json
+import marshal
 from os import getenv
+from os import getpid
+from os import listdir
 from os import path
 from os import makedirs
+from os import remove
+from os import replace
 import pkgutil
+import sys
+import zlib
 
 from .models.errors import MissingSettingsKeyError
 
 
-SCHEMA_JSON = json.loads(pkgutil.get_data(
-    __name__,
-    'schema.json'
-))
 _APP_NAME = '-'.join(__name__.split('.')[0].split('_'))
 _HOME = getenv('HOME', '/root')
 _XDG_CACHE_DEFAULT = path.join(_HOME, '.cache')
@@ -22,6 +25,88 @@ _CACHE = path.join(_XDG_CACHE, _APP_NAME)
 _CONFIG = path.join(_XDG_CONFIG, _APP_NAME)
 _APP_DIRECTORIES = (_CACHE, _CONFIG)
 _CONFIG_JSON = path.join(_CONFIG, 'config.json')
+_SCHEMA_CACHE_PATTERN = 'schema-{digest}-py{version}.marshal'
+
+
+def __getattr__(name):
+    """
+    Load the schema lazily, on first access of `SCHEMA_JSON`
+
+    Parsing the full schema is the most expensive part of importing
+    the package, and not every caller needs it.
+    Once loaded, the schema is bound as a regular module attribute,
+    so this hook only ever runs once.
+    """
+    if name == 'SCHEMA_JSON':
+        schema = _load_schema()
+        globals()[name] = schema
+        return schema
+    raise AttributeError(
+        "module {module!r} has no attribute {name!r}".format(
+            module=__name__,
+            name=name,
+        )
+    )
+
+
+def _load_schema():
+    """
+    Load the schema from its compiled form in the cache directory
+
+    The compiled copy is keyed by a checksum of `schema.json` (and the
+    python version, since the marshal format is version-specific),
+    so it's rebuilt automatically whenever the schema changes.
+    If the cache can't be read or written, we fall back to parsing
+    the JSON directly.
+    """
+    data = pkgutil.get_data(__name__, 'schema.json')
+    filename = _SCHEMA_CACHE_PATTERN.format(
+        digest='{:08x}'.format(zlib.crc32(data)),
+        version=''.join(map(str, sys.version_info[:2])),
+    )
+    compiled = path.join(_CACHE, filename)
+    try:
+        with open(compiled, 'rb') as stream:
+            return marshal.loads(stream.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    schema = json.loads(data)
+    try:
+        _compile_schema(schema, compiled)
+    except OSError:
+        # TODO: log error
+        pass
+    return schema
+
+
+def _compile_schema(schema, compiled):
+    """
+    Write the compiled schema to the cache, replacing any stale copies
+    """
+    makedirs(_CACHE, exist_ok=True)
+    # Only replace copies compiled by this version of Python;
+    # other versions sharing the cache keep their own.
+    prefix = _SCHEMA_CACHE_PATTERN.split('{', 1)[0]
+    suffix = _SCHEMA_CACHE_PATTERN.split('}', 1)[1].format(
+        version=''.join(map(str, sys.version_info[:2])),
+    )
+    stale = [
+        path.join(_CACHE, filename)
+        for filename in listdir(_CACHE)
+        if filename.startswith(prefix) and filename.endswith(suffix)
+    ]
+    # Write to a temporary file first, so concurrent processes never
+    # read a partially-written schema.
+    temporary = "{compiled}.{pid}".format(
+        compiled=compiled,
+        pid=getpid(),
+    )
+    with open(temporary, 'wb') as stream:
+        marshal.dump(schema, stream)
+    replace(temporary, compiled)
+    for filename in stale:
+        if filename != compiled:
+            remove(filename)
 
 
 def _default():
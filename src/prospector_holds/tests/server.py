@@ -0,0 +1,196 @@
+"""
+A local stand-in for the catalog, to test searches against
+"""
+import hashlib
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import os
+import sys
+from threading import Event
+from threading import Lock
+from threading import Thread
+from urllib.parse import urlsplit
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+
+LAST_MODIFIED = 'Thu, 25 Jan 2024 09:26:31 GMT'
+
+
+def make_records(count):
+    """
+    Create a few distinct records from the sample record,
+    keyed by the path of their link
+    """
+    with open(INPUT_FILE) as stream:
+        text = stream.read()
+    return {
+        '/record/{number}'.format(number=number): text.replace(
+            '1017697643',
+            '10176976{:02d}'.format(number),
+        )
+        for number in range(count)
+    }
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """
+    Serve search results and records, over keep-alive connections
+
+    Responses carry an ETag, so clients can revalidate them.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        """
+        Count each new connection
+        """
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        """
+        Keep the test output quiet
+        """
+
+    def do_GET(self):
+        """
+        Serve a record, or a page of search results
+        """
+        path = '/' + urlsplit(self.path).path.lstrip('/')
+        with self.server.lock:
+            self.server.paths.append(path)
+            self.server.revalidations += 'If-None-Match' in self.headers
+        if path in self.server.records:
+            body = self.server.records[path]
+            content_type = 'text/plain; charset=utf-8'
+        elif path.startswith('/search/'):
+            body = self.server.page(path)
+            content_type = 'text/html; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+        body = body.encode('utf-8')
+        etag = '"{digest}"'.format(
+            digest=hashlib.sha1(body).hexdigest(),
+        )
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', LAST_MODIFIED)
+        self.end_headers()
+        if self.server.delay and path.startswith('/search/'):
+            # Send the first half of the page, and stall before the rest
+            half = len(body) // 2
+            self.wfile.write(body[:half])
+            self.wfile.flush()
+            self.server.resume.wait(self.server.delay)
+            body = body[half:]
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.finished.append(path)
+
+
+class CatalogServer(ThreadingHTTPServer):
+    """
+    A catalog of records, with search results split into pages
+
+    Every search returns every record.
+    With a `delay`, each page of results stalls halfway through its body,
+    until that many seconds pass or `resume` is set.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, records, page_size=2, delay=0):
+        super().__init__(('127.0.0.1', 0), CatalogHandler)
+        self.records = records
+        self.page_size = page_size
+        self.delay = delay
+        self.connections = 0
+        self.revalidations = 0
+        self.paths = []
+        self.finished = []
+        self.resume = Event()
+        self.lock = Lock()
+        self._thread = None
+
+    @property
+    def settings(self):
+        """
+        The settings needed to search this catalog
+        """
+        return {
+            'SEARCH_PROTOCOL': 'http',
+            'SEARCH_DOMAIN': '{host}:{port}'.format(
+                host=self.server_address[0],
+                port=self.server_address[1],
+            ),
+            'SEARCH_PATH_SEARCH': '/search/',
+            'SEARCH_PATH_RECORD': '/record/',
+            'SEARCH_PAGINATE_ID_PREFIX': 'pagination_link_',
+            'SEARCH_RECORD_MARC_DATA_QUERY_STRING': {
+                'marc_data': 'yes',
+            },
+        }
+
+    def handle_error(self, request, client_address):
+        """
+        Ignore clients that hang up before a page is sent
+
+        Searches that stop early close their connection mid-page.
+        """
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def page(self, path):
+        """
+        Render a page of search results as HTML
+        """
+        number = 0
+        if path.startswith('/search/page/'):
+            number = int(path.rsplit('/', 1)[-1])
+        links = sorted(self.records)
+        start = number * self.page_size
+        pagination = ''
+        if start + self.page_size < len(links):
+            pagination = '<a id="pagination_link_next" href="/search/page/{number}">Next</a>'.format(
+                number=number + 1,
+            )
+        # Like the catalog, pagination links come both before and after results
+        parts = ['<html><body>', pagination, '<ul>']
+        for link in links[start:start + self.page_size]:
+            parts.append('<li><a class="title" href="{link}">Title</a></li>'.format(
+                link=link,
+            ))
+        parts.append('</ul>')
+        parts.append(pagination)
+        parts.append('</body></html>')
+        return ''.join(parts)
+
+    def __enter__(self):
+        self._thread = Thread(
+            target=self.serve_forever,
+            kwargs={'poll_interval': 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
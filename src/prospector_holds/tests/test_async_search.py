@@ -0,0 +1,139 @@
+"""
+Check asynchronous searches against a local stand-in for the catalog
+"""
+import asyncio
+from threading import Lock
+import time
+import unittest
+from unittest import mock
+
+from prospector_holds.models.async_search import ThreadedAsyncSearch
+from prospector_holds.models.async_search import RateLimiter
+from prospector_holds.models.search import Search
+from prospector_holds.settings import SETTINGS
+from prospector_holds.tests.server import CatalogServer
+from prospector_holds.tests.server import make_records
+
+
+RECORD_COUNT = 10
+
+
+async def collect(items):
+    return [item async for item in items]
+
+
+class TestThreadedAsyncSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CatalogServer(make_records(RECORD_COUNT), page_size=3)
+        self.server.__enter__()
+        self.settings = mock.patch.dict(SETTINGS, self.server.settings)
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        self.server.__exit__()
+
+    def run_search(self, function, **kwargs):
+        async def main():
+            async with ThreadedAsyncSearch(**kwargs) as search:
+                return await function(search)
+        return asyncio.run(main())
+
+    def test_query_title(self):
+        links = self.run_search(
+            lambda search: collect(search.query_title('night of the living dead'))
+        )
+        assert sorted(links) == sorted(self.server.records)
+
+    def test_query_title_max_pages(self):
+        links = self.run_search(
+            lambda search: collect(search.query_title('night of the living dead', max_pages=2))
+        )
+        assert len(links) == 2 * self.server.page_size
+        assert len(self.server.paths) == 2
+
+    def test_query_title_concurrent(self):
+        async def queries(search):
+            return await asyncio.gather(*[
+                collect(search.query_title(title))
+                for title in ('night', 'of the living', 'dead')
+            ])
+        results = self.run_search(queries)
+        for links in results:
+            assert sorted(links) == sorted(self.server.records)
+
+    def test_fetch_marc_record(self):
+        record = self.run_search(
+            lambda search: search.fetch_marc_record('/record/3')
+        )
+        assert record.fields_dict['001'][0].data == ((False, '1017697603'),)
+
+    def test_fetch_marc_records(self):
+        async def fetch(search):
+            links = search.query_title('night of the living dead')
+            return await collect(search.fetch_marc_records(links))
+        records = self.run_search(fetch, concurrency=4)
+        numbers = sorted(
+            record.fields_dict['001'][0].data[0][1]
+            for record in records
+        )
+        assert numbers == [
+            '10176976{:02d}'.format(number)
+            for number in range(RECORD_COUNT)
+        ]
+
+    def test_concurrency(self):
+        """
+        Ensure no more than `concurrency` requests are in flight at once
+        """
+        lock = Lock()
+        counts = {'current': 0, 'maximum': 0}
+        get = Search._get
+
+        def _get(url):
+            with lock:
+                counts['current'] += 1
+                counts['maximum'] = max(counts['maximum'], counts['current'])
+            time.sleep(0.01)
+            try:
+                return get(url)
+            finally:
+                with lock:
+                    counts['current'] -= 1
+
+        with mock.patch.object(Search, '_get', side_effect=_get):
+            records = self.run_search(
+                lambda search: collect(search.fetch_marc_records(self.server.records)),
+                concurrency=2,
+            )
+        assert len(records) == RECORD_COUNT
+        assert counts['maximum'] == 2
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_wait(self):
+        async def main():
+            limiter = RateLimiter(50)
+            loop = asyncio.get_running_loop()
+            times = {}
+
+            async def request(url):
+                await limiter.wait(url)
+                times.setdefault(url.split('/')[2], []).append(loop.time())
+
+            await asyncio.gather(*[
+                request(url)
+                for url in ['http://a.test/'] * 4 + ['http://b.test/'] * 2
+            ])
+            return times
+        times = asyncio.run(main())
+        # Requests to one host are spaced out
+        assert times['a.test'][-1] - times['a.test'][0] >= 3 * 0.02 * 0.9
+        # Other hosts aren't held up by them
+        assert times['b.test'][0] < times['a.test'][1]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Check binary records
+"""
+from io import BytesIO
+import os
+import tempfile
+import unittest
+
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.binary import open_records
+from prospector_holds.models.errors import InvalidRecordError
+from prospector_holds.models.fields import Field
+from prospector_holds.models.record import MarcRecordText
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+
+
+class TestBinary(unittest.TestCase):
+
+    def setUp(self):
+        self.text = MarcRecordText.from_file(INPUT_FILE)
+
+    def test_serialize(self):
+        data = bytes(MarcRecordBinary.from_record(self.text))
+        assert data[-1:] == b'\x1d'
+        assert int(data[0:5]) == len(data)
+        base_address = int(data[12:17])
+        assert data[base_address - 1:base_address] == b'\x1e'
+        # The first directory entry is the 001 field
+        assert data[24:27] == b'001'
+        length = int(data[27:31])
+        start = base_address + int(data[31:36])
+        assert data[start:start + length] == b'1017697643\x1e'
+
+    def test_round_trip(self):
+        data = bytes(MarcRecordBinary.from_record(self.text))
+        record = MarcRecordBinary.from_bytes(data)
+        assert record.leader.type_of_record == 'g'
+        assert len(record.fields) == len(self.text.fields)
+        # Only the record length and base address in the leader differ
+        lines = str(MarcRecordText.from_record(record)).split('\n')
+        expected = str(self.text).split('\n')
+        assert lines[1:] == expected[1:]
+        assert record.leader.record_length == '{:05d}'.format(len(data))
+        assert bytes(record) == data
+
+    def test_subfields(self):
+        data = bytes(MarcRecordBinary.from_record(self.text))
+        record = MarcRecordBinary(memoryview(data))
+        field = record.fields_dict['245'][0]
+        assert field.indicator == ('0', '0')
+        assert field.data_dict['a'] == ['Night of the living dead /']
+
+    def test_iter_records(self):
+        data = bytes(MarcRecordBinary.from_record(self.text))
+        stream = BytesIO(data * 3)
+        records = list(MarcRecordBinary.iter_records(stream))
+        assert len(records) == 3
+        for record in records:
+            assert bytes(record) == data
+
+    def test_open_records(self):
+        with open_records(INPUT_FILE) as (stream, is_binary):
+            assert not is_binary
+            assert stream.read().lstrip().startswith('LEADER')
+        data = bytes(MarcRecordBinary.from_record(self.text))
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = os.path.join(directory, 'records.mrc')
+            with open(output_file, 'wb') as stream:
+                stream.write(data)
+            with open_records(output_file) as (stream, is_binary):
+                assert is_binary
+                assert stream.read() == data
+
+    def test_invalid(self):
+        with self.assertRaises(InvalidRecordError):
+            MarcRecordBinary(b'00000')
+        with self.assertRaises(InvalidRecordError):
+            list(MarcRecordBinary.iter_records(BytesIO(b'abcde')))
+        with self.assertRaises(InvalidRecordError):
+            list(MarcRecordBinary.iter_records(BytesIO(b'00100cgm')))
+        for prefix in (b'00000', b'00003', b'00023'):
+            stream = BytesIO(prefix + b'x' * 100)
+            with self.assertRaisesRegex(InvalidRecordError, 'shorter than its leader'):
+                list(MarcRecordBinary.split_records(stream))
+            # Nothing past the length is read
+            assert stream.tell() == len(prefix)
+
+    def test_invalid_directory(self):
+        data = bytes(MarcRecordBinary.from_record(self.text))
+        # A base address within the leader
+        with self.assertRaises(InvalidRecordError):
+            MarcRecordBinary(data[:12] + b'00010' + data[17:])
+        # A directory entry with a non-numeric length
+        with self.assertRaises(InvalidRecordError):
+            MarcRecordBinary(data[:27] + b'abcd' + data[31:])
+        # Bytes that aren't valid in the encoding
+        with self.assertRaises(InvalidRecordError):
+            MarcRecordBinary(data[:5] + b'\xff' + data[6:])
+        with self.assertRaises(InvalidRecordError):
+            MarcRecordBinary(data[:24] + b'\xff' + data[25:])
+
+    def test_oversized_field(self):
+        record = MarcRecordBinary.from_record(self.text)
+        record.fields.append(Field('500', (' ', ' '), ((False, 'x' * 10000),)))
+        with self.assertRaisesRegex(InvalidRecordError, 'Length of field 500'):
+            bytes(record)
+
+    def test_oversized_record(self):
+        record = MarcRecordBinary.from_record(self.text)
+        for _ in range(11):
+            record.fields.append(Field('500', (' ', ' '), ((False, 'x' * 9000),)))
+        with self.assertRaisesRegex(InvalidRecordError, 'Record length'):
+            bytes(record)
+
+
+if __name__ == '__main__':
+    unittest.main()
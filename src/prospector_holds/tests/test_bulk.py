@@ -0,0 +1,71 @@
+"""
+Check parsing records in parallel
+"""
+from io import BytesIO
+from io import StringIO
+import os
+import unittest
+
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.bulk import BulkParser
+from prospector_holds.models.record import MarcRecordText
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+RECORD_COUNT = 7
+
+
+class TestBulk(unittest.TestCase):
+
+    def setUp(self):
+        with open(INPUT_FILE) as stream:
+            text = stream.read()
+        self.texts = [
+            text.replace('1017697643', '10176976{:02d}'.format(number))
+            for number in range(RECORD_COUNT)
+        ]
+        self.expected = [
+            str(MarcRecordText.from_string(text))
+            for text in self.texts
+        ]
+
+    def _parse(self, **kwargs):
+        stream = StringIO('\n'.join(self.texts))
+        bulk = BulkParser(chunk_size=2, **kwargs)
+        return [
+            str(record)
+            for record in bulk.parse(stream)
+        ]
+
+    def test_ordered(self):
+        assert self._parse(workers=2) == self.expected
+
+    def test_unordered(self):
+        records = self._parse(workers=2, ordered=False)
+        assert sorted(records) == sorted(self.expected)
+
+    def test_single(self):
+        assert self._parse(workers=1) == self.expected
+
+    def test_binary(self):
+        data = b''.join(
+            bytes(MarcRecordBinary.from_record(MarcRecordText.from_string(text)))
+            for text in self.texts
+        )
+        bulk = BulkParser(workers=2, chunk_size=3)
+        records = list(bulk.parse(BytesIO(data), cls=MarcRecordBinary))
+        assert len(records) == RECORD_COUNT
+        assert [
+            str(MarcRecordText.from_record(record)).split('\n')[1:]
+            for record in records
+        ] == [
+            text.split('\n')[1:]
+            for text in self.expected
+        ]
+
+
+if __name__ == '__main__':
+    unittest.main()
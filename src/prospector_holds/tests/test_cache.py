@@ -0,0 +1,183 @@
+"""
+Check the persistent caches
+"""
+import os
+from tempfile import TemporaryDirectory
+import time
+import unittest
+from unittest import mock
+
+from prospector_holds.models.cache import DiskCache
+from prospector_holds.models.cache import RecordStore
+from prospector_holds.models.cache import ResponseCache
+from prospector_holds.models.fields import Field
+from prospector_holds.models.leader import Leader
+from prospector_holds.models.record import MarcRecordText
+from prospector_holds.models.search import Search
+from prospector_holds.settings import SETTINGS
+from prospector_holds.tests.server import CatalogServer
+from prospector_holds.tests.server import INPUT_FILE
+from prospector_holds.tests.server import make_records
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_get_set(self):
+        cache = DiskCache(self.directory.name, max_size=1024)
+        assert cache.get('key') is None
+        cache.set('key', b'value')
+        assert cache.get('key') == b'value'
+        assert cache.size() == len(b'value')
+        cache.delete('key')
+        assert cache.get('key') is None
+        assert cache.size() == 0
+
+    def test_evict(self):
+        cache = DiskCache(self.directory.name, max_size=35)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, b'0123456789')
+            # Make sure each entry has a distinct time of use
+            filename = cache._path(key)
+            timestamp = time.time() - 100 + ord(key)
+            os.utime(filename, (timestamp, timestamp))
+        # Use the oldest entry, so the next-oldest is evicted instead
+        cache.get('a')
+        cache.set('d', b'0123456789')
+        assert cache.get('a') == b'0123456789'
+        assert cache.get('b') is None
+        assert cache.get('c') == b'0123456789'
+        assert cache.get('d') == b'0123456789'
+        assert cache.size() == 30
+
+    def test_evict_temporary(self):
+        cache = DiskCache(self.directory.name, max_size=25)
+        cache.set('a', b'0123456789')
+        # A temporary file left behind by an interrupted write
+        temporary = cache._path('b') + '.1234.5678'
+        os.makedirs(os.path.dirname(temporary), exist_ok=True)
+        with open(temporary, 'wb') as stream:
+            stream.write(b'0123456789')
+        timestamp = time.time() - 100
+        os.utime(temporary, (timestamp, timestamp))
+        cache = DiskCache(self.directory.name, max_size=25)
+        assert cache.size() == 20
+        cache.set('c', b'0123456789')
+        assert not os.path.exists(temporary)
+        assert cache.get('a') == b'0123456789'
+        assert cache.size() == 20
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.server = CatalogServer(make_records(3), page_size=2)
+        self.server.__enter__()
+        self.settings = mock.patch.dict(SETTINGS, self.server.settings)
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        self.server.__exit__()
+        self.directory.cleanup()
+
+    def _fetch(self, ttl):
+        cache = ResponseCache(self.directory.name, ttl=ttl)
+        with mock.patch.object(Search, 'cache', cache):
+            record = Search.fetch_marc_record('/record/1')
+        return record
+
+    def test_fresh(self):
+        first = self._fetch(ttl=60)
+        second = self._fetch(ttl=60)
+        assert len(self.server.paths) == 1
+        assert str(first) == str(second)
+
+    def test_revalidate(self):
+        first = self._fetch(ttl=0)
+        second = self._fetch(ttl=0)
+        assert len(self.server.paths) == 2
+        assert self.server.revalidations == 1
+        assert str(first) == str(second)
+
+    def test_changed(self):
+        self._fetch(ttl=0)
+        self.server.records['/record/1'] = self.server.records['/record/2']
+        record = self._fetch(ttl=0)
+        assert record.fields_dict['001'][0].data == ((False, '1017697602'),)
+
+    def test_stale_on_error(self):
+        first = self._fetch(ttl=0)
+        del self.server.records['/record/1']
+        second = self._fetch(ttl=0)
+        assert len(self.server.paths) == 2
+        assert str(first) == str(second)
+
+
+class TestRecordStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.store = RecordStore(self.directory.name)
+        with open(INPUT_FILE) as stream:
+            self.text = stream.read()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key(self):
+        key = RecordStore.key_from_string(self.text)
+        assert key == 'v3:1017697643:20240125092631.0'
+        record = MarcRecordText.from_string(self.text)
+        assert RecordStore.key_from_record(record) == key
+        assert RecordStore.key_from_string('LEADER 00000cgm') is None
+        text = self.text.replace('001    ', '001 \\\\ ').replace('005    ', '005 \\\\ ')
+        assert RecordStore.key_from_string(text) == key
+
+    def test_from_string(self):
+        first = self.store.from_string(self.text)
+        with mock.patch.object(MarcRecordText, 'from_string') as from_string, \
+                mock.patch.object(MarcRecordText, 'from_text') as from_text, \
+                mock.patch.object(Field, 'from_data') as from_data, \
+                mock.patch.object(Leader, 'from_string') as leader_from_string:
+            second = self.store.from_string(self.text)
+            # Nothing is parsed again
+            from_string.assert_not_called()
+            from_text.assert_not_called()
+            from_data.assert_not_called()
+            leader_from_string.assert_not_called()
+        assert str(second) == str(first)
+        assert list(map(repr, second.fields)) == list(map(repr, first.fields))
+        assert list(map(type, second.fields)) == list(map(type, first.fields))
+        assert second.leader.type_of_record == 'g'
+
+    def test_changed(self):
+        self.store.from_string(self.text)
+        text = self.text.replace('20240125092631.0', '20250101000000.0')
+        with mock.patch.object(MarcRecordText, 'from_string', wraps=MarcRecordText.from_string) as from_string:
+            record = self.store.from_string(text)
+            from_string.assert_called_once()
+        assert record.get_fields('005')[0].data == ((False, '20250101000000.0'),)
+
+    def test_corrupt(self):
+        key = RecordStore.key_from_string(self.text)
+        for data in (b'not a record', b'\xff\xfe', b'[]', b'[1, []]', b'["", [["Evil", "245", "  ", []]]]'):
+            self.store.cache.set(key, data)
+            assert self.store.get(key) is None
+            record = self.store.from_string(self.text)
+            assert str(record) == str(MarcRecordText.from_string(self.text))
+
+    def test_warm(self):
+        assert self.store.warm([INPUT_FILE]) == 1
+        key = RecordStore.key_from_string(self.text)
+        assert self.store.get(key) is not None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Check exporting records into columns
+"""
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from prospector_holds.models.columns import ColumnExporter
+from prospector_holds.models.columns import numpy
+from prospector_holds.models.record import MarcRecordText
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+RECORD_COUNT = 5
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestColumnExporter(unittest.TestCase):
+
+    def setUp(self):
+        with open(INPUT_FILE) as stream:
+            text = stream.read()
+        self.records = [
+            MarcRecordText.from_string(
+                text.replace('1017697643', '10176976{:02d}'.format(number))
+            )
+            for number in range(RECORD_COUNT)
+        ]
+        self.exporter = ColumnExporter(
+            columns=('001', '245$a', '999$z'),
+            batch_size=2,
+        )
+
+    def test_columns(self):
+        array = self.exporter.to_array(self.records)
+        record = self.records[0]
+        assert len(array) == RECORD_COUNT
+        assert array['LDR'][0].decode('ascii') == record.leader._str_data()
+        assert (array['LDR/type_of_record'] == b'g').all()
+        fixed = record.fields_dict['008'][0].data_dict
+        assert array['008/date_1'][0].decode('ascii') == fixed['date_1'][0]
+        assert array['008/language'][0].decode('ascii') == fixed['language'][0]
+        assert array['245$a'][0] == record.fields_dict['245'][0].data_dict['a'][0]
+        assert array['001'][4] == '1017697604'
+        assert array['999$z'][0] == ''
+
+    def test_export(self):
+        batches = list(self.exporter.export(self.records))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert batches[2]['001'][0] == '1017697604'
+
+    def test_width(self):
+        exporter = ColumnExporter(columns=('245$a',), width=5)
+        array = exporter.to_array(self.records)
+        assert array['245$a'][0] == self.records[0].fields_dict['245'][0].data_dict['a'][0][:5]
+
+    def test_invalid(self):
+        for columns in (('LDR',), ('008/date_1',), ('001', '245$a', '001')):
+            with self.assertRaises(ValueError):
+                ColumnExporter(columns=columns)
+
+    def test_lazy(self):
+        records = [
+            MarcRecordText.from_string(str(record), lazy=True)
+            for record in self.records
+        ]
+        assert (self.exporter.to_array(records) == self.exporter.to_array(self.records)).all()
+
+    def test_write(self):
+        with TemporaryDirectory() as directory:
+            output_file = os.path.join(directory, 'records.npy')
+            assert self.exporter.write(self.records, output_file) == RECORD_COUNT
+            batches = list(ColumnExporter.read(output_file))
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        array = numpy.concatenate(batches)
+        assert (array == self.exporter.to_array(self.records)).all()
+
+
+if __name__ == '__main__':
+    unittest.main()
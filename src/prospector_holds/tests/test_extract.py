@@ -0,0 +1,117 @@
+"""
+Check extracting values by path expressions
+"""
+from io import StringIO
+import os
+import tempfile
+import unittest
+
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.errors import InvalidPathError
+from prospector_holds.models.extract import PathExtractor
+from prospector_holds.models.record import MarcRecordText
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+
+PATHS = (
+    'LDR/06',
+    'LDR/07-08',
+    '001',
+    '008/07-10',
+    '008/35-37',
+    '020$a',
+    '245$a',
+    '245',
+    '500$a',
+)
+
+
+class TestPathExtractor(unittest.TestCase):
+
+    def setUp(self):
+        with open(INPUT_FILE) as stream:
+            self.text = stream.read()
+        self.record = MarcRecordText.from_string(self.text)
+
+    def test_extract(self):
+        values = PathExtractor(PATHS).extract(self.text)
+        assert values[0] == ('g',)
+        assert values[1] == ('m ',)
+        assert values[2] == ('1017697643',)
+        assert values[3] == ('2018',)
+        assert values[4] == ('eng',)
+        assert values[5] == ('9781681434018', '1681434016')
+        assert values[6] == ('Night of the living dead /',)
+        assert values[7] == (self.record.get_fields('245')[0]._str_data(),)
+        assert len(values[8]) == len(self.record.get_fields('500'))
+
+    def test_extract_record(self):
+        extractor = PathExtractor(PATHS)
+        assert extractor.extract_record(self.record) == extractor.extract(self.text)
+
+    def test_positions_as_parsed(self):
+        """
+        Ensure positions come from the data of the parsed field,
+        even where that differs from the raw text
+        """
+        extractor = PathExtractor(['008', '008/35-37', '007', '007/00-01'])
+        unknown_form = self.text.replace('LEADER 00000cgm', 'LEADER 00000cxm', 1)
+        long_007 = self.text.replace('\n007    vd', '\n007    vd#bsaizmEXTRA_LONG_DATA\n007    vd', 1)
+        assert long_007 != self.text
+        for text in (unknown_form, long_007):
+            record = MarcRecordText.from_string(text)
+            assert extractor.extract(text) == extractor.extract_record(record)
+        assert extractor.extract(long_007)[2][0] == 'vd#bsaizm'
+
+    def test_first(self):
+        extractor = PathExtractor(['245$a', '130$a', 'LDR/06'], first=True)
+        assert extractor.extract(self.text) == ('Night of the living dead /', None, 'g')
+
+    def test_as_dict(self):
+        extractor = PathExtractor(['001', '008/07-10'], first=True, as_dict=True)
+        assert extractor.extract(self.text) == {
+            '001': '1017697643',
+            '008/07-10': '2018',
+        }
+
+    def test_continuation(self):
+        text = '\n'.join([
+            'LEADER 00000cgm a2201093 i 4500',
+            '245 10 |aNight of ',
+            '       the living dead /|cRomero.',
+            '999    local data',
+        ])
+        extractor = PathExtractor(['245$a', '245$c'])
+        assert extractor.extract(text) == (('Night of the living dead /',), ('Romero.',))
+
+    def test_invalid(self):
+        for path in ('24', '245$', '245/01', '001$a', 'LDR$a', '008/10-07', '999$a'):
+            with self.assertRaises(InvalidPathError):
+                PathExtractor([path])
+
+    def test_iter(self):
+        second = self.text.replace('LEADER 00000cgm', 'LDR 00000cam', 1)
+        text = self.text + '\n' + second
+        extractor = PathExtractor(['LDR/06', '001'], first=True)
+        expected = [('g', '1017697643'), ('a', '1017697643')]
+        assert list(extractor.iter_text(text)) == expected
+        assert list(extractor.iter_records(StringIO(text))) == expected
+
+    def test_iter_file(self):
+        extractor = PathExtractor(PATHS)
+        expected = extractor.extract(self.text)
+        assert list(extractor.iter_file(INPUT_FILE)) == [expected]
+        data = bytes(MarcRecordBinary.from_record(self.record))
+        with tempfile.TemporaryDirectory() as directory:
+            output_file = os.path.join(directory, 'records.mrc')
+            with open(output_file, 'wb') as stream:
+                stream.write(data * 2)
+            assert list(extractor.iter_file(output_file)) == [expected, expected]
+
+
+if __name__ == '__main__':
+    unittest.main()
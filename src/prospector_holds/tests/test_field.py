@@ -15,6 +15,8 @@ class TestField(unittest.TestCase):
         assert field is not None
         string = str(field)
         assert string == line
+        assert field.repeatable is False
+        assert not hasattr(field, '__dict__')
 
     def test_subfield(self):
         subfield = 'This is a test'
@@ -37,6 +39,16 @@ class TestField(unittest.TestCase):
         ]:
             field = Field.from_lines((line,), leader=leader)
             assert len(field.data) > 0
+            assert str(field) == line.rstrip()
+
+    def test_position_unknown(self):
+        leader = Leader.from_string('LEADER 00000cxm a2201093 i 4500')
+        for line in [
+            '007    xd#bsaizm ',
+            '008    180102s2018    nyu096 e          vleng d ',
+        ]:
+            field = Field.from_lines((line,), leader=leader)
+            assert field.data == tuple()
 
 
 if __name__ == '__main__':
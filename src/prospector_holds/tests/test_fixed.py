@@ -0,0 +1,148 @@
+"""
+Check vectorized filtering by fixed-length fields
+"""
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.errors import InvalidRecordError
+from prospector_holds.models.fixed import FixedFields
+from prospector_holds.models.fixed import numpy
+from prospector_holds.models.index import RecordIndex
+from prospector_holds.models.record import MarcRecordText
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+
+"""
+The type of record, date 1 and language of each test record
+"""
+VARIANTS = (
+    ('g', '1968', 'eng'),
+    ('g', '2018', 'eng'),
+    ('a', '1968', 'eng'),
+    ('g', '1965', 'fre'),
+    ('g', '1970', 'eng'),
+)
+
+
+def _records():
+    """
+    Create a few records, varying their fixed-length fields
+    """
+    with open(INPUT_FILE) as stream:
+        text = stream.read()
+    for (number, (type_of_record, date, language)) in enumerate(VARIANTS):
+        yield (
+            text
+            .replace('1017697643', '10176976{:02d}'.format(number))
+            .replace('00000cgm', '00000c{}m'.format(type_of_record))
+            .replace('s2018    nyu', 's{}    nyu'.format(date))
+            .replace('vleng d', 'vl{} d'.format(language))
+        )
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestFixedFields(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.text_file = os.path.join(self.directory.name, 'records.mrk')
+        with open(self.text_file, 'w') as stream:
+            stream.write('\n'.join(_records()))
+        self.binary_file = os.path.join(self.directory.name, 'records.mrc')
+        with open(self.binary_file, 'wb') as stream:
+            for text in _records():
+                record = MarcRecordText.from_string(text)
+                stream.write(bytes(MarcRecordBinary.from_record(record)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check(self, input_file):
+        fixed = FixedFields.scan(input_file)
+        assert len(fixed) == len(VARIANTS)
+        assert list(fixed.column('008/language')) == [
+            language.encode('ascii')
+            for (_, _, language) in VARIANTS
+        ]
+        mask = (
+            fixed.is_video()
+            & fixed.between('008/date_1', '1960', '1970')
+            & fixed.equals('008/language', 'eng')
+        )
+        assert list(fixed.numbers(mask)) == [0, 4]
+        assert list(fixed.numbers(fixed.isin('008/date_1', ['1965', '2018']))) == [1, 3]
+        with RecordIndex.open(input_file) as index:
+            assert [tuple(offset) for offset in fixed.offsets] == index.offsets
+            records = [
+                index[number]
+                for number in fixed.numbers(mask)
+            ]
+        assert [record.fields_dict['001'][0].data[0][1] for record in records] == [
+            '1017697600',
+            '1017697604',
+        ]
+
+    def test_text(self):
+        self.check(self.text_file)
+
+    def test_binary(self):
+        self.check(self.binary_file)
+
+    def test_missing(self):
+        with open(self.text_file, 'w') as stream:
+            stream.write('LEADER 00000cgm a2201093 i 4500\n001    1\n')
+        fixed = FixedFields.scan(self.text_file)
+        assert len(fixed) == 1
+        assert not fixed.equals('008/language', 'eng').any()
+        assert fixed.is_video().all()
+
+    def test_indented(self):
+        texts = list(_records())
+        texts[1] = '  ' + texts[1].replace('LEADER 00000', 'LEADER      ', 1)
+        with open(self.text_file, 'w') as stream:
+            stream.write('\n'.join(texts))
+        fixed = FixedFields.scan(self.text_file)
+        with RecordIndex.open(self.text_file) as index:
+            assert [tuple(offset) for offset in fixed.offsets] == index.offsets
+            leaders = [
+                record.leader._str_data().encode('ascii')
+                for record in index
+            ]
+        assert list(fixed.column('LDR/type_of_record')) == [b'g', b'g', b'a', b'g', b'g']
+        assert [bytes(leader) for leader in fixed.leaders] == leaders
+
+    def test_invalid_binary(self):
+        with open(self.binary_file, 'rb') as stream:
+            data = stream.read()
+        length = int(data[:5], 10)
+        directory = data.index(b'008', 24)
+        invalid = [
+            # A length that would never advance, or would step backwards
+            b'00000' + data[5:44],
+            b'00010' + data[5:length],
+            # A record cut short
+            data[:length - 1],
+            # A directory entry for the 008 that isn't a number
+            data[:directory + 3] + b'x' + data[directory + 4:length],
+        ]
+        for contents in invalid:
+            with open(self.binary_file, 'wb') as stream:
+                stream.write(contents)
+            with self.assertRaises(InvalidRecordError):
+                FixedFields.scan(self.binary_file)
+
+    def test_empty(self):
+        open(self.text_file, 'w').close()
+        fixed = FixedFields.scan(self.text_file)
+        assert len(fixed) == 0
+        assert len(fixed.is_video()) == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Check random-access indexes over record files
+"""
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.index import RecordIndex
+from prospector_holds.models.record import MarcRecordText
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+RECORD_COUNT = 3
+
+
+def _records():
+    """
+    Create a few distinct records from the sample record
+    """
+    with open(INPUT_FILE) as stream:
+        text = stream.read()
+    for number in range(RECORD_COUNT):
+        yield text.replace('1017697643', '10176976{:02d}'.format(number))
+
+
+class TestIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.text_file = os.path.join(self.directory.name, 'records.mrk')
+        with open(self.text_file, 'w') as stream:
+            stream.write('\n'.join(_records()))
+        self.binary_file = os.path.join(self.directory.name, 'records.mrc')
+        with open(self.binary_file, 'wb') as stream:
+            for text in _records():
+                record = MarcRecordText.from_string(text)
+                stream.write(bytes(MarcRecordBinary.from_record(record)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_text(self):
+        with RecordIndex.open(self.text_file) as index:
+            assert index.data_format == 'text'
+            self._check(index, MarcRecordText)
+
+    def test_binary(self):
+        with RecordIndex.open(self.binary_file) as index:
+            assert index.data_format == 'binary'
+            self._check(index, MarcRecordBinary)
+
+    def _check(self, index, cls):
+        assert len(index) == RECORD_COUNT
+        record = index.get('1017697601')
+        assert isinstance(record, cls)
+        assert record.fields_dict['001'][0].data == ((False, '1017697601'),)
+        records = index.find('1017697602', key='oclc')
+        assert len(records) == 1
+        assert records[0].fields_dict['001'][0].data == ((False, '1017697602'),)
+        assert index.get('missing') is None
+        assert [
+            record.fields_dict['001'][0].data[0][1]
+            for record in index
+        ] == ['1017697600', '1017697601', '1017697602']
+
+    def test_persist(self):
+        RecordIndex.open(self.text_file).close()
+        assert os.path.exists(RecordIndex.index_file(self.text_file))
+        index = RecordIndex.load(self.text_file)
+        assert index is not None
+        assert len(index) == RECORD_COUNT
+        with open(self.text_file, 'a') as stream:
+            stream.write('\n')
+        assert RecordIndex.load(self.text_file) is None
+
+    def test_empty(self):
+        empty_file = os.path.join(self.directory.name, 'empty.mrk')
+        open(empty_file, 'w').close()
+        with RecordIndex.open(empty_file) as index:
+            assert len(index) == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -56,6 +56,20 @@ class TestLeader(unittest.TestCase):
             actual = getattr(leader, key)
             assert expected == actual
 
+    def test_set(self):
+        leader = Leader.from_string(self.INPUT_LINE)
+        leader.type_of_record = 'a'
+        assert leader.type_of_record == 'a'
+        assert str(leader) == self.INPUT_LINE.replace('cgm', 'cam')
+
+    def test_invalid(self):
+        with self.assertRaises(TypeError):
+            Leader(not_a_position='a')
+        leader = Leader.from_string(self.INPUT_LINE)
+        with self.assertRaises(AttributeError):
+            leader.not_a_position
+        assert not hasattr(leader, '__dict__')
+
     def test_serialize(self):
         line_input = self.INPUT_LINE
         leader = Leader.from_string(line_input)
@@ -0,0 +1,164 @@
+"""
+Check the command line
+"""
+from io import BufferedReader
+from io import BytesIO
+from io import StringIO
+from io import TextIOWrapper
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from prospector_holds.main import main
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.metrics import METRICS
+from prospector_holds.models.record import MarcRecordText
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+
+
+class TestMain(unittest.TestCase):
+
+    def setUp(self):
+        with open(INPUT_FILE) as stream:
+            self.text = stream.read()
+        self.record = MarcRecordText.from_string(self.text)
+        self.directory = tempfile.mkdtemp()
+        # Two records, each with its own control number
+        self.input_file = os.path.join(self.directory, 'records.mrk')
+        second = self.text.replace('1017697643', '1017697644').replace(
+            'Night of the living dead', 'Dawn of the dead',
+        )
+        with open(self.input_file, 'w') as stream:
+            stream.write(self.text + '\n' + second)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_main(self, args, stdin=b''):
+        """
+        Run a command, with the given bytes as stdin, returning stdout as bytes
+        """
+        output = BytesIO()
+        stdout = TextIOWrapper(output, encoding='utf-8')
+        stdin = TextIOWrapper(BufferedReader(BytesIO(stdin)), encoding='utf-8')
+        with mock.patch('sys.stdin', stdin), mock.patch('sys.stdout', stdout):
+            main(args)
+            stdout.flush()
+            return output.getvalue()
+
+    def test_parse(self):
+        output = self.run_main(['parse', INPUT_FILE]).decode('utf-8')
+        assert output == str(self.record) + '\n'
+
+    def test_parse_stdin(self):
+        output = self.run_main(['parse', '--format', 'json'], stdin=self.text.encode('utf-8'))
+        data = json.loads(output)
+        assert data['leader'] == self.record.leader._str_data()
+        assert data['fields'][0] == {'tag': '001', 'data': '1017697643'}
+        title = [field for field in data['fields'] if field['tag'] == '245'][0]
+        assert title['subfields'][0] == ['a', 'Night of the living dead /']
+
+    def test_parse_without_command(self):
+        assert self.run_main([INPUT_FILE]) == self.run_main(['parse', INPUT_FILE])
+
+    def test_parse_global_options_without_command(self):
+        stderr = StringIO()
+        try:
+            with mock.patch('sys.stderr', stderr):
+                output = self.run_main(['--metrics', 'json', INPUT_FILE])
+        finally:
+            METRICS.reset()
+        assert output == self.run_main(['parse', INPUT_FILE])
+        assert json.loads(stderr.getvalue())['counters']
+
+    def test_parse_file_named_as_command(self):
+        shutil.copy(INPUT_FILE, os.path.join(self.directory, 'index'))
+        directory = os.getcwd()
+        os.chdir(self.directory)
+        try:
+            output = self.run_main(['records.mrk', 'index'])
+        finally:
+            os.chdir(directory)
+        records = list(MarcRecordText.iter_text(output.decode('utf-8')))
+        assert len(records) == 3
+
+    def test_warm_cache(self):
+        store = os.path.join(self.directory, 'cache')
+        with mock.patch('prospector_holds.models.cache.RecordStore.DIRECTORY', store):
+            output = self.run_main(['parse', '--warm-cache'], stdin=self.text.encode('utf-8'))
+            assert output.decode('utf-8') == 'Stored 1 records\n'
+            output = self.run_main(['parse', '--warm-cache', self.input_file])
+            assert output.decode('utf-8') == 'Stored 2 records\n'
+
+    def test_convert(self):
+        data = self.run_main(['convert', self.input_file])
+        records = list(MarcRecordBinary.iter_records(BytesIO(data)))
+        assert len(records) == 2
+        assert records[0].leader.type_of_record == 'g'
+        assert list(map(str, records[0].fields)) == list(map(str, self.record.fields))
+        output = self.run_main(['convert', '--format', 'text'], stdin=data)
+        records = list(MarcRecordText.iter_text(output.decode('utf-8')))
+        assert len(records) == 2
+        assert list(map(str, records[0].fields)) == list(map(str, self.record.fields))
+
+    def test_extract(self):
+        args = ['extract', '--path', '001', '--path', '020$a', '--path', 'LDR/06', self.input_file]
+        output = self.run_main(args).decode('utf-8')
+        assert output.splitlines() == [
+            '1017697643\t9781681434018|1681434016\tg',
+            '1017697644\t9781681434018|1681434016\tg',
+        ]
+        output = self.run_main(
+            ['extract', '--path', '245$a', '--first', '--format', 'json'],
+            stdin=self.text.encode('utf-8'),
+        )
+        assert json.loads(output) == {'245$a': 'Night of the living dead /'}
+
+    def test_extract_invalid(self):
+        with mock.patch('sys.stderr', StringIO()):
+            with self.assertRaises(SystemExit):
+                self.run_main(['extract', '--path', '245/01', INPUT_FILE])
+
+    def test_index_search(self):
+        output = self.run_main(['index', self.input_file]).decode('utf-8')
+        assert output == 'Indexed 2 records: {}\n'.format(self.input_file)
+        output = self.run_main(['search', self.input_file, 'dead'])
+        assert output.decode('utf-8').splitlines() == ['1017697643', '1017697644']
+        output = self.run_main(['search', self.input_file], stdin=b'dawn\n')
+        assert output.decode('utf-8').splitlines() == ['1017697644']
+        output = self.run_main(['search', '--format', 'text', self.input_file, 'night'])
+        assert output.decode('utf-8') == str(self.record) + '\n'
+
+    def test_metrics(self):
+        stderr = StringIO()
+        try:
+            with mock.patch('sys.stderr', stderr):
+                self.run_main(['--metrics', 'json', 'parse', INPUT_FILE])
+        finally:
+            METRICS.reset()
+        data = json.loads(stderr.getvalue())
+        assert data['counters']['marc_records_parsed_total'][0]['value'] == 1
+        assert not METRICS.enabled
+
+    def test_metrics_workers(self):
+        stderr = StringIO()
+        try:
+            with mock.patch('sys.stderr', stderr):
+                output = self.run_main(['--metrics', 'json', 'parse', '--workers', '2', self.input_file])
+        finally:
+            METRICS.reset()
+        assert len(list(MarcRecordText.iter_text(output.decode('utf-8')))) == 2
+        data = json.loads(stderr.getvalue())
+        assert data['counters']['marc_records_parsed_total'][0]['value'] == 2
+
+
+if __name__ == '__main__':
+    unittest.main()
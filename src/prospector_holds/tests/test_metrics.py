@@ -0,0 +1,132 @@
+"""
+Check collecting and exposing metrics
+"""
+import json
+import os
+import unittest
+from unittest import mock
+
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.metrics import COUNT_BUCKETS
+from prospector_holds.models.metrics import METRICS
+from prospector_holds.models.metrics import Metrics
+from prospector_holds.models.record import MarcRecordText
+from prospector_holds.models.search import Search
+from prospector_holds.settings import SETTINGS
+from prospector_holds.tests.server import CatalogServer
+from prospector_holds.tests.server import make_records
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_counter(self):
+        self.metrics.increment('fields_total', tag='245')
+        self.metrics.increment('fields_total', 2, tag='245')
+        self.metrics.increment('fields_total', tag='100')
+        assert self.metrics.counter('fields_total', tag='245') == 3
+        assert self.metrics.counter('fields_total', tag='100') == 1
+        assert self.metrics.counter('fields_total', tag='700') == 0
+
+    def test_histogram(self):
+        for value in (1, 2, 2, 4, 100):
+            self.metrics.observe('pages', value, buckets=COUNT_BUCKETS)
+        histogram = self.metrics.histogram('pages').to_dict()
+        assert histogram['count'] == 5
+        assert histogram['sum'] == 109
+        assert histogram['buckets'][:4] == [[1, 1], [2, 3], [3, 3], [5, 4]]
+        assert histogram['buckets'][-1] == [50, 4]
+
+    def test_timer(self):
+        with self.metrics.timer('seconds'):
+            pass
+        assert self.metrics.histogram('seconds') is None
+        self.metrics.enable()
+        with self.metrics.timer('seconds', stage='parse'):
+            pass
+        assert self.metrics.histogram('seconds', stage='parse').count == 1
+
+    def test_json(self):
+        self.metrics.increment('requests_total')
+        self.metrics.observe('seconds', 0.002)
+        data = json.loads(self.metrics.to_json())
+        assert data['counters']['requests_total'] == [{'labels': {}, 'value': 1}]
+        assert data['histograms']['seconds'][0]['count'] == 1
+
+    def test_prometheus(self):
+        self.metrics.increment('fields_total', tag='245')
+        self.metrics.observe('pages', 2, buckets=(1, 2))
+        assert self.metrics.to_prometheus() == '\n'.join([
+            '# TYPE fields_total counter',
+            'fields_total{tag="245"} 1',
+            '# TYPE pages histogram',
+            'pages_bucket{le="1"} 0',
+            'pages_bucket{le="2"} 1',
+            'pages_bucket{le="+Inf"} 1',
+            'pages_sum 2',
+            'pages_count 1',
+        ]) + '\n'
+
+    def test_reset(self):
+        self.metrics.increment('requests_total')
+        self.metrics.reset()
+        assert self.metrics.to_dict() == {'counters': {}, 'histograms': {}}
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        METRICS.reset()
+        METRICS.enable()
+
+    def tearDown(self):
+        METRICS.disable()
+        METRICS.reset()
+
+    def test_disabled(self):
+        METRICS.disable()
+        MarcRecordText.from_file(INPUT_FILE)
+        assert METRICS.to_dict() == {'counters': {}, 'histograms': {}}
+
+    def test_parse(self):
+        with open(INPUT_FILE) as stream:
+            text = stream.read()
+        record = MarcRecordText.from_string(text + '\n999 \n')
+        assert METRICS.counter('marc_records_parsed_total') == 1
+        assert METRICS.histogram('marc_record_parse_seconds').count == 1
+        assert METRICS.counter('marc_fields_parsed_total', tag='700') == len(record.get_fields('700'))
+        assert METRICS.counter('marc_fields_dropped_total', tag='999') == 1
+
+    def test_parse_binary(self):
+        METRICS.disable()
+        data = bytes(MarcRecordBinary.from_record(MarcRecordText.from_file(INPUT_FILE)))
+        METRICS.enable()
+        record = MarcRecordBinary(data)
+        assert METRICS.counter('marc_records_parsed_total') == 1
+        assert METRICS.histogram('marc_record_parse_seconds').count == 1
+        assert METRICS.counter('marc_fields_parsed_total', tag='700') == len(record.get_fields('700'))
+
+    def test_search(self):
+        with CatalogServer(make_records(5), page_size=2) as server:
+            with mock.patch.dict(SETTINGS, server.settings):
+                links = list(Search.query_title('night of the living dead'))
+                Search.fetch_marc_record(links[0])
+        assert METRICS.counter('search_requests_total') == 4
+        assert METRICS.histogram('search_request_seconds').count == 4
+        assert METRICS.counter('search_response_bytes_total') > 0
+        pages = METRICS.histogram('search_pages_per_query')
+        assert (pages.count, pages.sum) == (1, 3)
+        assert METRICS.histogram('search_html_parse_seconds').count >= 3
+        assert METRICS.counter('marc_records_parsed_total') == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
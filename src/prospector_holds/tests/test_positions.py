@@ -0,0 +1,67 @@
+"""
+Check compiled positional layouts
+"""
+import unittest
+
+from prospector_holds.models.positions import code_layouts
+from prospector_holds.models.positions import compile_positions
+from prospector_holds.models.positions import leader_layout
+from prospector_holds.models.positions import material_layouts
+from prospector_holds.models.positions import slice_positions
+from prospector_holds.models.positions import type_layout
+
+
+class TestPositions(unittest.TestCase):
+
+    def test_compile(self):
+        positions = {
+            '00-04': {'label': 'Record length'},
+            '05': {'label': 'Record status'},
+        }
+        layout = compile_positions(positions)
+        assert layout == (
+            ('record_length', 0, 5),
+            ('record_status', 5, 6),
+        )
+
+    def test_slice(self):
+        layout = compile_positions({
+            '00-01': {'label': 'First'},
+            '03': {'label': 'Last'},
+        })
+        data = slice_positions(layout, 'abcd')
+        assert data == (
+            ('first', 'ab'),
+            ('undefined', 'c'),
+            ('last', 'd'),
+        )
+
+    def test_leader(self):
+        layout = leader_layout()
+        assert layout is leader_layout()
+        assert layout[0] == ('record_length', 0, 5)
+        assert layout[-1][2] == 24
+
+    def test_type(self):
+        layout = type_layout('007', 'Videorecording')
+        assert layout[0] == ('category_of_material', 0, 1)
+
+    def test_material(self):
+        """
+        Ensure 008 layouts include both common and specific positions
+        """
+        layouts = material_layouts()
+        assert layouts['a'] is layouts['t']
+        keys = [key for (key, start, stop) in layouts['g']]
+        assert 'date_1' in keys
+        assert 'running_time_for_motion_pictures_and_videorecordings' in keys
+        assert layouts['g'][-1][2] == 40
+
+    def test_code(self):
+        layouts = code_layouts('007')
+        assert layouts['v'] == type_layout('007', 'Videorecording')
+        assert 'x' not in layouts
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Check text-based records
+"""
+from io import StringIO
+import os
+import unittest
+from unittest import mock
+
+from prospector_holds.models.fields import Field
+from prospector_holds.models.record import MarcRecordText
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+
+
+class TestRecord(unittest.TestCase):
+
+    def setUp(self):
+        with open(INPUT_FILE) as stream:
+            self.text = stream.read()
+
+    def test_from_string(self):
+        record = MarcRecordText.from_string(self.text)
+        assert record.leader.type_of_record == 'g'
+        assert record.is_video
+        assert record.fields_dict['001'][0].data == ((False, '1017697643'),)
+
+    def test_lazy(self):
+        with mock.patch.object(Field, 'from_lines', wraps=Field.from_lines) as from_lines:
+            record = MarcRecordText.from_string(self.text, lazy=True)
+            assert record.is_video
+            from_lines.assert_not_called()
+            fields = record.get_fields('245')
+            assert len(fields) == 1
+            assert from_lines.call_count == 1
+            assert fields[0].data_dict['a'] == ['Night of the living dead /']
+            assert record.get_fields('245') == fields
+            assert from_lines.call_count == 1
+        expected = MarcRecordText.from_string(self.text)
+        assert str(record) == str(expected)
+        assert record.get_fields('245')[0] is fields[0]
+
+    def test_get_fields(self):
+        record = MarcRecordText.from_string(self.text)
+        fields = record.get_fields('500')
+        assert len(fields) == len(record.fields_dict['500'])
+        assert record.get_fields('999') == []
+
+    def test_iter_records(self):
+        second = self.text.replace('LEADER 00000cgm', 'LDR 00000cam', 1)
+        stream = StringIO(self.text + '\n\n' + second)
+        records = list(MarcRecordText.iter_records(stream))
+        assert len(records) == 2
+        assert records[0].leader.type_of_record == 'g'
+        assert records[1].leader.type_of_record == 'a'
+        expected = MarcRecordText.from_string(self.text)
+        assert str(records[0]) == str(expected)
+        assert len(records[1].fields) == len(expected.fields)
+
+    def test_iter_records_empty(self):
+        stream = StringIO('\n\n')
+        records = list(MarcRecordText.iter_records(stream))
+        assert records == []
+
+    def test_iter_file(self):
+        records = list(MarcRecordText.iter_file(INPUT_FILE))
+        assert len(records) == 1
+        assert str(records[0]) == str(MarcRecordText.from_file(INPUT_FILE))
+
+    def test_from_text(self):
+        expected = MarcRecordText(StringIO(self.text))
+        record = MarcRecordText.from_text(self.text)
+        assert str(record.leader) == str(expected.leader)
+        assert list(map(repr, record.fields)) == list(map(repr, expected.fields))
+
+    def test_from_text_edge_cases(self):
+        text = '\r\n'.join([
+            '',
+            '   ',
+            'LEADER 00000cgm a2201093 i 4500',
+            '   |aorphaned continuation',
+            '245 10 |aNight of ',
+            '',
+            '       the living dead / ',
+            '500  ',
+            '999    unknown tag',
+            '\t500    tabbed',
+            '650  0',
+            '   |aHorror films.',
+        ])
+        expected = MarcRecordText(StringIO(text))
+        record = MarcRecordText.from_text(text)
+        assert list(map(repr, record.fields)) == list(map(repr, expected.fields))
+        assert record.get_fields('245')[0].data == (('a', 'Night of the living dead /'),)
+
+    def test_tokenize(self):
+        text = '\n'.join([
+            'LEADER 00000cgm a2201093 i 4500',
+            '001    1',
+            '245 10 |aNight of ',
+            '       the living dead /',
+            '500  ',
+        ])
+        (leader, tokens) = MarcRecordText.tokenize(text)
+        assert leader.type_of_record == 'g'
+        assert list(tokens) == [
+            ('001', (' ', ' '), '1'),
+            ('245', ('1', '0'), '|aNight of the living dead /'),
+            ('500', None, ''),
+        ]
+        (leader, tokens) = MarcRecordText.tokenize(text, tags=('245',))
+        assert [tag for (tag, _, _) in tokens] == ['245']
+        (leader, tokens) = MarcRecordText.tokenize('001    1')
+        assert leader is None
+        assert list(tokens) == []
+
+    def test_iter_text(self):
+        second = self.text.replace('LEADER 00000cgm', 'LDR 00000cam', 1)
+        text = '\n' + self.text + '\n\n' + second
+        records = list(MarcRecordText.iter_text(text))
+        expected = list(MarcRecordText.iter_records(StringIO(text)))
+        assert len(records) == 2
+        assert records[1].leader.type_of_record == 'a'
+        assert list(map(str, records)) == list(map(str, expected))
+        assert list(MarcRecordText.iter_text('\n\n')) == []
+
+
+if __name__ == '__main__':
+    unittest.main()
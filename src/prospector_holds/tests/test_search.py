@@ -0,0 +1,220 @@
+"""
+Check searches against a local stand-in for the catalog
+"""
+import time
+import unittest
+from unittest import mock
+
+from prospector_holds.models.search import Search
+from prospector_holds.models.search import SearchResultParser
+from prospector_holds.models.search import _prefetch
+from prospector_holds.settings import SETTINGS
+from prospector_holds.tests.server import CatalogServer
+from prospector_holds.tests.server import make_records
+
+
+RECORD_COUNT = 10
+
+
+class TestSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CatalogServer(make_records(RECORD_COUNT), page_size=3)
+        self.server.__enter__()
+        self.settings = mock.patch.dict(SETTINGS, self.server.settings)
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        self.server.__exit__()
+
+    def test_query_title(self):
+        links = list(Search.query_title('night of the living dead'))
+        assert sorted(links) == sorted(self.server.records)
+
+    def test_query_title_max_pages(self):
+        links = list(Search.query_title('night of the living dead', max_pages=2))
+        assert len(links) == 2 * self.server.page_size
+        assert len(self.server.paths) == 2
+
+    def test_query_title_prefetch(self):
+        links = Search.query_title('night of the living dead', prefetch=2)
+        assert sorted(links) == sorted(self.server.records)
+
+    def test_query_title_prefetch_ahead(self):
+        """
+        Ensure the next page is fetched before this one is consumed
+        """
+        links = Search.query_title('night of the living dead', prefetch=1)
+        next(links)
+        for _ in range(100):
+            if len(self.server.paths) >= 2:
+                break
+            time.sleep(0.01)
+        assert len(self.server.paths) >= 2
+        links.close()
+
+    def test_query_title_prefetch_pages(self):
+        """
+        Ensure prefetching counts whole pages, however they're chunked
+        """
+        self.server.records = make_records(24)
+        self.server.page_size = 6
+        with mock.patch.object(Search, 'CHUNK_SIZE', 64):
+            links = Search.query_title('night of the living dead', prefetch=2)
+            next(links)
+            for _ in range(100):
+                if '/search/page/2' in self.server.paths:
+                    break
+                time.sleep(0.01)
+            links.close()
+        assert '/search/page/2' in self.server.paths
+
+    def test_fetch_marc_record(self):
+        record = Search.fetch_marc_record('/record/3')
+        assert record.fields_dict['001'][0].data == ((False, '1017697603'),)
+
+    def test_fetch_marc_records(self):
+        links = Search.query_title('night of the living dead')
+        records = list(Search.fetch_marc_records(links, workers=4))
+        assert len(records) == RECORD_COUNT
+        numbers = sorted(
+            record.fields_dict['001'][0].data[0][1]
+            for record in records
+        )
+        assert numbers == [
+            '10176976{:02d}'.format(number)
+            for number in range(RECORD_COUNT)
+        ]
+        # Connections are kept alive and reused between requests
+        assert self.server.connections <= 4 + 1
+        assert len(self.server.paths) > self.server.connections
+
+    def test_fetch_marc_records_many_workers(self):
+        workers = Search.WORKERS + 4
+        links = list(Search.query_title('night of the living dead'))
+        with self.assertNoLogs('urllib3.connectionpool', level='WARNING'):
+            records = list(Search.fetch_marc_records(links, workers=workers))
+        assert len(records) == RECORD_COUNT
+        adapter = Search.session().get_adapter('http://')
+        assert adapter._pool_maxsize >= workers
+
+    def test_query_titles(self):
+        results = Search.query_titles([
+            'night of the living dead',
+            ('night of the living dead', 'dvd'),
+            ('dawn of the dead', None, False),
+            ('dawn of the dead', None, False),
+        ], workers=4)
+        assert list(results) == [
+            ('night of the living dead', None, True),
+            ('night of the living dead', 'dvd', True),
+            ('dawn of the dead', None, False),
+        ]
+        for records in results.values():
+            assert len(records) == RECORD_COUNT
+        # Every search found every record, but each was only fetched once
+        fetched = [
+            path
+            for path in self.server.paths
+            if path in self.server.records
+        ]
+        assert sorted(fetched) == sorted(self.server.records)
+        dawn = results[('dawn of the dead', None, False)]
+        night = results[('night of the living dead', 'dvd', True)]
+        assert set(map(id, dawn)) == set(map(id, night))
+
+
+class TestStreaming(unittest.TestCase):
+
+    DELAY = 0.5
+
+    def setUp(self):
+        self.server = CatalogServer(make_records(RECORD_COUNT), page_size=3, delay=self.DELAY)
+        self.server.__enter__()
+        self.settings = mock.patch.dict(SETTINGS, self.server.settings)
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+        self.server.__exit__()
+
+    def test_query_title(self):
+        links = list(Search.query_title('night of the living dead', max_pages=2))
+        assert links == ['/record/0', '/record/1', '/record/2', '/record/3', '/record/4', '/record/5']
+
+    def test_early(self):
+        """
+        Ensure links are yielded, and the next page requested,
+        before the rest of the page has downloaded
+        """
+        # Stall the first page until the second has been requested
+        self.server.delay = 60
+        links = Search.query_title('night of the living dead', max_pages=2)
+        try:
+            assert next(links) == '/record/0'
+            for _ in range(1000):
+                if len(self.server.paths) >= 2:
+                    break
+                time.sleep(0.01)
+            with self.server.lock:
+                assert self.server.paths[1] == '/search/page/1'
+                assert self.server.finished == []
+        finally:
+            self.server.resume.set()
+            links.close()
+
+
+class TestSearchResultParser(unittest.TestCase):
+
+    PAGE = (
+        '<html><body><a id="pagination_link_next" href="/search/page/1">Next</a>'
+        '<a href="/record/1">One</a><a name>Anchor</a><a href="/record/2">Two</a>'
+        '<a href="/record/1">One</a></body></html>'
+    )
+
+    def setUp(self):
+        self.settings = mock.patch.dict(SETTINGS, CatalogServer.settings.fget(mock.Mock(
+            server_address=('127.0.0.1', 80),
+        )))
+        self.settings.start()
+
+    def tearDown(self):
+        self.settings.stop()
+
+    def test_feed(self):
+        parser = SearchResultParser()
+        parser.feed(self.PAGE)
+        assert parser.links == set(['/record/1', '/record/2'])
+        assert parser.next == '/search/page/1'
+
+    def test_chunks(self):
+        parser = SearchResultParser()
+        found = []
+        for start in range(0, len(self.PAGE), 7):
+            parser.feed(self.PAGE[start:start + 7])
+            found.append(parser.pop_links())
+        parser.close()
+        assert [link for links in found for link in links] == ['/record/1', '/record/2']
+        assert parser.pop_links() == []
+        # Links are found before the whole page is fed
+        assert found.index(['/record/1']) < len(self.PAGE) // 7 // 2
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_order(self):
+        assert list(_prefetch(range(10), 3)) == list(range(10))
+
+    def test_error(self):
+        def items():
+            yield 1
+            raise ValueError('failed')
+        prefetched = _prefetch(items(), 2)
+        assert next(prefetched) == 1
+        with self.assertRaises(ValueError):
+            next(prefetched)
+
+
+if __name__ == '__main__':
+    unittest.main()
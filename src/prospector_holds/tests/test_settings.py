@@ -0,0 +1,65 @@
+"""
+Test the settings and schema loading
+"""
+from os import listdir
+from tempfile import TemporaryDirectory
+import unittest
+from unittest import mock
+
+from prospector_holds import settings
+
+
+class TestSchema(unittest.TestCase):
+
+    def test_compiled(self):
+        """
+        Ensure the schema is compiled to the cache, then read back
+        """
+        with TemporaryDirectory() as directory:
+            with mock.patch.object(settings, '_CACHE', directory):
+                schema = settings._load_schema()
+                filenames = listdir(directory)
+                assert len(filenames) == 1
+                assert filenames[0].startswith('schema-')
+                with mock.patch.object(settings.json, 'loads') as loads:
+                    cached = settings._load_schema()
+                    loads.assert_not_called()
+        assert cached == schema
+        assert 'LDR' in cached['fields']
+
+    def test_stale(self):
+        """
+        Ensure compiled copies of an older schema are replaced
+        """
+        version = ''.join(map(str, settings.sys.version_info[:2]))
+        with TemporaryDirectory() as directory:
+            stale = settings._SCHEMA_CACHE_PATTERN.format(
+                digest='0' * 8,
+                version=version,
+            )
+            # A copy compiled by another version of Python is kept
+            other = settings._SCHEMA_CACHE_PATTERN.format(
+                digest='0' * 8,
+                version='00',
+            )
+            for filename in (stale, other):
+                with open(settings.path.join(directory, filename), 'wb') as stream:
+                    stream.write(b'stale')
+            with mock.patch.object(settings, '_CACHE', directory):
+                settings._load_schema()
+                filenames = sorted(listdir(directory))
+        assert len(filenames) == 2
+        assert stale not in filenames
+        assert other in filenames
+
+    def test_lazy(self):
+        """
+        Ensure the schema is exposed as a module attribute
+        """
+        assert settings.SCHEMA_JSON['fields']['001']['repeatable'] is False
+        with self.assertRaises(AttributeError):
+            settings.NOT_A_SETTING
+
+
+if __name__ == '__main__':
+    unittest.main()
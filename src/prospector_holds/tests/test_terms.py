@@ -0,0 +1,112 @@
+"""
+Check inverted indexes over record files
+"""
+import os
+from tempfile import TemporaryDirectory
+import unittest
+
+from prospector_holds.models.binary import MarcRecordBinary
+from prospector_holds.models.record import MarcRecordText
+from prospector_holds.models.terms import TermIndex
+from prospector_holds.models.terms import normalize_identifier
+from prospector_holds.models.terms import tokenize
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+
+"""
+The title and first-billed name of each test record
+"""
+VARIANTS = (
+    ('Night of the living dead', 'Romero, George A.'),
+    ('Dawn of the dead', 'Romero, George A.'),
+    ('Amélie', 'Jeunet, Jean-Pierre'),
+)
+
+
+def _records():
+    """
+    Create a few records, varying their titles and names
+    """
+    with open(INPUT_FILE) as stream:
+        text = stream.read()
+    for (number, (title, name)) in enumerate(VARIANTS):
+        yield (
+            text
+            .replace('1017697643', '10176976{:02d}'.format(number))
+            .replace('Night of the living dead /', title + ' /')
+            .replace('Romero, George A.,', name + ',')
+        )
+
+
+class TestTokenize(unittest.TestCase):
+
+    def test_tokenize(self):
+        assert tokenize('Amélie (Motion picture) /') == ['amelie', 'motion', 'picture']
+        assert tokenize('Romero, George A.,') == ['romero', 'george', 'a']
+
+    def test_normalize_identifier(self):
+        assert normalize_identifier('(OCoLC)on1017697643') == '1017697643'
+        assert normalize_identifier('(OCoLC)ocm00012345') == '12345'
+        assert normalize_identifier('978-1-4359-0339-0 (DVD)') == '9781435903390'
+        assert normalize_identifier(' ') == ''
+        assert normalize_identifier('(DLC)  12345') == '(dlc)12345'
+        assert normalize_identifier('(DLC)12345') != normalize_identifier('(OCoLC)12345')
+
+
+class TestTermIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.text_file = os.path.join(self.directory.name, 'records.mrk')
+        with open(self.text_file, 'w') as stream:
+            stream.write('\n'.join(_records()))
+        self.binary_file = os.path.join(self.directory.name, 'records.mrc')
+        with open(self.binary_file, 'wb') as stream:
+            for text in _records():
+                record = MarcRecordText.from_string(text)
+                stream.write(bytes(MarcRecordBinary.from_record(record)))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def check(self, index):
+        assert len(index) == len(VARIANTS)
+        assert index.find('night of the LIVING dead') == [0]
+        assert index.find('dead') == [0, 1]
+        assert index.find('dead amelie') == []
+        assert index.find('') == []
+        assert index.search('amelie') == ['1017697602']
+        assert index.find('romero', 'name') == [0, 1]
+        # Names from 700 fields are indexed too
+        assert index.find('Russo, John', 'name') == [0, 1, 2]
+        assert index.find('(OCoLC)ocm1017697601', 'identifier') == [1]
+        assert index.find('9781681434018', 'identifier') == [0, 1, 2]
+
+    def test_text(self):
+        self.check(TermIndex.build(self.text_file))
+
+    def test_binary(self):
+        self.check(TermIndex.build(self.binary_file))
+
+    def test_open(self):
+        index = TermIndex.open(self.text_file)
+        assert os.path.exists(TermIndex.index_file(self.text_file))
+        loaded = TermIndex.load(self.text_file)
+        assert loaded.ids == index.ids
+        self.check(loaded)
+
+    def test_stale(self):
+        TermIndex.open(self.text_file)
+        with open(self.text_file, 'a') as stream:
+            stream.write('\n' + next(_records()).replace('1017697600', '1017697699'))
+        assert TermIndex.load(self.text_file) is None
+        index = TermIndex.open(self.text_file)
+        assert index.search('night living dead') == ['1017697600', '1017697699']
+
+
+if __name__ == '__main__':
+    unittest.main()
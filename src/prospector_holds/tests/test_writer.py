@@ -0,0 +1,96 @@
+"""
+Check writing records as text, in bulk
+"""
+from io import StringIO
+import os
+from tempfile import TemporaryDirectory
+import unittest
+from unittest import mock
+
+from prospector_holds.models.fields import Field
+from prospector_holds.models.record import MarcRecordText
+from prospector_holds.models.writer import MarcTextWriter
+
+
+INPUT_FILE = os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', '..', 'test', 'night-of-the-living-dead-1968.mrk',
+)
+RECORD_COUNT = 5
+
+
+class TestMarcTextWriter(unittest.TestCase):
+
+    def setUp(self):
+        with open(INPUT_FILE) as stream:
+            text = stream.read()
+        self.records = [
+            MarcRecordText.from_string(
+                text.replace('1017697643', '10176976{:02d}'.format(number))
+            )
+            for number in range(RECORD_COUNT)
+        ]
+        self.expected = ''.join(
+            str(record) + '\n'
+            for record in self.records
+        )
+
+    def test_write(self):
+        stream = StringIO()
+        count = MarcTextWriter(stream).write_records(self.records)
+        assert count == RECORD_COUNT
+        assert stream.getvalue() == self.expected
+
+    def test_lazy(self):
+        records = [
+            MarcRecordText.from_string(str(record), lazy=True)
+            for record in self.records
+        ]
+        stream = StringIO()
+        MarcTextWriter(stream).write_records(records)
+        assert stream.getvalue() == self.expected
+
+    def test_other_field(self):
+        class Other(Field):
+            __slots__ = ()
+
+            def __str__(self):
+                return '999 ## other'
+
+        record = self.records[0]
+        record.fields = record.fields + [Other('999', (' ', ' '), ())]
+        stream = StringIO()
+        MarcTextWriter(stream).write_records([record])
+        assert stream.getvalue() == str(record) + '\n'
+        assert stream.getvalue().endswith('\n999 ## other\n')
+
+    def test_wrap(self):
+        stream = StringIO()
+        MarcTextWriter(stream, width=40).write_records(self.records[:1])
+        lines = stream.getvalue().splitlines()
+        assert len(lines) > len(str(self.records[0]).splitlines())
+        field = self.records[0].fields_dict['245'][0]
+        assert '\n245 00 ' + field._str_data(width=40) + '\n' in stream.getvalue()
+
+    def test_batches(self):
+        stream = mock.Mock()
+        with MarcTextWriter(stream, batch_size=2) as writer:
+            for record in self.records:
+                writer.write(record)
+        assert stream.writelines.call_count == 3
+        written = ''.join(
+            ''.join(call.args[0])
+            for call in stream.writelines.call_args_list
+        )
+        assert written == self.expected
+
+    def test_write_file(self):
+        with TemporaryDirectory() as directory:
+            output_file = os.path.join(directory, 'records.mrk')
+            assert MarcTextWriter.write_file(self.records, output_file) == RECORD_COUNT
+            records = list(MarcRecordText.iter_file(output_file))
+        assert [str(record) for record in records] == [str(record) for record in self.records]
+
+
+if __name__ == '__main__':
+    unittest.main()